@@ -0,0 +1,73 @@
+"""
+Compares the scalar Analytic.calculate with the vectorized Analytic.calculate_batch.
+
+Run from the repository root:  python -m benchmarks.analytic_batch
+"""
+
+import time
+
+import numpy as np
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+
+
+def random_batch(n, seed=0):
+    """
+    Generates a random batch of option parameters.
+
+    :param n: number of options
+    :param seed: seed of the random number generator
+
+    :return: tuple with the arrays s, k, t, r, d, v and the call flags
+    """
+
+    rng = np.random.default_rng(seed)
+
+    s = rng.uniform(20, 80, n)
+    k = rng.uniform(20, 80, n)
+    t = rng.uniform(0.1, 3, n)
+    r = rng.uniform(0, 0.1, n)
+    d = rng.uniform(0, 0.05, n)
+    v = rng.uniform(0.1, 0.6, n)
+    call = rng.random(n) < 0.5
+
+    return s, k, t, r, d, v, call
+
+
+def main(n_scalar=2000, n_batch=1000000):
+    """
+    Times both entry points and prints the time per option and the largest price difference.
+
+    :param n_scalar: number of options priced one by one
+    :param n_batch: number of options priced in one batch
+    """
+
+    s, k, t, r, d, v, call = random_batch(n_scalar)
+
+    option = Option()
+    scalar = np.zeros(n_scalar)
+
+    start = time.perf_counter()
+    for i in range(0, n_scalar):
+        option.set_option(s[i], k[i], t[i], r[i], d[i], v[i], 'call' if call[i] else 'put')
+        scalar[i] = Analytic(option).calculate()
+    time_scalar = (time.perf_counter() - start) / n_scalar
+
+    batch = Analytic.calculate_batch(s, k, t, r, d, v, call)
+    max_error = np.max(np.abs(batch - scalar))
+
+    s, k, t, r, d, v, call = random_batch(n_batch)
+
+    start = time.perf_counter()
+    Analytic.calculate_batch(s, k, t, r, d, v, call)
+    time_batch = (time.perf_counter() - start) / n_batch
+
+    print("scalar:\t{t:.3e} s per option".format(t=time_scalar))
+    print("batch:\t{t:.3e} s per option ({n} options)".format(t=time_batch, n=n_batch))
+    print("speedup:\t{x:.0f}x".format(x=time_scalar / time_batch))
+    print("max abs difference:\t{e:.3e}".format(e=max_error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares Analytic.calculate_greeks_batch with bump-and-reprice Greeks from Analytic.calculate_batch.
+
+Run from the repository root:  python -m benchmarks.analytic_greeks
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.analytic_batch import random_batch
+from other_methods.Analytic import Analytic
+
+
+def bump_greeks(s, k, t, r, d, v, call, h=1e-4):
+    """
+    Calculates the price and the first-order Greeks plus gamma with central differences.
+    This needs nine calls of the pricer.
+
+    :param s: spot prices
+    :param k: strike prices
+    :param t: times
+    :param r: risk-free interest rates
+    :param d: dividends
+    :param v: volatilities
+    :param call: the call flags
+    :param h: the size of the bumps
+
+    :return: dictionary with the price and the Greeks
+    """
+
+    price = Analytic.calculate_batch(s, k, t, r, d, v, call)
+    up = Analytic.calculate_batch(s + h, k, t, r, d, v, call)
+    down = Analytic.calculate_batch(s - h, k, t, r, d, v, call)
+
+    return {
+        'price': price,
+        'delta': (up - down) / (2 * h),
+        'gamma': (up - 2 * price + down) / (h * h),
+        'vega': (Analytic.calculate_batch(s, k, t, r, d, v + h, call)
+                 - Analytic.calculate_batch(s, k, t, r, d, v - h, call)) / (2 * h),
+        'theta': (Analytic.calculate_batch(s, k, t - h, r, d, v, call)
+                  - Analytic.calculate_batch(s, k, t + h, r, d, v, call)) / (2 * h),
+        'rho': (Analytic.calculate_batch(s, k, t, r + h, d, v, call)
+                - Analytic.calculate_batch(s, k, t, r - h, d, v, call)) / (2 * h),
+    }
+
+
+def main(n=1000000):
+    """
+    Times both approaches and prints the largest differences between them.
+
+    :param n: the number of options
+    """
+
+    batch = random_batch(n)
+
+    start = time.perf_counter()
+    analytic = Analytic.calculate_greeks_batch(*batch)
+    time_analytic = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bump = bump_greeks(*batch)
+    time_bump = time.perf_counter() - start
+
+    print("closed form:\t{t:.3f} s for {g} fields".format(t=time_analytic, g=len(Analytic.greeks)))
+    print("bump:\t\t{t:.3f} s for {g} fields".format(t=time_bump, g=len(bump)))
+    print("speedup:\t{x:.1f}x".format(x=time_bump / time_analytic))
+
+    for name in bump:
+        print("max abs difference {name}:\t{e:.2e}".format(name=name, e=np.max(np.abs(analytic[name] - bump[name]))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Compares the convergence of the binomial tree parameterizations (Cox-Ross-Rubinstein, Leisen-Reimer and
+the tree with analytic values at the last step).
+
+Run from the repository root:  python -m benchmarks.binomial_lattices
+"""
+
+import time
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from other_methods.BinomialTree import BinomialTree
+
+
+def main(sizes=(25, 50, 100, 101, 200, 201, 400, 401, 1000, 1001), lattices=('crr', 'lr', 'bbs'), tol=1e-6):
+    """
+    Prints the errors of a european put for several numbers of steps, and the number of steps and the time
+    each lattice needs to reach the tolerance.
+
+    :param sizes: the numbers of steps
+    :param lattices: the parameterizations of the tree
+    :param tol: the tolerance of the error
+    """
+
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, 0, 0.2, 'put')
+
+    exact = Analytic(option).calculate()
+    method = BinomialTree(option)
+
+    print("n\t" + "\t\t".join(lattices))
+
+    for n in sizes:
+        print("{n}\t".format(n=n) + "\t\t".join(
+            "{e:.1e}".format(e=abs(method.calculate(n, 'european', lattice) - exact)) for lattice in lattices))
+
+    print("\nsteps and seconds for an error below {tol:.0e}".format(tol=tol))
+
+    for lattice in lattices:
+        n = 16
+
+        while n <= 100000 and abs(method.calculate(n, 'european', lattice) - exact) >= tol:
+            n = int(n * 1.25) + 1
+
+        if n > 100000:
+            print("{lattice}\tnot reached with 100000 steps".format(lattice=lattice))
+            continue
+
+        start = time.perf_counter()
+        method.calculate(n, 'european', lattice)
+
+        print("{lattice}\t{n}\t{s:.2e} s".format(lattice=lattice, n=n, s=time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
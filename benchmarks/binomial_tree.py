@@ -0,0 +1,80 @@
+"""
+Compares the array-backed BinomialTree with the former dict-backed implementation.
+
+Run from the repository root:  python -m benchmarks.binomial_tree
+"""
+
+import math
+import time
+
+from general_classes.Option import Option
+from other_methods.BinomialTree import BinomialTree
+
+
+def dict_binomial_tree(stock, n):
+    """
+    The former implementation of BinomialTree.calculate, which keeps every node in a dict.
+
+    :param stock: the option (class Option)
+    :param n: the number of simulation steps
+
+    :return: the price after t time
+    """
+
+    s = stock.s
+    k = stock.k
+    t = stock.t
+    r = stock.r
+    vol = stock.v
+
+    dt = t / n
+    u = math.exp(vol * math.sqrt(dt))
+    d = 1 / u
+    p = (math.exp(r * dt) - d) / (u - d)
+    c = {}
+
+    if 'call' == stock.kind:
+        for m in range(0, n + 1):
+            c[(n, m)] = max(s * (u ** (2 * m - n)) - k, 0)
+    else:
+        for m in range(0, n + 1):
+            c[(n, m)] = max(k - s * (u ** (2 * m - n)), 0)
+
+    for k in range(n - 1, -1, -1):
+        for m in range(0, k + 1):
+            c[(k, m)] = math.exp(-r * dt) * (p * c[(k + 1, m + 1)] + (1 - p) * c[(k + 1, m)])
+    return c[(0, 0)]
+
+
+def main(steps=(100, 1000, 10000), dict_max=1000):
+    """
+    Times both implementations and prints the speedup.
+
+    :param steps: the numbers of simulation steps
+    :param dict_max: the largest number of steps for the dict implementation (it needs O(n^2) memory)
+    """
+
+    option = Option()
+
+    for n in steps:
+        start = time.perf_counter()
+        price = BinomialTree(option).calculate(n)
+        time_array = time.perf_counter() - start
+
+        msg = "n={n}:\tarray {t:.4f} s".format(n=n, t=time_array)
+
+        if n <= dict_max:
+            start = time.perf_counter()
+            price_dict = dict_binomial_tree(option, n)
+            time_dict = time.perf_counter() - start
+
+            msg += "\tdict {t:.4f} s\tspeedup {x:.0f}x\tdifference {e:.2e}".format(
+                t=time_dict, x=time_dict / time_array, e=abs(price - price_dict))
+        else:
+            msg += "\tdict skipped"
+
+        print(msg)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Compares the accuracy of the uniform and the sinh grid of the Crank-Nicolson method per number of spot prices.
+
+Run from the repository root:  python -m benchmarks.fd_grids
+"""
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from finite_difference_methods.CrankNicolson import CrankNicolson
+
+# spot price, strike price and kind of the test options
+cases = ((42, 40, 'call'), (40, 40, 'put'), (20, 40, 'put'), (30, 40, 'call'), (80, 40, 'call'))
+
+
+def max_error(grid, n_s, n_t):
+    """
+    Calculates the largest absolute error of the test options.
+
+    :param grid: the grid of the Crank-Nicolson method
+    :param n_s: the number of spot prices (ignored by the uniform grid)
+    :param n_t: the number of time steps
+
+    Returns: Tuple
+        - error - the largest absolute error
+        - n_s - the largest number of spot prices which was used
+    """
+
+    option = Option()
+    error = 0
+    nodes = 0
+
+    for s, k, kind in cases:
+        option.set_option(s, k, 1, 0.1, 0, 0.2, kind)
+        method = CrankNicolson(option, grid=grid)
+
+        x, f = method.calculate_grid(n_s, n_t, 'n')
+        error = max(error, abs(float(method.get_price(x, f)) - Analytic(option).calculate()))
+        nodes = max(nodes, len(x) - 1)
+
+    return error, nodes
+
+
+def main(n_t=2000):
+    """
+    Prints the largest error of the uniform grid and of the sinh grid with an increasing number of spot prices.
+
+    :param n_t: the number of time steps
+    """
+
+    error, nodes = max_error('uniform', 1, n_t)
+    print("uniform:\t{n} spot prices\tmax error {e:.2e}".format(n=nodes, e=error))
+
+    for n_s in (40, 80, 160, 320):
+        error, nodes = max_error('sinh', n_s, n_t)
+        print("sinh:\t\t{n} spot prices\tmax error {e:.2e}".format(n=nodes, e=error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures the cold import time of the pricers and checks that they do not load matplotlib.
+Every module is imported in a fresh interpreter.
+
+Run from the repository root:  python -m benchmarks.import_time
+"""
+
+import subprocess
+import sys
+
+MODULES = (
+    'other_methods.Analytic',
+    'other_methods.MonteCarlo',
+    'other_methods.BinomialTree',
+    'other_methods.TrinomialTree',
+    'finite_difference_methods.ExplicitFD',
+    'finite_difference_methods.ImplicitFD',
+    'finite_difference_methods.CrankNicolson',
+    'general_classes.Option',
+    'general_classes.Simulation',
+    'general_classes.Plotting',
+)
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, 'matplotlib' in sys.modules)
+"""
+
+
+def measure(module, repeat=3):
+    """
+    Imports a module in fresh interpreters.
+
+    :param module: the name of the module
+    :param repeat: the number of measurements, of which the fastest one is used
+
+    Returns: Tuple
+        - seconds - the time of the import
+        - matplotlib - true if the import loaded matplotlib
+    """
+
+    best = None
+
+    for i in range(0, repeat):
+        out = subprocess.run([sys.executable, '-c', SCRIPT.format(module=module)],
+                             capture_output=True, text=True, check=True).stdout.split()
+        seconds, matplotlib = float(out[0]), 'True' == out[1]
+
+        if best is None or seconds < best[0]:
+            best = (seconds, matplotlib)
+
+    return best
+
+
+def main():
+    """
+    Prints the import time of every module and whether it loaded matplotlib.
+    """
+
+    for module in MODULES:
+        seconds, matplotlib = measure(module)
+        print("{module:45s}{ms:8.1f} ms\tmatplotlib: {mpl}".format(module=module, ms=1000 * seconds,
+                                                                 mpl='loaded' if matplotlib else 'no'))
+
+
+if __name__ == '__main__':
+    main()
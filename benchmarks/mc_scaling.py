@@ -0,0 +1,53 @@
+"""
+Times the parallel Monte-Carlo simulation for increasing numbers of worker processes. The number of random
+streams is fixed, so every row has to show the same price.
+
+Run from the repository root:  python -m benchmarks.mc_scaling
+"""
+
+import os
+import time
+
+from general_classes.Option import Option
+from other_methods.MonteCarlo import MonteCarlo
+
+
+def main(n=20000000, streams=None, seed=0):
+    """
+    Prints the time, the speedup and the price for 1, 2, 4, ... worker processes up to the number of cores.
+
+    :param n: the number of simulation runs
+    :param streams: the number of random streams (None...the number of cores)
+    :param seed: the seed of the random streams
+    """
+
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, 0, 0.2, 'put')
+    method = MonteCarlo(option)
+
+    cores = os.cpu_count() or 1
+    streams = cores if streams is None else streams
+
+    workers = [1]
+    while workers[-1] * 2 <= cores:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != cores:
+        workers.append(cores)
+
+    print("workers\tseconds\t\tspeedup\tprice\t\t\terror")
+
+    serial = None
+
+    for w in workers:
+        start = time.perf_counter()
+        price, error = method.calculate_parallel(n, w, seed=seed, streams=streams)
+        seconds = time.perf_counter() - start
+
+        if serial is None:
+            serial = seconds
+
+        print("{w}\t{s:.3f}\t\t{x:.2f}\t{p!r}\t{e:.2e}".format(w=w, s=seconds, x=serial / seconds, p=price, e=error))
+
+
+if __name__ == '__main__':
+    main()
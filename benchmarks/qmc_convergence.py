@@ -0,0 +1,71 @@
+"""
+Compares the convergence of the pseudo-random Monte-Carlo engine with the Sobol quasi-Monte-Carlo mode.
+
+Run from the repository root:  python -m benchmarks.qmc_convergence
+"""
+
+import math
+import time
+
+import numpy as np
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from other_methods.MonteCarlo import MonteCarlo
+
+
+def rmse(function, exact, runs):
+    """
+    Calculates the root mean squared error of a randomized pricing function.
+
+    :param function: function which takes a seed and returns the price
+    :param exact: the exact price
+    :param runs: the number of seeds
+
+    :return: the root mean squared error
+    """
+
+    return math.sqrt(np.mean([(function(seed) - exact) ** 2 for seed in range(runs)]))
+
+
+def main(sizes=(1024, 4096, 16384, 65536, 262144), runs=20, n_steps=32):
+    """
+    Prints the root mean squared error of both engines against the analytic price of a european call,
+    and the standard errors and times of an asian call with n_steps time steps.
+
+    :param sizes: the numbers of paths
+    :param runs: the number of seeds per size of the european call
+    :param n_steps: the number of time steps of the asian call
+    """
+
+    option = Option()
+    method = MonteCarlo(option)
+    exact = Analytic(option).calculate()
+
+    print("european call, RMSE over {runs} seeds".format(runs=runs))
+    print("paths\t\tMC\t\tQMC\t\tratio")
+
+    for n in sizes:
+        error_mc = rmse(lambda seed: method.calculate(n, seed=seed), exact, runs)
+        error_qmc = rmse(lambda seed: method.calculate_qmc(n, seed=seed)[0], exact, runs)
+
+        print("{n}\t\t{mc:.2e}\t{qmc:.2e}\t{x:.0f}x".format(n=n, mc=error_mc, qmc=error_qmc, x=error_mc / error_qmc))
+
+    print("\nasian call with {n_steps} time steps, standard error and time".format(n_steps=n_steps))
+    print("paths\t\tMC\t\t\tQMC")
+
+    for n in sizes:
+        start = time.perf_counter()
+        error_mc = method.calculate_path_dependent('asian', n, n_steps, seed=0)[1]
+        time_mc = time.perf_counter() - start
+
+        start = time.perf_counter()
+        error_qmc = method.calculate_qmc(n, n_steps, 'asian', seed=0)[1]
+        time_qmc = time.perf_counter() - start
+
+        print("{n}\t\t{e_mc:.2e} ({t_mc:.2f} s)\t{e_qmc:.2e} ({t_qmc:.2f} s)".format(
+            n=n, e_mc=error_mc, t_mc=time_mc, e_qmc=error_qmc, t_qmc=time_qmc))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Compares plain Crank-Nicolson with the Rannacher start-up and the cell-averaged payoff for few time steps.
+
+Run from the repository root:  python -m benchmarks.rannacher
+"""
+
+import numpy as np
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from finite_difference_methods.CrankNicolson import CrankNicolson
+
+
+def main(n_s=400, sizes=(5, 10, 20, 40, 80)):
+    """
+    Prints the largest errors of the prices and the gammas of an at-the-money put on a range of spot prices.
+
+    :param n_s: the number of spot prices of the sinh grid
+    :param sizes: the numbers of time steps
+    """
+
+    option = Option()
+    option.set_option(40, 40, 0.5, 0.05, 0, 0.3, 'put')
+
+    spots = np.linspace(30, 50, 41)
+    exact = Analytic.calculate_greeks_batch(spots, 40, 0.5, 0.05, 0, 0.3, 'put')
+
+    modes = (('plain', 0, False), ('rannacher', 2, False), ('rannacher + smoothing', 2, True))
+
+    print("max error of price / gamma")
+    print("n_t\t" + "\t\t".join(name for name, _, _ in modes))
+
+    for n_t in sizes:
+        row = list()
+
+        for _, rannacher_steps, smoothing in modes:
+            method = CrankNicolson(option, grid='sinh', rannacher_steps=rannacher_steps, smoothing=smoothing)
+            price, _, gamma = method.calculate_spots(spots, n_s, n_t, 'n')
+
+            row.append("{p:.1e} / {g:.1e}".format(p=np.abs(price - exact['price']).max(),
+                                                   g=np.abs(gamma - exact['gamma']).max()))
+
+        print("{n_t}\t".format(n_t=n_t) + "\t".join(row))
+
+
+if __name__ == '__main__':
+    main()
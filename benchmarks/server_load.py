@@ -0,0 +1,92 @@
+"""
+Runs concurrent clients against a local pricing server and prints its latency and throughput without
+batching (max_batch=1) and for several batching windows. Every client waits for the answer before it sends
+its next request.
+
+Run from the repository root:  python -m benchmarks.server_load
+"""
+
+import asyncio
+import json
+import time
+
+from general_classes.PricingServer import PricingServer
+
+
+async def client(port, requests):
+    """
+    Sends requests one by one over one connection.
+
+    :param port: the port of the server
+    :param requests: list of dictionaries with the requests
+    """
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+    for request in requests:
+        writer.write((json.dumps(request) + '\n').encode())
+        await writer.drain()
+        await reader.readline()
+
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load(window, max_batch, clients, requests, engine, workers):
+    """
+    Starts a server, sends the requests from concurrent clients and returns the metrics of the server.
+
+    :param window: the batching window of the server in seconds
+    :param max_batch: the largest batch of the server
+    :param clients: the number of concurrent clients
+    :param requests: the number of requests per client
+    :param engine: the engine of the requests
+    :param workers: the number of worker processes of the server
+
+    Returns: Tuple
+        - seconds - the wall time until all answers arrived
+        - metrics - the metrics of the server
+    """
+
+    server = PricingServer(window, max_batch, workers)
+    await server.start(port=0)
+    port = server.server.sockets[0].getsockname()[1]
+
+    batches = [[dict(id=i, engine=engine, s=30 + (i % 20), k=40, t=0.5, r=0.05, d=0, v=0.3, kind='put', n=100,
+                     exercise='american' if 'binomial_tree' == engine else 'european')
+                for i in range(0, requests)] for j in range(0, clients)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(port, batch) for batch in batches])
+    seconds = time.perf_counter() - start
+
+    metrics = server.get_metrics()
+    server.close()
+
+    return seconds, metrics
+
+
+def main(settings=((0.0, 1), (0.0, 4096), (0.002, 4096), (0.02, 4096)), clients=32, requests=50, workers=None):
+    """
+    Prints the metrics of the server for several settings.
+
+    :param settings: pairs of the batching window in seconds and the largest batch
+    :param clients: the number of concurrent clients
+    :param requests: the number of requests per client
+    :param workers: the number of worker processes of the server (None...number of CPUs)
+    """
+
+    for engine in ('analytic', 'binomial_tree'):
+        print(engine)
+        print("window\tmax\tbatches\tmean batch\tp50 [ms]\tp99 [ms]\trequests/s")
+
+        for window, max_batch in settings:
+            seconds, metrics = asyncio.run(load(window, max_batch, clients, requests, engine, workers))
+
+            print("{w:.3f}\t{max_batch}\t{b}\t{m:.1f}\t\t{p50:.2f}\t\t{p99:.2f}\t\t{rate:.0f}".format(
+                w=window, max_batch=max_batch, b=metrics['batches'], m=metrics['mean_batch'],
+                p50=1000 * metrics['p50'], p99=1000 * metrics['p99'], rate=metrics['requests'] / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+"""
+Times and profiles every pricing engine on a ladder of resolutions and compares the results with a baseline.
+
+Run from the repository root:
+    python -m benchmarks.suite run --output baseline.json
+    python -m benchmarks.suite run --output current.json --compare baseline.json
+    python -m benchmarks.suite compare baseline.json current.json --threshold 0.2
+
+compare (and run with --compare) exits with status 1 if a case got slower, needs more memory or has a larger
+error than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from other_methods.MonteCarlo import MonteCarlo
+from other_methods.BinomialTree import BinomialTree
+from other_methods.TrinomialTree import TrinomialTree
+from finite_difference_methods.ExplicitFD import ExplicitFD
+from finite_difference_methods.ImplicitFD import ImplicitFD
+from finite_difference_methods.CrankNicolson import CrankNicolson
+
+# the errors are only compared above this absolute value
+error_floor = 1e-12
+
+# fast cases are repeated within one timing until it takes at least this long (in seconds)
+min_timing = 0.05
+
+
+def get_option():
+    """
+    Returns the reference option of the suite. The spot price is small enough for the explicit method
+    to be stable with the default number of spot prices.
+
+    :return: Option
+    """
+
+    option = Option()
+    option.set_option(2, 2, 1, 0.1, 0, 0.2, 'call')
+
+    return option
+
+
+def get_cases(quick=False):
+    """
+    Returns the benchmark cases.
+
+    :param quick: if true, only the smallest resolution of every engine is run
+
+    :return: list of tuples with the engine name, the resolution and a function which returns the price
+    """
+
+    option = get_option()
+    batch = np.full(100000, 2.0)
+
+    ladders = {
+        'analytic': (1,),
+        'analytic_batch': (100000,),
+        'monte_carlo': (10000, 100000, 1000000),
+        'binomial_tree': (100, 1000, 5000),
+        'trinomial_tree': (100, 1000, 5000),
+        'explicit_fd': (100, 1000, 5000),
+        'implicit_fd': (100, 1000, 5000),
+        'crank_nicolson': (100, 1000, 5000),
+    }
+
+    functions = {
+        'analytic': lambda n: Analytic(option).calculate(),
+        'analytic_batch': lambda n: Analytic.calculate_batch(batch[:n], 2, 1, 0.1, 0, 0.2, 'call')[0],
+        'monte_carlo': lambda n: MonteCarlo(option).calculate(n, seed=0),
+        'binomial_tree': lambda n: BinomialTree(option).calculate(n),
+        'trinomial_tree': lambda n: TrinomialTree(option).calculate(n),
+        'explicit_fd': lambda n: ExplicitFD(option).calculate(1, n, 'n'),
+        'implicit_fd': lambda n: ImplicitFD(option).calculate(1, n, 'n'),
+        'crank_nicolson': lambda n: CrankNicolson(option).calculate(1, n, 'n'),
+    }
+
+    cases = list()
+
+    for name, ladder in ladders.items():
+        for n in ladder[:1] if quick else ladder:
+            cases.append((name, n, functions[name]))
+
+    return cases
+
+
+def measure(function, n, repeat):
+    """
+    Runs one case. The time is the minimum over the repetitions, where fast cases are run several times per
+    repetition (like timeit). The peak memory is measured in an extra run, because tracemalloc slows the code
+    down.
+
+    :param function: function which returns the price
+    :param n: the resolution
+    :param repeat: the number of timed repetitions
+
+    :return: dictionary with price, seconds and peak_memory (bytes)
+    """
+
+    number = 1
+
+    while True:
+        start = time.perf_counter()
+        for i in range(0, number):
+            price = function(n)
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= min_timing:
+            break
+
+        number *= 2
+
+    seconds = elapsed / number
+
+    for i in range(1, repeat):
+        start = time.perf_counter()
+        for j in range(0, number):
+            function(n)
+        seconds = min(seconds, (time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    function(n)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'price': float(price), 'seconds': seconds, 'peak_memory': peak_memory}
+
+
+def run(repeat=3, quick=False):
+    """
+    Runs all cases and measures time, peak memory and the error against the analytic price.
+
+    :param repeat: the number of timed repetitions per case
+    :param quick: if true, only the smallest resolution of every engine is run
+
+    :return: dictionary with the metadata and the results (keyed by 'engine/n')
+    """
+
+    exact = Analytic(get_option()).calculate()
+    results = dict()
+
+    for name, n, function in get_cases(quick):
+        result = measure(function, n, repeat)
+        result['engine'] = name
+        result['n'] = n
+        result['error'] = abs(result['price'] - exact)
+
+        key = "{name}/{n}".format(name=name, n=n)
+        results[key] = result
+
+        print("{key:<28}{t:>12.3e} s{m:>12.1f} KiB{e:>12.2e}".format(
+            key=key, t=result['seconds'], m=result['peak_memory'] / 1024, e=result['error']))
+
+    meta = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeat': repeat,
+    }
+
+    return {'meta': meta, 'results': results}
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Compares two runs and prints the ratios of time and memory of every common case.
+
+    :param baseline: the results of the baseline run (as returned by run)
+    :param current: the results of the current run
+    :param threshold: the allowed relative increase of time, memory and error
+
+    :return: list with the keys and metrics of the regressions
+    """
+
+    regressions = list()
+
+    print("{key:<28}{t:>10}{m:>10}{e:>14}".format(key='case', t='time', m='memory', e='error'))
+
+    for key, new in current['results'].items():
+        old = baseline['results'].get(key)
+
+        if old is None:
+            print("{key:<28}{msg:>34}".format(key=key, msg='new'))
+            continue
+
+        time_ratio = new['seconds'] / old['seconds'] if old['seconds'] > 0 else 1.0
+        memory_ratio = new['peak_memory'] / old['peak_memory'] if old['peak_memory'] > 0 else 1.0
+        flags = list()
+
+        if time_ratio > 1 + threshold:
+            flags.append('seconds')
+        if memory_ratio > 1 + threshold:
+            flags.append('peak_memory')
+        if new['error'] > old['error'] * (1 + threshold) + error_floor:
+            flags.append('error')
+
+        regressions.extend((key, flag) for flag in flags)
+
+        print("{key:<28}{t:>9.2f}x{m:>9.2f}x{e:>14.2e}  {flags}".format(
+            key=key, t=time_ratio, m=memory_ratio, e=new['error'], flags=' '.join(flags)))
+
+    for key in baseline['results']:
+        if key not in current['results']:
+            print("{key:<28}{msg:>34}".format(key=key, msg='missing'))
+
+    return regressions
+
+
+def load(path):
+    """
+    Loads the results of a run.
+
+    :param path: path of the JSON file
+
+    :return: dictionary with the metadata and the results
+    """
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def main(argv=None):
+    """
+    The command line interface of the suite.
+
+    :param argv: the arguments (None...sys.argv)
+
+    :return: the exit status (1 if regressions were found)
+    """
+
+    parser = argparse.ArgumentParser(description="benchmark suite of the pricing engines")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_run = commands.add_parser('run', help="run the suite")
+    parser_run.add_argument('--output', help="write the results to this JSON file")
+    parser_run.add_argument('--repeat', type=int, default=3, help="timed repetitions per case")
+    parser_run.add_argument('--quick', action='store_true', help="only the smallest resolutions")
+    parser_run.add_argument('--compare', metavar='BASELINE', help="compare the results with this JSON file")
+    parser_run.add_argument('--threshold', type=float, default=0.2, help="allowed relative increase")
+
+    parser_compare = commands.add_parser('compare', help="compare two result files")
+    parser_compare.add_argument('baseline')
+    parser_compare.add_argument('current')
+    parser_compare.add_argument('--threshold', type=float, default=0.2, help="allowed relative increase")
+
+    args = parser.parse_args(argv)
+
+    if 'run' == args.command:
+        current = run(args.repeat, args.quick)
+
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(current, file, indent=2)
+
+        if not args.compare:
+            return 0
+
+        baseline = load(args.compare)
+    else:
+        baseline = load(args.baseline)
+        current = load(args.current)
+
+    regressions = compare(baseline, current, args.threshold)
+
+    if regressions:
+        print("\n{n} regression(s) beyond {p:.0f}%".format(n=len(regressions), p=100 * args.threshold))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# the modules import each other from the root of the repository (e.g. general_classes.Option), so pytest
+# adds the root to sys.path by finding this file
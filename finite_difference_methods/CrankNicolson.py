@@ -1,46 +1,130 @@
 import math
 
+import numpy as np
+
 from finite_difference_methods.FiniteDifference import FiniteDifference
+from finite_difference_methods.TridiagonalSystem import TridiagonalSystem
+from general_classes.Exercise import Exercise
+from general_classes.Instrumentation import Instrumentation
 
 
 class CrankNicolson(FiniteDifference):
 
-    def __init__(self, stock):
+    def __init__(self, stock, solver='lapack', grid='uniform', smax=None, concentration=0.1, rannacher_steps=0,
+                 smoothing=False):
         """
         Solves the Black–Scholes equation using the Crank-Nicolson method.
 
         :param stock: The stock for witch the future price should be calculated. (class Stock)
+        :param solver: The linear solver backend. (lapack...cached LU factorization, tridag...reference)
+        :param grid: The spacing of the spot prices.
+            (uniform...equidistant, sinh...concentrated around the strike and the spot price)
+        :param smax: The far boundary of the grid. (None...see FiniteDifference.get_parameters)
+        :param concentration: The width of the finely spaced region of the sinh grid relative to the strike price.
+        :param rannacher_steps: The number of first time steps which are replaced by two implicit half steps each.
+            (Rannacher start-up, damps the oscillations caused by the kink of the payoff; at most all time steps)
+        :param smoothing: If true, the initial values are the averages of the payoff over the cells of the grid.
         """
 
         self.stock = stock
-
-    def calculate(self, n_s, n_t, bc):
+        self.solver = solver
+        self.grid = grid
+        self.smax = smax
+        self.concentration = concentration
+        self.rannacher_steps = rannacher_steps
+        self.smoothing = smoothing
+
+    def calculate(self, n_s, n_t, bc, exercise='european'):
         """
         Calculates the price after t time using the Crank-Nicolson method.
 
         :param n_s: the number of spot prices
         :param n_t: the number of time steps
         :param bc: the type of border conditions (d...Dirichlet, n...von Neumann)
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
 
         :return: the price after t time
         """
 
+        grid = self.calculate_grid(n_s, n_t, bc, exercise)
+
+        if grid is False:
+            return False
+
+        return float(self.get_price(grid[0], grid[1]))
+
+    @Instrumentation.guard
+    def calculate_grid(self, n_s, n_t, bc, exercise='european', strikes=None):
+        """
+        Calculates the prices at every spot price of the grid using the Crank-Nicolson method.
+
+        :param n_s: the number of spot prices
+        :param n_t: the number of time steps
+        :param bc: the type of border conditions (d...Dirichlet, n...von Neumann)
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
+        :param strikes: an array of strike prices, which are all solved at once (instead of the strike of the stock)
+
+        Returns: Tuple (False if the parameters are not valid)
+            - s - the spot prices of the grid
+            - f - the prices at the spot prices after t time (one column per strike price if strikes are given)
+        """
+
+        timer = Instrumentation.start('CrankNicolson', 'grid')
+
         s, k, t, r, q, sigma = self.get_parameters_form_stock(self.stock)
-        smax, n_s, dt, ds = self.get_parameters(n_s, n_t, s, t, sigma)
-        fm, g, a, b, c, as_, bs, cs = self.get_arrays(n_s, 8)
-        f = self.get_initial_array(n_s, ds, k, self.stock.kind)
+        smax, n_s, dt, ds = self.get_parameters(n_s, n_t, s, t, sigma, k)
+        nodes = self.get_nodes(n_s, smax, ds, k, s)
+
+        if nodes is False:
+            return False
+
+        timer = Instrumentation.switch(timer, 'CrankNicolson', 'payoff')
+
+        if strikes is not None:
+            k = np.asarray(strikes, dtype=float)
+
+        fm, g = self.get_arrays(n_s, 2, k.size if np.ndim(k) else None)
+        f = self.get_initial_array(n_s, ds, k, self.stock.kind, nodes)
+
+        if f is False:
+            return False
+
+        steps = Exercise.get_exercise_steps(exercise, n_t, t)
+
+        if steps is False:
+            return False
+
+        if self.rannacher_steps < 0:
+            print("Error: the number of Rannacher steps can not be negative")
+            return False
+
+        # with more Rannacher steps than time steps every step is a Rannacher step
+        rannacher_steps = min(self.rannacher_steps, n_t)
+
+        kind = self.stock.kind
+        payoff = f.copy()
+
+        if self.smoothing:
+            f = self.get_cell_averages(nodes, k, kind)
+
+        timer = Instrumentation.switch(timer, 'CrankNicolson', 'coefficients')
 
         sigma_sq = sigma * sigma
         # q = 0  # possible improvement
 
-        for j in range(0, n_s + 1):
-            a[j] = -.25 * j * dt * (j * sigma_sq - r)
-            b[j] = 1 + .5 * dt * (j * j * sigma_sq + r)
-            c[j] = -.25 * j * dt * (j * sigma_sq + r)
+        if 'uniform' == self.grid:
+            j = np.arange(0, n_s + 1)
+            a = -.25 * j * dt * (j * sigma_sq - r)
+            b = 1 + .5 * dt * (j * j * sigma_sq + r)
+            c = -.25 * j * dt * (j * sigma_sq + r)
 
-            as_[j] = .25 * j * dt * (j * sigma_sq - r)
-            bs[j] = 1 - .5 * dt * (j * j * sigma_sq + r)
-            cs[j] = .25 * j * dt * (j * sigma_sq + r)
+            as_ = .25 * j * dt * (j * sigma_sq - r)
+            bs = 1 - .5 * dt * (j * j * sigma_sq + r)
+            cs = .25 * j * dt * (j * sigma_sq + r)
+        else:
+            l, m, u = self.get_operator(nodes, r, q, sigma)
+            a, b, c = -.5 * dt * l, 1 - .5 * dt * m, -.5 * dt * u
+            as_, bs, cs = .5 * dt * l, 1 + .5 * dt * m, .5 * dt * u
 
         if "n" == bc:
             # von Neumann implicit
@@ -66,59 +150,96 @@ class CrankNicolson(FiniteDifference):
             b[n_s] = 1
             a[n_s] = 0
 
+        # the matrix is the same for every time step, so it is factorized only once
+        timer = Instrumentation.switch(timer, 'CrankNicolson', 'factorization')
+        system = TridiagonalSystem(a, b, c, n_s + 1, self.solver)
+
+        Instrumentation.record('CrankNicolson', 'n_s', n_s)
+        Instrumentation.record('CrankNicolson', 'n_t', n_t)
+        Instrumentation.count('CrankNicolson', 'time_steps', n_t)
+        timer = Instrumentation.switch(timer, 'CrankNicolson', 'time_stepping')
+
+        # Rannacher start-up: an implicit half step solves (I - dt/2 L) f_new = f, which is the implicit
+        # matrix of the Crank-Nicolson step, so the factorization is reused.
+        for i in range(n_t, n_t - rannacher_steps, -1):
+            for half in (1, 2):
+                tau = t - dt * i + dt * (half - 1) / 2
+                exercise_half = steps[i - 1] and 2 == half
+
+                g[:] = f
+
+                if 'd' == bc and 'call' == self.stock.kind:
+                    g[0] = 0
+                    g[n_s] = smax - k * math.exp(-r * tau)
+                elif 'd' == bc and 'put' == self.stock.kind:
+                    g[0] = k * math.exp(-r * tau)
+                    g[n_s] = 0
+                elif 'm' == bc:
+                    g[0] = f[0] * math.exp(r * dt / 2)
+                    g[n_s] = f[n_s] * math.exp(r * dt / 2)
+                elif bc not in ('n', ''):
+                    return False
+
+                self.solve_step(system, g, fm, payoff, kind, exercise_half)
+
+                if 'd' == bc and 'put' == self.stock.kind and exercise_half:
+                    fm[0] = np.maximum(fm[0], payoff[0])
+
+                f, fm = fm, f
+
+        # the explicit half of the step only acts on the inner spot prices
+        as_, bs, cs = as_[1:n_s], bs[1:n_s], cs[1:n_s]
+
+        if 2 == f.ndim:
+            as_, bs, cs = as_[:, np.newaxis], bs[:, np.newaxis], cs[:, np.newaxis]
+
         if 'n' == bc:  # von Neumann Condition
-            for i in range(n_t, 0, -1):
+            for i in range(n_t - rannacher_steps, 0, -1):
                 g[0] = f[0] * b[0] + f[1] * c[0]  # The border conditions need to be set manually.
                 g[n_s] = f[n_s] * b[n_s] + f[n_s - 1] * a[n_s]
-                for j in range(1, n_s):
-                    g[j] = as_[j] * f[j - 1] + bs[j] * f[j] + cs[j] * f[j + 1]
-                self.tridag(a, b, c, g, fm, n_s + 1)
-                for j in range(0, n_s + 1):
-                    f[j] = fm[j]
+                g[1:n_s] = as_ * f[:n_s - 1] + bs * f[1:n_s] + cs * f[2:]
+                self.solve_step(system, g, fm, payoff, kind, steps[i - 1])
+                f, fm = fm, f
         elif 'd' == bc and 'call' == self.stock.kind:  # Dirichlet Condition for call
-            for i in range(n_t, 0, -1):
+            for i in range(n_t - rannacher_steps, 0, -1):
                 g[0] = 0
                 g[n_s] = smax - k * math.exp(-r * (t - dt * i))
-                for j in range(1, n_s):
-                    g[j] = as_[j] * f[j - 1] + bs[j] * f[j] + cs[j] * f[j + 1]
-                self.tridag(a, b, c, g, fm, n_s + 1)
-                for j in range(1, n_s):
-                    f[j] = fm[j]
+                g[1:n_s] = as_ * f[:n_s - 1] + bs * f[1:n_s] + cs * f[2:]
+                self.solve_step(system, g, fm, payoff, kind, steps[i - 1])
+                f[1:n_s] = fm[1:n_s]
                 f[0] = 0
                 f[n_s] = smax - k * math.exp(-r * (t - dt * i))
         elif 'd' == bc and 'put' == self.stock.kind:  # Dirichlet Condition for call
-            for i in range(n_t, 0, -1):
+            for i in range(n_t - rannacher_steps, 0, -1):
                 g[0] = k * math.exp(-r * (t - dt * i))
                 g[n_s] = 0
-                for j in range(1, n_s):
-                    g[j] = as_[j] * f[j - 1] + bs[j] * f[j] + cs[j] * f[j + 1]
-                self.tridag(a, b, c, g, fm, n_s + 1)
-                for j in range(1, n_s):
-                    f[j] = fm[j]
+                g[1:n_s] = as_ * f[:n_s - 1] + bs * f[1:n_s] + cs * f[2:]
+                self.solve_step(system, g, fm, payoff, kind, steps[i - 1])
+                f[1:n_s] = fm[1:n_s]
                 f[0] = k * math.exp(-r * (t - dt * i))
                 f[n_s] = 0
+                if steps[i - 1]:
+                    f[0] = np.maximum(f[0], payoff[0])
         elif 'm' == bc:  # my own solution
-            for i in range(n_t, 0, -1):
+            for i in range(n_t - rannacher_steps, 0, -1):
                 g[0] = f[0] * math.exp(r * dt)
                 g[n_s] = f[n_s] * math.exp(r * dt)
-                for j in range(1, n_s):
-                    g[j] = as_[j] * f[j - 1] + bs[j] * f[j] + cs[j] * f[j + 1]
-                self.tridag(a, b, c, g, fm, n_s + 1)
-                for j in range(1, n_s):
-                    f[j] = fm[j]
+                g[1:n_s] = as_ * f[:n_s - 1] + bs * f[1:n_s] + cs * f[2:]
+                self.solve_step(system, g, fm, payoff, kind, steps[i - 1])
+                f[1:n_s] = fm[1:n_s]
                 f[0] = f[0] * math.exp(r * dt)
                 f[n_s] = f[n_s] * math.exp(r * dt)
         elif '' == bc:  # no discounting
-            for i in range(n_t, 0, -1):
+            for i in range(n_t - rannacher_steps, 0, -1):
                 g[0] = f[0]
                 g[n_s] = f[n_s]
-                for j in range(1, n_s):
-                    g[j] = as_[j] * f[j - 1] + bs[j] * f[j] + cs[j] * f[j + 1]
-                self.tridag(a, b, c, g, fm, n_s + 1)
-                for j in range(0, n_s + 1):
-                    f[j] = fm[j]
+                g[1:n_s] = as_ * f[:n_s - 1] + bs * f[1:n_s] + cs * f[2:]
+                self.solve_step(system, g, fm, payoff, kind, steps[i - 1])
+                f, fm = fm, f
 
         else:
             return False
 
-        return f[int(n_s / 2)]
+        Instrumentation.stop(timer)
+
+        return nodes, f
@@ -1,18 +1,29 @@
 import math
 
+import numpy as np
+
 from finite_difference_methods.FiniteDifference import FiniteDifference
+from general_classes.Instrumentation import Instrumentation
 
 
 class ExplicitFD(FiniteDifference):
 
-    def __init__(self, stock):
+    def __init__(self, stock, grid='uniform', smax=None, concentration=0.1):
         """
         Solves the Black–Scholes equation using an explicit finite difference method.
 
         :param stock: the stock for witch the future price should be calculated. (class Stock)
+        :param grid: the spacing of the spot prices.
+            (uniform...equidistant, sinh...concentrated around the strike and the spot price)
+        :param smax: the far boundary of the grid. (None...see FiniteDifference.get_parameters)
+        :param concentration: the width of the finely spaced region of the sinh grid relative to the strike price.
+            (the time step has to be small enough for the finest spacing)
         """
 
         self.stock = stock
+        self.grid = grid
+        self.smax = smax
+        self.concentration = concentration
 
     def calculate(self, n_s, n_t, bc):
         """
@@ -25,22 +36,68 @@ class ExplicitFD(FiniteDifference):
         :return: The price of the stock after t time.
         """
 
+        grid = self.calculate_grid(n_s, n_t, bc)
+
+        if grid is False:
+            return False
+
+        return float(self.get_price(grid[0], grid[1]))
+
+    @Instrumentation.guard
+    def calculate_grid(self, n_s, n_t, bc, strikes=None):
+        """
+        Calculates the prices at every spot price of the grid using an explicit finite difference method.
+
+        :param n_s: the number of starting prices.
+        :param n_t: the number of time steps.
+        :param bc:  the type of border conditions. (d...Dirichlet, n...von Neumann)
+        :param strikes: an array of strike prices, which are all solved at once (instead of the strike of the stock)
+
+        Returns: Tuple (False if the parameters are not valid)
+            - s - the spot prices of the grid
+            - f - the prices at the spot prices after t time (one column per strike price if strikes are given)
+        """
+
+        timer = Instrumentation.start('ExplicitFD', 'grid')
+
         s, k, t, r, q, sigma = self.get_parameters_form_stock(self.stock)
-        smax, n_s, dt, ds = self.get_parameters(n_s, n_t, s, t, sigma)
-        fm, a, b, c = self.get_arrays(n_s, 4)
-        f = self.get_initial_array(n_s, ds, k, self.stock.kind)
+        smax, n_s, dt, ds = self.get_parameters(n_s, n_t, s, t, sigma, k)
+        nodes = self.get_nodes(n_s, smax, ds, k, s)
+
+        if nodes is False:
+            return False
+
+        timer = Instrumentation.switch(timer, 'ExplicitFD', 'payoff')
+
+        if strikes is not None:
+            k = np.asarray(strikes, dtype=float)
+
+        fm, tmp = self.get_arrays(n_s, 2, k.size if np.ndim(k) else None)
+        f = self.get_initial_array(n_s, ds, k, self.stock.kind, nodes)
+
+        if f is False:
+            return False
+
+        timer = Instrumentation.switch(timer, 'ExplicitFD', 'coefficients')
 
-        q = 0  # possible addition
         sigma_sq = sigma * sigma
 
-        for j in range(0, n_s + 1):
-            a[j] = 1 / (1 + r * dt) * (-.5 * (r - q) * j * dt + 0.5 * sigma_sq * j * j * dt)
-            b[j] = 1 / (1 + r * dt) * (1 - sigma_sq * j * j * dt)
-            c[j] = 1 / (1 + r * dt) * (.5 * (r - q) * j * dt + 0.5 * sigma_sq * j * j * dt)
+        if 'uniform' == self.grid:
+            q = 0  # possible addition
+            j = np.arange(0, n_s + 1)
+            a = 1 / (1 + r * dt) * (-.5 * (r - q) * j * dt + 0.5 * sigma_sq * j * j * dt)
+            b = 1 / (1 + r * dt) * (1 - sigma_sq * j * j * dt)
+            c = 1 / (1 + r * dt) * (.5 * (r - q) * j * dt + 0.5 * sigma_sq * j * j * dt)
+        else:
+            # the interest is discounted implicitly like on the uniform grid
+            l, m, u = self.get_operator(nodes, r, q, sigma)
+            a = 1 / (1 + r * dt) * dt * l
+            b = 1 / (1 + r * dt) * (1 + dt * (m + r))
+            c = 1 / (1 + r * dt) * dt * u
 
-            # a[j] = .5*j*dt*(j*sigma_sq-r)
-            # b[j] = 1-dt*(j*j*sigma_sq +r)
-            # c[j] = .5*j*dt*(j*sigma_sq+r)
+        # a = .5*j*dt*(j*sigma_sq-r)
+        # b = 1-dt*(j*j*sigma_sq +r)
+        # c = .5*j*dt*(j*sigma_sq+r)
 
         # von Neumann
         b[0] = b[0] + 2 * a[0]
@@ -49,54 +106,82 @@ class ExplicitFD(FiniteDifference):
         b[n_s] = b[n_s] + 2 * c[n_s]
         a[n_s] = a[n_s] - c[n_s]
 
+        Instrumentation.record('ExplicitFD', 'n_s', n_s)
+        Instrumentation.record('ExplicitFD', 'n_t', n_t)
+        Instrumentation.count('ExplicitFD', 'time_steps', n_t)
+        timer = Instrumentation.switch(timer, 'ExplicitFD', 'time_stepping')
+
+        # the stencil only acts on the inner spot prices
+        a_in, b_in, c_in, tmp = a[1:n_s], b[1:n_s], c[1:n_s], tmp[1:n_s]
+
+        if 2 == f.ndim:
+            a_in, b_in, c_in = a_in[:, np.newaxis], b_in[:, np.newaxis], c_in[:, np.newaxis]
+
         # the switch is not yet tested.
 
         if bc == 'n':  # von Neumann Condition
             for i in range(n_t, 0, -1):
                 fm[0] = f[0] * b[0] + f[1] * c[0]
                 fm[n_s] = f[n_s] * b[n_s] + f[n_s - 1] * a[n_s]
-                for j in range(1, n_s):
-                    fm[j] = a[j] * f[j - 1] + b[j] * f[j] + c[j] * f[j + 1]
-                for j in range(0, n_s + 1):
-                    f[j] = fm[j]
+                self.apply_stencil(f, fm, a_in, b_in, c_in, tmp)
+                f, fm = fm, f
 
         elif 'd' == bc and 'call' == self.stock.kind:  # Dirichlet Condition for call
             for i in range(n_t, 0, -1):
                 fm[n_s] = smax - k * math.exp(-r * (t - dt * i))
                 fm[0] = 0
-                for j in range(1, n_s):
-                    fm[j] = a[j] * f[j - 1] + b[j] * f[j] + c[j] * f[j + 1]
-                for j in range(0, n_s + 1):
-                    f[j] = fm[j]
+                self.apply_stencil(f, fm, a_in, b_in, c_in, tmp)
+                f, fm = fm, f
 
         elif 'd' == bc and 'put' == self.stock.kind:  # Dirichlet Condition for call
             for i in range(n_t, 0, -1):
                 fm[n_s] = 0
                 fm[0] = k * math.exp(-r * (t - dt * i))
-                for j in range(1, n_s):
-                    fm[j] = a[j] * f[j - 1] + b[j] * f[j] + c[j] * f[j + 1]
-                for j in range(0, n_s + 1):
-                    f[j] = fm[j]
+                self.apply_stencil(f, fm, a_in, b_in, c_in, tmp)
+                f, fm = fm, f
 
         elif 'm' == bc:  # my own solution
             for i in range(n_t, 0, -1):
                 fm[0] = f[0] * math.exp(r * dt)
                 fm[n_s] = f[n_s] * math.exp(r * dt)
-                for j in range(1, n_s):
-                    fm[j] = a[j] * f[j - 1] + b[j] * f[j] + c[j] * f[j + 1]
-                for j in range(0, n_s + 1):
-                    f[j] = fm[j]
+                self.apply_stencil(f, fm, a_in, b_in, c_in, tmp)
+                f, fm = fm, f
 
         elif '' == bc:  # no discounting
             for i in range(n_t, 0, -1):
                 fm[0] = f[0]
                 fm[n_s] = f[n_s]
-                for j in range(1, n_s):
-                    fm[j] = a[j] * f[j - 1] + b[j] * f[j] + c[j] * f[j + 1]
-                for j in range(0, n_s + 1):
-                    f[j] = fm[j]
+                self.apply_stencil(f, fm, a_in, b_in, c_in, tmp)
+                f, fm = fm, f
 
         else:
             return False
 
-        return f[int(n_s / 2)]
+        Instrumentation.stop(timer)
+
+        return nodes, f
+
+    @staticmethod
+    def apply_stencil(f, fm, a, b, c, tmp):
+        """
+        Calculates fm[j] = a[j]*f[j-1] + b[j]*f[j] + c[j]*f[j+1] for all inner spot prices.
+
+        :param f: the values of the current time step.
+        :param fm: the values of the next time step. (the inner values are overwritten)
+        :param a: first coefficients of the inner spot prices
+        :param b: second coefficients of the inner spot prices
+        :param c: third coefficients of the inner spot prices
+        :param tmp: a buffer of the size of the inner spot prices
+
+        :return: the values of the next time step fm
+        """
+
+        inner = fm[1:-1]
+
+        np.multiply(a, f[:-2], out=inner)
+        np.multiply(b, f[1:-1], out=tmp)
+        inner += tmp
+        np.multiply(c, f[2:], out=tmp)
+        inner += tmp
+
+        return fm
@@ -1,8 +1,30 @@
 import math
 
+import numpy as np
+
+from general_classes.Instrumentation import Instrumentation
+
 
 class FiniteDifference:
 
+    # the linear solver backend of the implicit methods (see TridiagonalSystem.backends)
+    solver = 'lapack'
+
+    # the spacing of the spot prices (uniform...equidistant, sinh...concentrated around the strike and the spot price)
+    grid = 'uniform'
+
+    # the far boundary of the grid (None...see get_parameters)
+    smax = None
+
+    # the width of the finely spaced region of the sinh grid relative to the strike price
+    concentration = 0.1
+
+    # the smallest number of spot prices of the sinh grid (fewer nodes cannot resolve the payoff)
+    min_ns = 20
+
+    # the grids of get_nodes
+    grids = ('uniform', 'sinh')
+
     @staticmethod
     def get_parameters_form_stock(stock):
         """
@@ -28,26 +50,39 @@ class FiniteDifference:
 
         return s, k, t, r, q, sigma
 
-    def get_parameters(self, n_s, n_t, s, t, sigma):
+    def get_parameters(self, n_s, n_t, s, t, sigma, k=None):
         """
         Calculates important parameters.
+        The uniform grid always takes the number of spot prices from calculate_ns. The sinh grid uses n_s
+        if it is a positive number, because it needs far fewer spot prices for the same accuracy, but at
+        least min_ns.
 
         :param n_s: number of spot prices
         :param n_t: number of times
         :param s: spot price
         :param t: time
         :param sigma: volatility
+        :param k: strike price (needed for the default far boundary of the sinh grid)
 
         Returns: Tuple
-            - smax - maximum spot price
+            - smax - maximum spot price (2 * s for the uniform grid and max(s, k) * exp(5 * sigma * sqrt(t))
+              for the sinh grid, unless smax is set)
             - n_s - corrected number of spot prices
             - dt - length of one time step
-            - ds - the spacing of the spot prices
+            - ds - the (mean) spacing of the spot prices
         """
 
-        smax = 2 * s
+        if self.smax is not None:
+            smax = self.smax
+        elif 'sinh' == self.grid:
+            smax = max(s, s if k is None else k) * math.exp(5 * sigma * math.sqrt(t))
+        else:
+            smax = 2 * s
 
-        if n_s is not False:
+        if 'sinh' == self.grid and n_s:
+            n_s = max(n_s, self.min_ns)
+            n_s = n_s + (n_s % 2)
+        elif n_s is not False:
             n_s = self.calculate_ns(n_t, smax, sigma, t)
             n_s = n_s + (n_s % 2)
         else:
@@ -56,55 +91,297 @@ class FiniteDifference:
         n_s = int(n_s)
 
         dt = t / n_t
-        ds = 2 * s / n_s
+        ds = smax / n_s
 
         return smax, n_s, dt, ds
 
+    def get_nodes(self, n_s, smax, ds, k, s=None):
+        """
+        Calculates the spot prices of the grid. The sinh grid maps equidistant points x to the spot prices S
+        with x = sum(asinh((S - p) / c)) over the points p of concentration (the strike price, where the payoff
+        has its kink, and the spot price, where the price is read off) and c = concentration * k. With one point
+        this is S = k + c * sinh(x), otherwise the map is inverted numerically.
+
+        :param n_s: number of spot prices
+        :param smax: maximum spot price
+        :param ds: the spacing of the uniform grid
+        :param k: the strike price around which the sinh grid is concentrated
+        :param s: the spot price around which the sinh grid is also concentrated (None...only the strike price)
+
+        :return: array with the n_s + 1 spot prices (False if the grid is unknown)
+        """
+
+        if 'uniform' == self.grid:
+            return np.arange(0, n_s + 1) * ds
+        elif 'sinh' != self.grid:
+            return False
+
+        c = self.concentration * k
+
+        if s is None or s == k or not 0 < s < smax:
+            x = np.linspace(math.asinh(-k / c), math.asinh((smax - k) / c), n_s + 1)
+            nodes = k + c * np.sinh(x)
+        else:
+            points = np.array([k, s], dtype=float)
+
+            def get_x(spots):
+                return np.arcsinh((np.asarray(spots)[..., np.newaxis] - points) / c).sum(axis=-1)
+
+            x = np.linspace(get_x(0.0), get_x(smax), n_s + 1)
+
+            # the map is increasing, so it is inverted by bisection (60 halvings reach the machine precision)
+            lower = np.zeros(n_s + 1)
+            upper = np.full(n_s + 1, float(smax))
+
+            for i in range(0, 60):
+                middle = (lower + upper) / 2
+                below = get_x(middle) < x
+                lower = np.where(below, middle, lower)
+                upper = np.where(below, upper, middle)
+
+            nodes = (lower + upper) / 2
+
+        nodes[0] = 0
+        nodes[n_s] = smax
+
+        return nodes
+
+    def is_centered(self):
+        """
+        Checks whether the spot price is the middle node of the grid, which is the case for the uniform grid
+        with the default far boundary.
+
+        :return: true if the spot price is the middle node
+        """
+
+        return 'uniform' == self.grid and self.smax is None
+
+    def get_price(self, nodes, f):
+        """
+        Reads the price at the spot price off the grid. It is interpolated if it is not a node.
+
+        :param nodes: the spot prices of the grid
+        :param f: the values of the grid (one column per strike price if it is two dimensional)
+
+        :return: the price (one per strike price if f is two dimensional)
+        """
+
+        if self.is_centered():
+            return f[int((len(nodes) - 1) / 2)]
+
+        return self.interpolate(nodes, f, self.stock.s)[0]
+
     @staticmethod
-    def get_arrays(size, number):
+    def get_operator(nodes, r, q, sigma):
+        """
+        Discretises the Black–Scholes operator 0.5 * sigma^2 * S^2 * V_SS + (r - q) * S * V_S - r * V
+        with central differences on an arbitrary grid. The spacings outside of the grid are mirrored, so the
+        border rows can be folded with the von Neumann condition like on the uniform grid.
+
+        :param nodes: the spot prices of the grid
+        :param r: risk-free interest rate
+        :param q: dividend
+        :param sigma: volatility
+
+        Returns: Tuple
+            - l - the coefficients of V[j - 1]
+            - m - the coefficients of V[j]
+            - u - the coefficients of V[j + 1]
+        """
+
+        h = np.diff(nodes)
+        h_m = np.concatenate(([h[0]], h))
+        h_p = np.concatenate((h, [h[-1]]))
+
+        diffusion = .5 * sigma * sigma * nodes * nodes
+        drift = (r - q) * nodes
+
+        l = (2 * diffusion - drift * h_p) / (h_m * (h_m + h_p))
+        m = -2 * diffusion / (h_m * h_p) + drift * (h_p - h_m) / (h_m * h_p) - r
+        u = (2 * diffusion + drift * h_m) / (h_p * (h_m + h_p))
+
+        return l, m, u
+
+    @staticmethod
+    def get_arrays(size, number, columns=None):
         """
         Gets a defined number of arrays in a defined size.
 
         :param size: size of the array
         :param number: number of arrays
+        :param columns: if given, every array has this number of columns (one per strike price)
 
         :return: the arrays inside a tuple.
         """
 
+        shape = size + 1 if columns is None else (size + 1, columns)
+
         ret = list()
         for i in range(0, number):
-            ret.append([0] * (size + 1))
+            ret.append(np.zeros(shape))
 
         return tuple(ret)
 
     @staticmethod
-    def get_initial_array(size, ds, k, kind):
+    def get_initial_array(size, ds, k, kind, nodes=None):
         """
         Initializes the arrays with the initial conditions.
 
         :param size: the size of the arrays.
         :param ds: the spacing of the spot prices.
-        :param k: the strike price
+        :param k: the strike price or an array of strike prices
         :param kind: the kind of the option (put or call)
+        :param nodes: the spot prices of a non-uniform grid (instead of the spacing)
 
-        :return: the array with the initial conditions.
+        :return: the array with the initial conditions. (one column per strike price if k is an array)
         """
 
-        f = [0] * (size + 1)
+        s = np.arange(0, size + 1) * ds if nodes is None else np.asarray(nodes)
+
+        if np.ndim(k):
+            s = s[:, np.newaxis]
 
         if 'call' == kind:
-            for j in range(0, size + 1):
-                s = j * ds
-                f[j] = max(s - k, 0)  # here you can omit the loop.
+            f = np.maximum(s - k, 0)
         elif 'put' == kind:
-            for j in range(0, size + 1):
-                s = j * ds
-                f[j] = max(k - s, 0)  # here you can omit the loop.
+            f = np.maximum(k - s, 0)
         else:
             return False
 
         return f
 
+    @staticmethod
+    def get_cell_averages(nodes, k, kind):
+        """
+        Averages the payoff over the cells of the grid, which reach halfway to the neighbouring spot prices.
+        This removes the dependence of the error on the position of the strike price between two nodes.
+
+        :param nodes: the spot prices of the grid
+        :param k: the strike price or an array of strike prices
+        :param kind: the kind of the option (put or call)
+
+        :return: the array with the averaged payoffs. (one column per strike price if k is an array)
+        """
+
+        nodes = np.asarray(nodes, dtype=float)
+        middle = (nodes[1:] + nodes[:-1]) / 2
+
+        lower = np.concatenate(([nodes[0]], middle))
+        upper = np.concatenate((middle, [nodes[-1]]))
+
+        if np.ndim(k):
+            lower, upper = lower[:, np.newaxis], upper[:, np.newaxis]
+
+        # integrals of the payoff from the lower to the upper end of the cells
+        if 'call' == kind:
+            integral = (np.maximum(upper - k, 0) ** 2 - np.maximum(lower - k, 0) ** 2) / 2
+        elif 'put' == kind:
+            integral = (np.maximum(k - lower, 0) ** 2 - np.maximum(k - upper, 0) ** 2) / 2
+        else:
+            return False
+
+        return integral / (upper - lower)
+
+    def calculate_spots(self, spots, n_s, n_t, bc, **kwargs):
+        """
+        Solves the PDE once and interpolates the prices, deltas and gammas at a list of spot prices.
+
+        :param spots: the spot prices. (inside of the grid, which reaches from 0 to smax)
+        :param n_s: the number of spot prices
+        :param n_t: the number of time steps
+        :param bc: the type of border conditions (d...Dirichlet, n...von Neumann)
+        :param kwargs: further arguments of calculate_grid (e.g. strikes)
+
+        Returns: Tuple (False if the grid could not be calculated)
+            - price - the prices at the spot prices (strikes x spots if strikes are given)
+            - delta - the first derivatives by the spot price
+            - gamma - the second derivatives by the spot price
+        """
+
+        grid = self.calculate_grid(n_s, n_t, bc, **kwargs)
+
+        if grid is False:
+            return False
+
+        return self.interpolate(grid[0], grid[1], spots)
+
+    def calculate_strikes(self, strikes, n_s, n_t, bc, **kwargs):
+        """
+        Calculates the prices of a whole ladder of strike prices with one solve.
+
+        :param strikes: the strike prices
+        :param n_s: the number of spot prices
+        :param n_t: the number of time steps
+        :param bc: the type of border conditions (d...Dirichlet, n...von Neumann)
+        :param kwargs: further arguments of calculate_grid
+
+        :return: array with the price after t time for every strike price
+        """
+
+        grid = self.calculate_grid(n_s, n_t, bc, strikes=strikes, **kwargs)
+
+        if grid is False:
+            return False
+
+        return self.get_price(grid[0], grid[1])
+
+    @staticmethod
+    def interpolate(s, f, spots):
+        """
+        Interpolates the grid quadratically through the three nodes around every spot price.
+        The derivatives of the interpolating parabola are the delta and the gamma.
+
+        :param s: the spot prices of the grid
+        :param f: the values of the grid (one column per strike price if it is two dimensional)
+        :param spots: the spot prices at which is interpolated.
+
+        Returns: Tuple (nan outside of the grid)
+            - price - the prices at the spot prices (strikes x spots if f is two dimensional)
+            - delta - the first derivatives by the spot price
+            - gamma - the second derivatives by the spot price
+        """
+
+        s = np.asarray(s, dtype=float)
+        spots = np.asarray(spots, dtype=float)
+
+        # the node closest to the spot price is the middle one
+        i = np.clip(np.searchsorted(s, spots), 1, len(s) - 1)
+        i = np.where(spots - s[i - 1] < s[i] - spots, i - 1, i)
+        i = np.clip(i, 1, len(s) - 2)
+
+        x0, x1, x2 = s[i - 1], s[i], s[i + 1]
+        d0, d1, d2 = spots - x0, spots - x1, spots - x2
+
+        # Lagrange polynomials and their first and second derivatives
+        w0 = 1 / ((x0 - x1) * (x0 - x2))
+        w1 = 1 / ((x1 - x0) * (x1 - x2))
+        w2 = 1 / ((x2 - x0) * (x2 - x1))
+
+        weights = (
+            (w0 * d1 * d2, w1 * d0 * d2, w2 * d0 * d1),
+            (w0 * (d1 + d2), w1 * (d0 + d2), w2 * (d0 + d1)),
+            (2 * w0, 2 * w1, 2 * w2),
+        )
+
+        outside = (spots < s[0]) | (spots > s[-1])
+        ret = list()
+
+        for l0, l1, l2 in weights:
+            if 2 == np.ndim(f):
+                l0, l1, l2 = l0[..., np.newaxis], l1[..., np.newaxis], l2[..., np.newaxis]
+
+            value = l0 * f[i - 1] + l1 * f[i] + l2 * f[i + 1]
+
+            if 2 == np.ndim(f):
+                value = np.where(outside[..., np.newaxis], np.nan, value)
+                value = np.moveaxis(value, -1, 0)
+            else:
+                value = np.where(outside, np.nan, value)
+
+            ret.append(value)
+
+        return tuple(ret)
+
     @staticmethod
     def calculate_ns(n_t, smax, volatility, t):
         return int(math.log(smax) / (volatility * math.sqrt(3 * (t / n_t))))
@@ -125,6 +402,8 @@ class FiniteDifference:
         :return: the solution vector x
         """
 
+        Instrumentation.count('FiniteDifference', 'tridag')
+
         gam = [0] * n
 
         if d2[0] == 0.0:
@@ -142,7 +421,90 @@ class FiniteDifference:
 
             x[j] = (b[j] - d1[j] * x[j - 1]) / bet
 
-        for j in range(n - 2, 0, -1):
+        for j in range(n - 2, -1, -1):
             x[j] -= gam[j + 1] * x[j + 1]
 
         return x
+
+    @staticmethod
+    def brennan_schwartz(d1, d2, d3, b, x, n, payoff, kind):
+        """
+        Solves the linear complementarity problem Ax>=b, x>=payoff of an early exercise with the
+        Brennan-Schwartz algorithm. It is the algorithm of tridag, where the back substitution starts inside
+        the exercise region and every value is raised to the payoff on the way.
+        The input vector is not modified.
+
+        :param d1: first diagonal
+        :param d2: second diagonal
+        :param d3: third diagonal
+        :param b: the inhomogeneity.
+        :param x: the vector for which is solved for.
+        :param n: the size of the system.
+        :param payoff: the values of an immediate exercise.
+        :param kind: the kind of the option (put or call)
+
+        :return: the solution vector x
+        """
+
+        gam = [0] * n
+
+        if 'call' == kind:
+            # exercise region at high spot prices: eliminate upwards, substitute downwards
+            bet = d2[0]
+            x[0] = b[0] / bet
+
+            for j in range(1, n):
+                gam[j] = d3[j - 1] / bet
+                bet = d2[j] - d1[j] * gam[j]
+
+                if bet == 0.0:
+                    return False
+
+                x[j] = (b[j] - d1[j] * x[j - 1]) / bet
+
+            x[n - 1] = max(x[n - 1], payoff[n - 1])
+            for j in range(n - 2, -1, -1):
+                x[j] = max(x[j] - gam[j + 1] * x[j + 1], payoff[j])
+
+        elif 'put' == kind:
+            # exercise region at low spot prices: eliminate downwards, substitute upwards
+            bet = d2[n - 1]
+            x[n - 1] = b[n - 1] / bet
+
+            for j in range(n - 2, -1, -1):
+                gam[j] = d1[j + 1] / bet
+                bet = d2[j] - d3[j] * gam[j]
+
+                if bet == 0.0:
+                    return False
+
+                x[j] = (b[j] - d3[j] * x[j + 1]) / bet
+
+            x[0] = max(x[0], payoff[0])
+            for j in range(1, n):
+                x[j] = max(x[j] - gam[j - 1] * x[j - 1], payoff[j])
+
+        else:
+            return False
+
+        return x
+
+    def solve_step(self, system, b, x, payoff, kind, exercise):
+        """
+        Solves the system of one time step. If the option can be exercised at this step, the early exercise
+        is included with the Brennan-Schwartz algorithm, otherwise the factorized system is solved.
+
+        :param system: the tri-diagonal system. (class TridiagonalSystem)
+        :param b: the inhomogeneity.
+        :param x: the vector for which is solved for.
+        :param payoff: the values of an immediate exercise.
+        :param kind: the kind of the option (put or call)
+        :param exercise: true if the option can be exercised at this step
+
+        :return: the solution vector x
+        """
+
+        if exercise:
+            return system.solve_projected(b, x, payoff, kind)
+
+        return system.solve(b, x)
@@ -1,42 +1,112 @@
 import math
+
+import numpy as np
+
 from finite_difference_methods.FiniteDifference import FiniteDifference
+from finite_difference_methods.TridiagonalSystem import TridiagonalSystem
+from general_classes.Exercise import Exercise
+from general_classes.Instrumentation import Instrumentation
 
 
 class ImplicitFD(FiniteDifference):
 
-    def __init__(self, stock):
+    def __init__(self, stock, solver='lapack', grid='uniform', smax=None, concentration=0.1):
         """
         Solves the Black–Scholes equation using an implicit finite difference method.
 
         :param stock: The stock for witch the future price should be calculated. (class Stock)
+        :param solver: The linear solver backend. (lapack...cached LU factorization, tridag...reference)
+        :param grid: The spacing of the spot prices.
+            (uniform...equidistant, sinh...concentrated around the strike and the spot price)
+        :param smax: The far boundary of the grid. (None...see FiniteDifference.get_parameters)
+        :param concentration: The width of the finely spaced region of the sinh grid relative to the strike price.
         """
 
         self.stock = stock
+        self.solver = solver
+        self.grid = grid
+        self.smax = smax
+        self.concentration = concentration
 
-    def calculate(self, n_s, n_t, bc):
+    def calculate(self, n_s, n_t, bc, exercise='european'):
         """
         Calculates the price using an implicit finite difference method.
 
         :param n_s: the number of starting prices.
         :param n_t: the number of time steps.
         :param bc:  the type of border conditions. (d...Dirichlet, n...von Neumann)
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
 
         :return: the price of the stock after t time.
         """
 
+        grid = self.calculate_grid(n_s, n_t, bc, exercise)
+
+        if grid is False:
+            return False
+
+        return float(self.get_price(grid[0], grid[1]))
+
+    @Instrumentation.guard
+    def calculate_grid(self, n_s, n_t, bc, exercise='european', strikes=None):
+        """
+        Calculates the prices at every spot price of the grid using an implicit finite difference method.
+
+        :param n_s: the number of starting prices.
+        :param n_t: the number of time steps.
+        :param bc:  the type of border conditions. (d...Dirichlet, n...von Neumann)
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
+        :param strikes: an array of strike prices, which are all solved at once (instead of the strike of the stock)
+
+        Returns: Tuple (False if the parameters are not valid)
+            - s - the spot prices of the grid
+            - f - the prices at the spot prices after t time (one column per strike price if strikes are given)
+        """
+
+        timer = Instrumentation.start('ImplicitFD', 'grid')
+
         s, k, t, r, q, sigma = self.get_parameters_form_stock(self.stock)
-        smax, n_s, dt, ds = self.get_parameters(n_s, n_t, s, t, sigma)
-        fm, a, b, c = self.get_arrays(n_s, 4)
-        f = self.get_initial_array(n_s, ds, k, self.stock.kind)
+        smax, n_s, dt, ds = self.get_parameters(n_s, n_t, s, t, sigma, k)
+        nodes = self.get_nodes(n_s, smax, ds, k, s)
+
+        if nodes is False:
+            return False
+
+        timer = Instrumentation.switch(timer, 'ImplicitFD', 'payoff')
+
+        if strikes is not None:
+            k = np.asarray(strikes, dtype=float)
+
+        fm = self.get_arrays(n_s, 1, k.size if np.ndim(k) else None)[0]
+        f = self.get_initial_array(n_s, ds, k, self.stock.kind, nodes)
+
+        if f is False:
+            return False
+
+        steps = Exercise.get_exercise_steps(exercise, n_t, t)
+
+        if steps is False:
+            return False
+
+        kind = self.stock.kind
+        payoff = f.copy()
 
         # print(n_s)
         # q = 0 # possible addition
 
         # tri-diagonal matrix initialisation
-        for j in range(0, n_s + 1):
-            a[j] = .5 * dt * ((r - q) * j - sigma * sigma * j * j)
-            b[j] = 1 + sigma * sigma * j * j * dt + r * dt
-            c[j] = .5 * dt * (-(r - q) * j - sigma * sigma * j * j)
+        timer = Instrumentation.switch(timer, 'ImplicitFD', 'coefficients')
+
+        if 'uniform' == self.grid:
+            j = np.arange(0, n_s + 1)
+            a = .5 * dt * ((r - q) * j - sigma * sigma * j * j)
+            b = 1 + sigma * sigma * j * j * dt + r * dt
+            c = .5 * dt * (-(r - q) * j - sigma * sigma * j * j)
+        else:
+            l, m, u = self.get_operator(nodes, r, q, sigma)
+            a = -dt * l
+            b = 1 - dt * m
+            c = -dt * u
 
         if "n" == bc:
             # Von Neumann
@@ -55,40 +125,48 @@ class ImplicitFD(FiniteDifference):
             b[n_s] = 1
             a[n_s] = 0
 
+        # the matrix is the same for every time step, so it is factorized only once
+        timer = Instrumentation.switch(timer, 'ImplicitFD', 'factorization')
+        system = TridiagonalSystem(a, b, c, n_s + 1, self.solver)
+
+        Instrumentation.record('ImplicitFD', 'n_s', n_s)
+        Instrumentation.record('ImplicitFD', 'n_t', n_t)
+        Instrumentation.count('ImplicitFD', 'time_steps', n_t)
+        timer = Instrumentation.switch(timer, 'ImplicitFD', 'time_stepping')
+
         if 'n' == bc:  # Neumann Condition
             for i in range(n_t, 0, -1):
-                self.tridag(a, b, c, f, fm, n_s + 1)
-                for j in range(1, n_s):
-                    f[j] = fm[j]
+                self.solve_step(system, f, fm, payoff, kind, steps[i - 1])
+                f[1:n_s] = fm[1:n_s]
         elif 'd' == bc and 'call' == self.stock.kind:  # Dirichlet Condition for call
             for i in range(n_t, 0, -1):
-                self.tridag(a, b, c, f, fm, n_s + 1)
-                for j in range(1, n_s):
-                    f[j] = fm[j]
+                self.solve_step(system, f, fm, payoff, kind, steps[i - 1])
+                f[1:n_s] = fm[1:n_s]
                 f[n_s] = smax - k * math.exp(-r * (t - dt * i))
                 f[0] = 0
         elif 'd' == bc and 'put' == self.stock.kind:  # Dirichlet Condition for call
             for i in range(n_t, 0, -1):
-                self.tridag(a, b, c, f, fm, n_s + 1)
-                for j in range(1, n_s):
-                    f[j] = fm[j]
+                self.solve_step(system, f, fm, payoff, kind, steps[i - 1])
+                f[1:n_s] = fm[1:n_s]
                 f[n_s] = 0
                 f[0] = k * math.exp(-r * (t - dt * i))
+                if steps[i - 1]:
+                    f[0] = np.maximum(f[0], payoff[0])
         elif 'm' == bc:  # my own solution
             for i in range(n_t, 0, -1):
-                self.tridag(a, b, c, f, fm, n_s + 1)
-                for j in range(1, n_s):
-                    f[j] = fm[j]
+                self.solve_step(system, f, fm, payoff, kind, steps[i - 1])
+                f[1:n_s] = fm[1:n_s]
                 f[0] = f[0] * math.exp(r * dt)
                 f[n_s] = f[n_s] * math.exp(r * dt)
         elif '' == bc:  # no discounting
             for i in range(n_t, 0, -1):
-                self.tridag(a, b, c, f, fm, n_s + 1)
-                for j in range(0, n_s + 1):
-                    f[j] = fm[j]
+                self.solve_step(system, f, fm, payoff, kind, steps[i - 1])
+                f, fm = fm, f
                 # print(f)
 
         else:
             return False
 
-        return f[int(n_s / 2)]
+        Instrumentation.stop(timer)
+
+        return nodes, f
@@ -0,0 +1,227 @@
+import numpy as np
+from scipy.linalg import blas, lapack
+
+from finite_difference_methods.FiniteDifference import FiniteDifference
+from general_classes.Instrumentation import Instrumentation
+
+
+class TridiagonalSystem:
+
+    # available linear solver backends
+    backends = ('lapack', 'tridag')
+
+    def __init__(self, d1, d2, d3, n, backend='lapack'):
+        """
+        A tri-diagonal system of linear equations Ax=b, which is solved for many inhomogeneities b.
+        The matrix is factorized once and the factorization is reused for every solve.
+
+        :param d1: first diagonal
+        :param d2: second diagonal
+        :param d3: third diagonal
+        :param n: the size of the system.
+        :param backend: the linear solver. (lapack...LU factorization of LAPACK (?gttrf/?gttrs),
+            tridag...the pure-Python Thomas algorithm FiniteDifference.tridag, kept as reference)
+        """
+
+        if backend not in self.backends:
+            raise ValueError("unknown solver backend: {backend}".format(backend=backend))
+
+        self.d1 = d1
+        self.d2 = d2
+        self.d3 = d3
+        self.n = n
+        self.backend = backend
+        self.factorization = None
+        self.eliminations = {}
+
+        Instrumentation.count('TridiagonalSystem', 'factorizations')
+
+        if 'lapack' == backend:
+            dl, d, du, du2, ipiv, info = lapack.dgttrf(np.array(d1[1:n], dtype=float),
+                                                       np.array(d2[0:n], dtype=float),
+                                                       np.array(d3[0:n - 1], dtype=float))
+            if info != 0:
+                raise ValueError("the tri-diagonal matrix is singular")
+
+            self.factorization = (dl, d, du, du2, ipiv)
+
+    def solve(self, b, x):
+        """
+        Solves the system for the inhomogeneity b.
+        The input vector is not modified.
+
+        :param b: the inhomogeneity. (or one inhomogeneity per column)
+        :param x: the vector for which is solved for.
+
+        :return: the solution vector x
+        """
+
+        Instrumentation.count('TridiagonalSystem', 'solves')
+
+        if 'tridag' == self.backend:
+            return FiniteDifference.tridag(self.d1, self.d2, self.d3, b, x, self.n)
+
+        x[:] = lapack.dgttrs(*self.factorization, b)[0]
+
+        return x
+
+    def solve_projected(self, b, x, payoff, kind):
+        """
+        Solves the linear complementarity problem Ax>=b, x>=payoff of an early exercise with the
+        Brennan-Schwartz algorithm (see FiniteDifference.brennan_schwartz).
+        With the lapack backend the elimination, which only depends on the matrix, is done once per kind.
+        Every solve then consists of one bidiagonal solve and the projected substitution, which is vectorized
+        over the exercise and continuation regions (see substitute_projected).
+        The input vector is not modified.
+
+        :param b: the inhomogeneity. (or one inhomogeneity per column)
+        :param x: the vector for which is solved for.
+        :param payoff: the values of an immediate exercise.
+        :param kind: the kind of the option (put or call)
+
+        :return: the solution vector x
+        """
+
+        if 2 == np.ndim(b):
+            # every column (strike price) is an own problem
+            for column in range(0, b.shape[1]):
+                if self.solve_projected(b[:, column], x[:, column], payoff[:, column], kind) is False:
+                    return False
+            return x
+
+        Instrumentation.count('TridiagonalSystem', 'projected_solves')
+
+        if 'tridag' == self.backend:
+            return FiniteDifference.brennan_schwartz(self.d1, self.d2, self.d3, b, x, self.n, payoff, kind)
+
+        if kind not in self.eliminations:
+            elimination = self.get_elimination(kind)
+
+            if elimination is False:
+                return False
+
+            self.eliminations[kind] = elimination
+
+        ab, uplo, gam, band = self.eliminations[kind]
+
+        y = blas.dtbsv(1, ab, b, lower='L' == uplo)
+
+        if 'call' == kind:
+            # the call substitutes downwards, starting at the highest spot price, which is the substitution
+            # of the put on the reversed arrays
+            x[::-1] = self.substitute_projected(y[::-1], gam, band, payoff[::-1])
+        else:
+            x[:] = self.substitute_projected(y, gam, band, payoff)
+
+        return x
+
+    @staticmethod
+    def substitute_projected(y, gam, band, payoff):
+        """
+        Calculates x[j] = max(y[j] - gam[j] * x[j - 1], payoff[j]) for j = 0, ..., n - 1 (with x[-1] = 0).
+        The nodes alternate between runs where the payoff is taken (the exercise region) and runs where it is
+        not (the continuation region), and there are usually only one or two of each. The exercise runs are
+        found with one vectorized comparison each and every continuation run is one bidiagonal solve, so the
+        cost is that of a few vectorized passes instead of a Python loop over the nodes.
+
+        :param y: the values of the bidiagonal solve
+        :param gam: the factors of the substitution (in the order of the substitution)
+        :param band: the unit lower bidiagonal matrix with the subdiagonal gam[1:] in the banded storage of BLAS
+        :param payoff: the values of an immediate exercise
+
+        :return: array with x
+        """
+
+        n = len(y)
+        x = np.empty(n)
+
+        j = 0
+        previous = 0.0
+
+        while j < n:
+            if y[j] - gam[j] * previous <= payoff[j]:
+                # exercise run: the payoff is taken as long as the continuation from the payoff is not larger
+                above = y[j + 1:] - gam[j + 1:] * payoff[j:n - 1] > payoff[j + 1:]
+                first = int(above.argmax()) if len(above) else 0
+                end = j + 1 + first if len(above) and above[first] else n
+
+                x[j:end] = payoff[j:end]
+            else:
+                # continuation run: the recurrence without the payoff until it falls below the payoff
+                rhs = y[j:].copy()
+                rhs[0] -= gam[j] * previous
+                z = blas.dtbsv(1, band[:, j:], rhs, overwrite_x=True, lower=True, diag=True)
+
+                below = z < payoff[j:]
+                first = int(below.argmax())
+                end = j + first if below[first] else n
+
+                x[j:end] = z[:end - j]
+
+            j = end
+            previous = x[j - 1]
+
+        return x
+
+    def get_elimination(self, kind):
+        """
+        Eliminates one off-diagonal of the matrix in the order of the Brennan-Schwartz algorithm.
+
+        :param kind: the kind of the option (put or call)
+
+        Returns: Tuple (False if the matrix is singular or the kind is unknown)
+            - ab - the remaining bidiagonal matrix in the banded storage of BLAS/LAPACK
+            - uplo - 'L' if the remaining matrix is lower and 'U' if it is upper bidiagonal
+            - gam - the factors of the substitution (in the order of the substitution)
+            - band - the unit lower bidiagonal matrix of the substitution (see substitute_projected)
+        """
+
+        d1 = np.asarray(self.d1, dtype=float)
+        d2 = np.asarray(self.d2, dtype=float)
+        d3 = np.asarray(self.d3, dtype=float)
+        n = self.n
+
+        bet = [0.0] * n
+        gam = [0.0] * n
+
+        if 'call' == kind:
+            # eliminate the upper diagonal: x[j] = y[j] - gam[j] * x[j + 1]
+            bet[0] = d2[0]
+            for j in range(1, n):
+                if bet[j - 1] == 0.0:
+                    return False
+                gam[j - 1] = d3[j - 1] / bet[j - 1]
+                bet[j] = d2[j] - d1[j] * gam[j - 1]
+
+            ab = np.zeros((2, n))
+            ab[0] = bet
+            ab[1, :n - 1] = d1[1:n]
+            uplo = 'L'
+
+        elif 'put' == kind:
+            # eliminate the lower diagonal: x[j] = y[j] - gam[j] * x[j - 1]
+            bet[n - 1] = d2[n - 1]
+            for j in range(n - 2, -1, -1):
+                if bet[j + 1] == 0.0:
+                    return False
+                gam[j + 1] = d1[j + 1] / bet[j + 1]
+                bet[j] = d2[j] - d3[j] * gam[j + 1]
+
+            ab = np.zeros((2, n))
+            ab[1] = bet
+            ab[0, 1:] = d3[:n - 1]
+            uplo = 'U'
+
+        else:
+            return False
+
+        if 0.0 in bet:
+            return False
+
+        # the substitution of the call runs from the highest to the lowest spot price
+        gam = np.array(gam[::-1] if 'call' == kind else gam)
+
+        band = np.ones((2, n))
+        band[1, :n - 1] = gam[1:]
+
+        return ab, uplo, gam, band
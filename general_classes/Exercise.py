@@ -0,0 +1,40 @@
+import numpy as np
+
+
+class Exercise:
+
+    @staticmethod
+    def get_exercise_steps(exercise, n, t):
+        """
+        Determines at which time steps the option can be exercised before maturity.
+
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
+        :param n: the number of time steps
+        :param t: time
+
+        :return: boolean array of size n + 1 which is true at every time step i (time i * t / n) at which the
+            option can be exercised early. False if the exercise is not valid.
+        """
+
+        steps = np.zeros(n + 1, dtype=bool)
+
+        if 'european' == exercise:
+            return steps
+
+        if 'american' == exercise:
+            steps[:n] = True
+            return steps
+
+        if isinstance(exercise, str):
+            return False
+
+        times = np.asarray(exercise, dtype=float)
+
+        if 1 != times.ndim or np.any(np.diff(times) < 0) or np.any(times < 0) or np.any(times > t):
+            return False
+
+        # every exercise date is moved to the closest time step
+        steps[np.rint(times / t * n).astype(int)] = True
+        steps[n] = False  # exercising at maturity is already covered by the payoff
+
+        return steps
@@ -0,0 +1,287 @@
+import cProfile
+import functools
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+
+
+class Instrumentation:
+    """
+    An opt-in, process wide record of where the engines spend their time. While it is disabled every hook
+    returns after checking one class attribute, so the engines can call it unconditionally.
+    The engines record:
+        - phases - the wall time (and the allocation peak if memory is traced) of parts like the payoff,
+          the coefficients, the factorization or the time stepping, per engine
+        - counters - e.g. the number of tridiagonal solves
+        - values - e.g. the grid sizes
+    """
+
+    enabled = False
+    memory = False
+
+    # true if enable started tracemalloc (and disable has to stop it)
+    tracing = False
+
+    # the timers which were started but not yet stopped
+    running = list()
+
+    phases = dict()
+    counters = dict()
+    values = dict()
+
+    @classmethod
+    def enable(cls, memory=False):
+        """
+        Starts recording.
+
+        :param memory: if true, the allocation peaks of the phases are traced with tracemalloc (slow)
+        """
+
+        cls.enabled = True
+        cls.memory = memory
+
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            cls.tracing = True
+
+    @classmethod
+    def disable(cls):
+        """
+        Stops recording. The recorded data is kept until reset is called. tracemalloc is only stopped if
+        enable started it.
+        """
+
+        if cls.tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        cls.enabled = False
+        cls.memory = False
+        cls.tracing = False
+
+    @classmethod
+    def reset(cls):
+        """
+        Deletes the recorded data.
+        """
+
+        cls.phases = dict()
+        cls.counters = dict()
+        cls.values = dict()
+
+    @classmethod
+    def start(cls, engine, phase):
+        """
+        Starts timing a phase. Phases should not be nested, because every phase resets the allocation peak.
+
+        :param engine: the name of the engine
+        :param phase: the name of the phase
+
+        :return: the timer which has to be passed to stop (None if disabled)
+        """
+
+        if not cls.enabled:
+            return None
+
+        memory = 0
+
+        if cls.memory:
+            tracemalloc.reset_peak()
+            memory = tracemalloc.get_traced_memory()[0]
+
+        timer = engine, phase, time.perf_counter(), memory
+        cls.running.append(timer)
+
+        return timer
+
+    @classmethod
+    def stop(cls, timer):
+        """
+        Stops timing a phase and records it. A timer which was already stopped is ignored.
+
+        :param timer: the timer returned by start
+        """
+
+        if timer is None:
+            return
+
+        for i in range(len(cls.running) - 1, -1, -1):
+            if cls.running[i] is timer:
+                del cls.running[i]
+                break
+        else:
+            return
+
+        seconds = time.perf_counter() - timer[2]
+
+        stats = cls.phases.get(timer[:2])
+
+        if stats is None:
+            stats = {'calls': 0, 'seconds': 0.0, 'min': float('inf'), 'max': 0.0, 'peak_memory': 0}
+            cls.phases[timer[:2]] = stats
+
+        stats['calls'] += 1
+        stats['seconds'] += seconds
+        stats['min'] = min(stats['min'], seconds)
+        stats['max'] = max(stats['max'], seconds)
+
+        if cls.memory and tracemalloc.is_tracing():
+            stats['peak_memory'] = max(stats['peak_memory'], tracemalloc.get_traced_memory()[1] - timer[3])
+
+    @classmethod
+    def switch(cls, timer, engine, phase):
+        """
+        Stops timing a phase and starts timing the next one.
+
+        :param timer: the timer of the current phase (None...no phase is timed)
+        :param engine: the name of the engine
+        :param phase: the name of the next phase
+
+        :return: the timer of the next phase
+        """
+
+        cls.stop(timer)
+
+        return cls.start(engine, phase)
+
+    @classmethod
+    def guard(cls, function):
+        """
+        Decorator for the functions of the engines which stops every phase the function started and did not
+        stop itself, e.g. because it returned early or raised an exception.
+
+        :param function: the function
+
+        :return: the decorated function
+        """
+
+        @functools.wraps(function)
+        def guarded(*arguments, **keywords):
+            depth = len(cls.running)
+
+            try:
+                return function(*arguments, **keywords)
+            finally:
+                while len(cls.running) > depth:
+                    cls.stop(cls.running[-1])
+
+        return guarded
+
+    @classmethod
+    def count(cls, engine, name, n=1):
+        """
+        Increases a counter.
+
+        :param engine: the name of the engine
+        :param name: the name of the counter
+        :param n: the increment
+        """
+
+        if not cls.enabled:
+            return
+
+        cls.counters[(engine, name)] = cls.counters.get((engine, name), 0) + n
+
+    @classmethod
+    def record(cls, engine, name, value):
+        """
+        Records a value like a grid size. The last and the largest value are kept.
+
+        :param engine: the name of the engine
+        :param name: the name of the value
+        :param value: the value
+        """
+
+        if not cls.enabled:
+            return
+
+        last, largest = cls.values.get((engine, name), (value, value))
+        cls.values[(engine, name)] = value, max(largest, value)
+
+    @classmethod
+    def get_report(cls):
+        """
+        Returns the recorded data.
+
+        :return: dictionary with lists of the phases, counters and values (one dictionary per entry)
+        """
+
+        phases = [dict(engine=engine, phase=phase, **stats) for (engine, phase), stats in cls.phases.items()]
+        counters = [{'engine': engine, 'name': name, 'count': n} for (engine, name), n in cls.counters.items()]
+        values = [{'engine': engine, 'name': name, 'last': last, 'max': largest}
+                  for (engine, name), (last, largest) in cls.values.items()]
+
+        return {'phases': phases, 'counters': counters, 'values': values}
+
+    @classmethod
+    def log(cls, logger=None, level=logging.INFO):
+        """
+        Writes every entry of the report as one JSON line to a logger.
+
+        :param logger: the logger (None...the logger 'numeric_option_pricing')
+        :param level: the logging level
+        """
+
+        if logger is None:
+            logger = logging.getLogger('numeric_option_pricing')
+
+        for kind, entries in cls.get_report().items():
+            for entry in entries:
+                logger.log(level, json.dumps(dict(kind=kind, **entry)))
+
+    @classmethod
+    def export_json(cls, path):
+        """
+        Writes the report to a JSON file.
+
+        :param path: path of the file
+        """
+
+        with open(path, 'w') as file:
+            json.dump(cls.get_report(), file, indent=2)
+
+    @staticmethod
+    def profile(function, *arguments, path=None, sort='cumulative'):
+        """
+        Runs a function under cProfile.
+
+        :param function: the function
+        :param arguments: the arguments of the function
+        :param path: if given, the profile is written to this file (readable by pstats, snakeviz, ...)
+        :param sort: the sort key of the returned statistics
+
+        Returns: Tuple
+            - ret - the return value of the function
+            - stats - the pstats.Stats of the run
+        """
+
+        profiler = cProfile.Profile()
+        ret = profiler.runcall(function, *arguments)
+
+        if path is not None:
+            profiler.dump_stats(path)
+
+        return ret, pstats.Stats(profiler).sort_stats(sort)
+
+    @classmethod
+    def get_table(cls):
+        """
+        Returns a table of the recorded phases, counters and values.
+
+        :return: string with the report
+        """
+
+        msg = "phase\t\t\t\t\tcalls\tseconds\t\tpeak memory\n"
+
+        for (engine, phase), stats in sorted(cls.phases.items()):
+            msg += "{name:<40}{calls}\t{s:.3e}\t{m}\n".format(
+                name=engine + '.' + phase, calls=stats['calls'], s=stats['seconds'], m=stats['peak_memory'])
+
+        for (engine, name), n in sorted(cls.counters.items()):
+            msg += "{name:<40}{n}\n".format(name=engine + '.' + name, n=n)
+
+        for (engine, name), (last, largest) in sorted(cls.values.items()):
+            msg += "{name:<40}{last} (max {largest})\n".format(name=engine + '.' + name, last=last, largest=largest)
+
+        return msg
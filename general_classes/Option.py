@@ -1,9 +1,4 @@
-import math
-
-import numpy as np
-from matplotlib import pyplot as plt
-from scipy.stats import norm
-import random
+from general_classes.PathGenerator import PathGenerator
 
 
 class Option:
@@ -71,32 +66,18 @@ class Option:
 
         self.s = s
 
-    def generate_random_stock_price_path(self, n):
+    def generate_random_stock_price_path(self, n, seed=None):
         """
         Generates a random walk of the stock to which the option is bound. Up to the time t.
+        The path is an exact geometric Brownian motion (see PathGenerator).
 
         :param n: the number of time steps.
+        :param seed: the seed (or numpy.random.Generator) for the random numbers
 
         :return: array with the stock prices at each time step
         """
 
-        s = self.s
-        t = self.t
-        r = self.r
-        q = self.d
-        sigma = self.v
-
-        f = [0] * (n + 1)
-        dt = t / n
-
-        for i in range(0, n):
-            f[i] = s
-            ds = (r - q) * dt * s + sigma * math.sqrt(dt) * s * norm.ppf(random.uniform(0, 1))
-            s = s + ds
-
-        f[n] = s
-
-        return f
+        return PathGenerator(self).generate(1, n, seed)[0]
 
     def plot_random_stock_price_path(self, n):
         """
@@ -107,22 +88,10 @@ class Option:
         :return: plot
         """
 
-        f = self.generate_random_stock_price_path(n)
-        idx = np.zeros_like(f)
-
-        for i in range(0, len(idx)):
-            idx[i] = i
-
-
-        plt.rcParams['figure.dpi'] = 150
-        plt.plot(idx, f)
+        from general_classes.Plotting import Plotting
 
-        plt.xlabel("time steps")
-        plt.ylabel("stock price")
-
-
-        plt.show()
-        plt.close()
+        f = self.generate_random_stock_price_path(n)
+        Plotting.plot_stock_price_path(f)
 
     def __str__(self):
         """
@@ -0,0 +1,215 @@
+import numpy as np
+
+from general_classes.OptionView import OptionView
+
+
+class OptionBook:
+
+    # the rows of data
+    fields = ('s', 'k', 't', 'r', 'd', 'v', 'call')
+
+    def __init__(self, data, fdm_factor=25):
+        """
+        A compact struct-of-arrays container for many options. All parameters live in one (7, n) float
+        array with the rows of OptionBook.fields, where the row 'call' is 1 for calls and 0 for puts.
+        Slicing returns views which share the memory of the book.
+
+        :param data: array of shape (7, n) (it is not copied, so memory maps stay memory maps)
+        :param fdm_factor: the Fdm Factor of all options
+        """
+
+        if 2 != np.ndim(data) or len(self.fields) != np.shape(data)[0]:
+            raise ValueError("data has to be of shape ({rows}, n)".format(rows=len(self.fields)))
+
+        self.data = data
+        self.fdm_factor = fdm_factor
+
+    @classmethod
+    def from_arrays(cls, s, k, t, r, d, v, kind, fdm_factor=25):
+        """
+        Creates a book from the parameters. All parameters are broadcast against each other.
+
+        :param s: spot prices
+        :param k: strike prices
+        :param t: times
+        :param r: risk-free interest rates
+        :param d: dividends
+        :param v: volatilities
+        :param kind: 'call'/'put' strings or booleans (True...call, False...put)
+        :param fdm_factor: the Fdm Factor of all options
+
+        :return: OptionBook
+        """
+
+        kind = np.asarray(kind)
+
+        if kind.dtype.kind in 'US':
+            if not np.all((kind == 'call') | (kind == 'put')):
+                raise ValueError("kind has to be 'call' or 'put'")
+            kind = kind == 'call'
+
+        columns = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (s, k, t, r, d, v, kind)))
+        data = np.empty((len(cls.fields),) + np.shape(columns[0]), dtype=float)
+
+        for row, values in enumerate(columns):
+            data[row] = values
+
+        return cls(data.reshape(len(cls.fields), -1), fdm_factor)
+
+    @classmethod
+    def from_options(cls, options):
+        """
+        Creates a book from Option objects.
+
+        :param options: list of Option objects
+
+        :return: OptionBook
+        """
+
+        options = list(options)
+
+        if not options:
+            return cls(np.empty((len(cls.fields), 0)))
+
+        s, k, t, r, d, v, kind = zip(*((o.s, o.k, o.t, o.r, o.d, o.v, o.kind) for o in options))
+
+        return cls.from_arrays(s, k, t, r, d, v, kind, options[0].fdm_factor)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r', fdm_factor=25):
+        """
+        Loads a book which was saved with save. By default the file is memory mapped and read only,
+        so only the touched parts are read from the disk.
+
+        :param path: path of the .npy file
+        :param mmap_mode: the mode of numpy.load (None...read the whole file into memory)
+        :param fdm_factor: the Fdm Factor of all options
+
+        :return: OptionBook
+        """
+
+        return cls(np.load(path, mmap_mode=mmap_mode), fdm_factor)
+
+    def save(self, path):
+        """
+        Saves the book as .npy file.
+
+        :param path: path of the file
+        """
+
+        np.save(path, self.data)
+
+    # parameters
+    # --------------------------------------
+    @property
+    def s(self):
+        return self.data[0]
+
+    @property
+    def k(self):
+        return self.data[1]
+
+    @property
+    def t(self):
+        return self.data[2]
+
+    @property
+    def r(self):
+        return self.data[3]
+
+    @property
+    def d(self):
+        return self.data[4]
+
+    @property
+    def v(self):
+        return self.data[5]
+
+    @property
+    def kind(self):
+        return self.data[6]
+
+    def get_parameters(self):
+        """
+        Returns the parameters in the order of the batch methods (e.g. Analytic.calculate_batch).
+        All arrays are views of the book.
+
+        Returns: Tuple
+            - s - spot prices
+            - k - strike prices
+            - t - times
+            - r - risk-free interest rates
+            - d - dividends
+            - v - volatilities
+            - kind - 1 for calls and 0 for puts
+        """
+
+        return tuple(self.data)
+
+    def get_valid(self):
+        """
+        Checks which options are in the domain of the models: all parameters are finite and the spot prices,
+        strike prices, times and volatilities are positive.
+
+        :return: boolean array, true where the option is valid
+        """
+
+        s, k, t, r, d, v, call = self.data
+
+        return np.isfinite(self.data).all(axis=0) & (s > 0) & (k > 0) & (t > 0) & (v > 0)
+
+    # selection
+    # --------------------------------------
+    def filter_kind(self, kind):
+        """
+        Returns the calls or the puts of the book. If they are stored in one block (e.g. after
+        sort_by_kind) the result is a view, otherwise a copy.
+
+        :param kind: 'call' or 'put'
+
+        :return: OptionBook (False if the kind is unknown)
+        """
+
+        if kind not in ('call', 'put'):
+            return False
+
+        index = np.flatnonzero(self.data[6] == ('call' == kind))
+
+        if 0 == len(index):
+            return self[0:0]
+
+        if index[-1] - index[0] + 1 == len(index):
+            return self[index[0]:index[-1] + 1]
+
+        return self[index]
+
+    def sort_by_kind(self):
+        """
+        Returns a copy of the book with all calls in front of all puts, so filter_kind returns views.
+
+        :return: OptionBook
+        """
+
+        return self[np.argsort(-self.data[6], kind='stable')]
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def __getitem__(self, index):
+        """
+        An integer gives an OptionView of one option, a slice gives a book which shares the memory and
+        index arrays or masks give a book with a copy.
+        """
+
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("option index out of range")
+            return OptionView(self, index)
+
+        return OptionBook(self.data[:, index], self.fdm_factor)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield OptionView(self, index)
@@ -0,0 +1,86 @@
+def column(row):
+    """
+    Creates a property which reads and writes one parameter of an OptionView.
+
+    :param row: the row of the parameter in OptionBook.data
+
+    :return: property
+    """
+
+    def getter(self):
+        return float(self.book.data[row, self.index])
+
+    def setter(self, value):
+        self.book.data[row, self.index] = value
+
+    return property(getter, setter)
+
+
+class OptionView:
+
+    __slots__ = ('book', 'index')
+
+    def __init__(self, book, index):
+        """
+        A view of one option of an OptionBook with the interface of Option, so every engine which takes an
+        Option also takes an OptionView. Changing the view changes the book.
+
+        :param book: the OptionBook
+        :param index: the index of the option in the book
+        """
+
+        self.book = book
+        self.index = index
+
+    s = column(0)
+    k = column(1)
+    t = column(2)
+    r = column(3)
+    d = column(4)
+    v = column(5)
+
+    @property
+    def kind(self):
+        return 'call' if self.book.data[6, self.index] else 'put'
+
+    @kind.setter
+    def kind(self, kind):
+        self.book.data[6, self.index] = 'call' == kind
+
+    @property
+    def fdm_factor(self):
+        return self.book.fdm_factor
+
+    def set_option(self, s, k, t, r, d, v, kind):
+        """
+        Resets almost all parameters of the option.
+
+        :param s: spot price
+        :param k: strike price
+        :param t: time
+        :param r: risc free interest rat
+        :param d: dividend
+        :param v: volatility
+        :param kind: type of the Option (call or put)
+        """
+
+        self.book.data[:6, self.index] = (s, k, t, r, d, v)
+        self.kind = kind
+
+    def set_kind(self, kind):
+        """
+        Sets the kind of the option.
+
+        :param kind: The new kind.
+        """
+
+        self.kind = kind
+
+    def set_stock(self, s):
+        """
+        Sets the spot price of the stock.
+
+        :param s: The new spot price.
+        """
+
+        self.s = s
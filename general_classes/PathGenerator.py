@@ -0,0 +1,194 @@
+import math
+
+import numpy as np
+from scipy.special import ndtri
+
+
+class PathGenerator:
+
+    # number of path values generated at once; bounds the memory used by generate_chunks.
+    chunk_elements = 4000000
+
+    def __init__(self, stock):
+        """
+        Generates exact geometric Brownian motion paths of the stock to which the option is bound.
+
+        :param stock: The stock whose paths are generated. (class Stock)
+        """
+
+        self.stock = stock
+
+    def get_chunk_size(self, n_steps):
+        """
+        Returns the number of paths per chunk, such that one chunk holds about chunk_elements values.
+
+        :param n_steps: the number of time steps
+
+        :return: the number of paths per chunk
+        """
+
+        return max(1, self.chunk_elements // (n_steps + 1))
+
+    def generate(self, n_paths, n_steps, seed=None, out=None):
+        """
+        Generates a block of paths up to the time t. The log returns of every step are drawn exactly,
+        so the paths never become negative and have no discretisation error at the time steps.
+
+        :param n_paths: the number of paths
+        :param n_steps: the number of time steps
+        :param seed: the seed (or numpy.random.Generator) for the random numbers
+        :param out: array of shape (n_paths, n_steps + 1) into which the paths are written
+
+        :return: array of shape (n_paths, n_steps + 1) with the stock prices (column 0 is the spot price)
+        """
+
+        rng = np.random.default_rng(seed)
+
+        if out is None:
+            out = np.empty((n_paths, n_steps + 1))
+
+        out[:, 1:] = rng.standard_normal((n_paths, n_steps))
+
+        return self.set_prices(out)
+
+    def set_prices(self, out):
+        """
+        Turns standard normal increments into stock prices in place.
+
+        :param out: array of shape (n_paths, n_steps + 1) with the normal increments in the columns 1 to n_steps
+
+        :return: out with the stock prices
+        """
+
+        n_steps = out.shape[1] - 1
+
+        s = self.stock.s
+        dt = self.stock.t / n_steps
+        drift = (self.stock.r - self.stock.d - self.stock.v * self.stock.v / 2) * dt
+        diffusion = self.stock.v * math.sqrt(dt)
+
+        out[:, 0] = 0
+        out[:, 1:] *= diffusion
+        out[:, 1:] += drift
+        np.cumsum(out, axis=1, out=out)
+        np.exp(out, out=out)
+        out *= s
+
+        return out
+
+    def generate_sobol_chunks(self, n_paths, n_steps, chunk_size=None, seed=None):
+        """
+        Generates the paths from a scrambled Sobol sequence in chunks. The Brownian motion is built with a
+        Brownian bridge, so the first (best distributed) Sobol dimensions determine the coarse shape of the
+        paths. The sequence is balanced if n_paths and chunk_size are powers of two.
+
+        :param n_paths: the number of paths
+        :param n_steps: the number of time steps
+        :param chunk_size: the number of paths per chunk (None...get_chunk_size rounded down to a power of two)
+        :param seed: the seed (or numpy.random.Generator) of the scrambling
+
+        :return: generator of arrays of shape (chunk_size, n_steps + 1) (the last chunk may be smaller)
+        """
+
+        from scipy.stats import qmc
+
+        sampler = qmc.Sobol(n_steps, scramble=True, seed=np.random.default_rng(seed))
+
+        if chunk_size is None:
+            chunk_size = 1 << (self.get_chunk_size(n_steps).bit_length() - 1)
+
+        for start in range(0, n_paths, chunk_size):
+            rows = min(chunk_size, n_paths - start)
+
+            # points of exactly 0 would give infinite normals
+            u = np.clip(sampler.random(rows), np.finfo(float).tiny, 1 - np.finfo(float).epsneg)
+
+            out = np.empty((rows, n_steps + 1))
+            out[:, 1:] = self.brownian_bridge(ndtri(u))
+            out[:, 1:] = np.diff(out[:, 1:], axis=1, prepend=0)
+
+            yield self.set_prices(out)
+
+    @staticmethod
+    def brownian_bridge(z):
+        """
+        Builds Brownian motions with unit time steps from standard normals. The first normal sets the end
+        point, the next ones the midpoints of the intervals in breadth-first order.
+
+        :param z: array of shape (n_paths, n_steps) with standard normals
+
+        :return: array of shape (n_paths, n_steps) with the Brownian motions at the times 1 to n_steps
+        """
+
+        n_steps = z.shape[1]
+
+        w = np.empty((z.shape[0], n_steps + 1))
+        w[:, 0] = 0
+        w[:, n_steps] = math.sqrt(n_steps) * z[:, 0]
+
+        intervals = [(0, n_steps)]
+        column = 1
+
+        for left, right in intervals:
+            if right - left < 2:
+                continue
+
+            middle = (left + right) // 2
+            a = (right - middle) / (right - left)
+            b = (middle - left) / (right - left)
+            std = math.sqrt((middle - left) * (right - middle) / (right - left))
+
+            w[:, middle] = a * w[:, left] + b * w[:, right] + std * z[:, column]
+            column += 1
+
+            intervals.append((left, middle))
+            intervals.append((middle, right))
+
+        return w[:, 1:]
+
+    def generate_chunks(self, n_paths, n_steps, chunk_size=None, seed=None):
+        """
+        Generates the paths in chunks, so path counts which do not fit into memory can be streamed.
+
+        :param n_paths: the number of paths
+        :param n_steps: the number of time steps
+        :param chunk_size: the number of paths per chunk (None...get_chunk_size)
+        :param seed: the seed (or numpy.random.Generator) for the random numbers
+
+        :return: generator of arrays of shape (chunk_size, n_steps + 1) (the last chunk may be smaller)
+        """
+
+        rng = np.random.default_rng(seed)
+
+        if chunk_size is None:
+            chunk_size = self.get_chunk_size(n_steps)
+
+        for start in range(0, n_paths, chunk_size):
+            yield self.generate(min(chunk_size, n_paths - start), n_steps, rng)
+
+    def write(self, path, n_paths, n_steps, chunk_size=None, seed=None):
+        """
+        Writes the paths chunk by chunk into a memory mapped .npy file.
+
+        :param path: path of the file
+        :param n_paths: the number of paths
+        :param n_steps: the number of time steps
+        :param chunk_size: the number of paths per chunk (None...get_chunk_size)
+        :param seed: the seed (or numpy.random.Generator) for the random numbers
+
+        :return: the memory mapped array of shape (n_paths, n_steps + 1)
+        """
+
+        rng = np.random.default_rng(seed)
+        paths = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=(n_paths, n_steps + 1))
+
+        if chunk_size is None:
+            chunk_size = self.get_chunk_size(n_steps)
+
+        for start in range(0, n_paths, chunk_size):
+            stop = min(start + chunk_size, n_paths)
+            self.generate(stop - start, n_steps, rng, out=paths[start:stop])
+
+        paths.flush()
+
+        return paths
@@ -0,0 +1,104 @@
+import numpy as np
+from matplotlib import pyplot as plt
+
+
+class Plotting:
+    """
+    All plots of the project. This module is the only one which imports matplotlib, so it is only imported
+    when something is actually plotted.
+    """
+
+    @staticmethod
+    def plot_curve(x, y, difference, x_label=None):
+        """
+        Plots the solutions of a numeric method against the number of time steps (or runs).
+
+        :param x: the numbers of time steps
+        :param y: the prices or differences
+        :param difference: false...prices are visible; true...differences to analytic solution are visible
+        :param x_label: the label of the x-axis
+
+        :return: plot
+        """
+
+        plt.rcParams['figure.dpi'] = 150
+
+        plt.plot(x, y)
+
+        if None == x_label:
+            plt.xlabel("number of time steps")
+        else: 
+            plt.xlabel(x_label)
+
+        if difference:
+            plt.ylabel("difference")
+        else:
+            plt.ylabel("price")
+
+        plt.tight_layout()
+        plt.show()
+        plt.close()
+
+    @staticmethod
+    def plot_surface(ns, nt, matrix, difference):
+        """
+        Plots the solutions of a finite difference method for different spot prices and different time steps.
+
+        :param ns: the numbers of spot prices
+        :param nt: the numbers of time steps
+        :param matrix: the prices or differences (spot prices x time steps)
+        :param difference: false...prices are visible; true...differences to analytic solution are visible
+
+        :return: plot
+        """
+
+        x, y = np.meshgrid(nt, ns)
+        z = matrix
+
+        plt.rcParams['figure.dpi'] = 150
+
+        fig = plt.figure()
+        ax = fig.add_subplot(projection='3d')
+
+        # Plot a basic wireframe.
+        ax.plot_wireframe(x, y, z, rstride=1, cstride=1)
+
+        plt.xlabel("number of time steps")
+        plt.ylabel("spot prices")
+
+        if difference:
+            ax.set_zlabel("difference", labelpad=15)
+        else:
+            ax.set_zlabel("price", labelpad=15)
+
+        ax.tick_params(axis='z', pad=7)
+
+        # Set white background for the 3D axes panes
+        ax.xaxis.pane.set_facecolor('white')
+        ax.yaxis.pane.set_facecolor('white')
+        ax.zaxis.pane.set_facecolor('white')
+
+        plt.tight_layout()
+        plt.show()
+        plt.close()
+
+    @staticmethod
+    def plot_stock_price_path(f):
+        """
+        Plots a walk of a stock price.
+
+        :param f: the stock prices at each time step
+
+        :return: plot
+        """
+
+        idx = np.arange(0, len(f))
+
+        plt.rcParams['figure.dpi'] = 150
+        plt.plot(idx, f)
+
+        plt.xlabel("time steps")
+        plt.ylabel("stock price")
+
+        plt.show()
+        plt.close()
@@ -0,0 +1,376 @@
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from general_classes.OptionBook import OptionBook
+from general_classes.Simulation import Simulation
+
+
+class PricingServer:
+
+    # the settings of a request which decide with which other requests it can be batched, and their defaults
+    settings = (('n', 500), ('n_s', 200), ('n_t', 500), ('bc', 'n'), ('exercise', 'european'), ('grid', 'uniform'),
+                ('rannacher_steps', 0), ('antithetic', False), ('control_variate', False), ('seed', None),
+                ('lattice', 'crr'))
+
+    def __init__(self, window=0.002, max_batch=4096, workers=None, history=100000):
+        """
+        A local asyncio pricing server. The clients send one JSON object per line, e.g.
+            {"id": 1, "engine": "binomial_tree", "s": 42, "k": 40, "t": 1, "r": 0.1, "d": 0, "v": 0.2,
+             "kind": "put", "n": 500, "exercise": "american"}
+        and get one JSON object per line back, e.g. {"id": 1, "price": 1.5}, or {"id": 1, "error": "..."}.
+        {"command": "metrics"} returns the metrics of the server.
+        Requests with the same engine and settings (see PricingServer.settings) which arrive within the window
+        are priced together as one OptionBook (see Simulation.calculate_book, which vectorizes the analytic
+        method and the binomial tree and prices the options of the other engines one by one). The random
+        stream of a Monte-Carlo request is derived from its seed and its id, so its price does not depend on
+        the batch it was priced in.
+
+        :param window: the time in seconds a request waits for other requests of its batch
+        :param max_batch: the size at which a batch is dispatched without waiting for the end of the window
+        :param workers: the number of worker processes (None...number of CPUs, <=1...a thread of the server)
+        :param history: the number of latencies kept for the percentiles
+        """
+
+        self.window = window
+        self.max_batch = max_batch
+        self.workers = os.cpu_count() if workers is None else workers
+        self.pool = None
+
+        self.pending = dict()
+        self.server = None
+
+        self.latencies = collections.deque(maxlen=history)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+
+    # server
+    # --------------------------------------
+    async def start(self, path=None, host='127.0.0.1', port=0):
+        """
+        Starts listening on a Unix socket or a TCP port.
+
+        :param path: path of the Unix socket (None...TCP)
+        :param host: the host of the TCP server
+        :param port: the port of the TCP server (0...any free port)
+
+        :return: the asyncio server
+        """
+
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        self.started = time.perf_counter()
+
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path=path)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+
+        return self.server
+
+    async def serve_forever(self, path=None, host='127.0.0.1', port=0):
+        """
+        Starts the server and serves until it is cancelled.
+
+        :param path: path of the Unix socket (None...TCP)
+        :param host: the host of the TCP server
+        :param port: the port of the TCP server
+        """
+
+        server = await self.start(path, host, port)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Stops the server and the worker processes.
+        """
+
+        if self.server is not None:
+            self.server.close()
+
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def handle(self, reader, writer):
+        """
+        Serves one connection. The requests of a connection are priced concurrently, so the answers can
+        arrive in a different order than the requests (they carry the id of the request).
+
+        :param reader: the asyncio.StreamReader of the connection
+        :param writer: the asyncio.StreamWriter of the connection
+        """
+
+        tasks = set()
+        lock = asyncio.Lock()
+
+        async def answer(line):
+            response = await self.respond(line)
+
+            async with lock:
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                task = asyncio.ensure_future(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.CancelledError):
+            # the client disconnected or the server is stopping
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line):
+        """
+        Answers one request.
+
+        :param line: the request (JSON)
+
+        :return: dictionary with the answer
+        """
+
+        start = time.perf_counter()
+
+        try:
+            request = json.loads(line)
+        except ValueError:
+            self.errors += 1
+            return {'error': 'invalid JSON'}
+
+        if not isinstance(request, dict):
+            self.errors += 1
+            return {'error': 'the request has to be a JSON object'}
+
+        if 'metrics' == request.get('command'):
+            return dict(id=request.get('id'), **self.get_metrics())
+
+        try:
+            price = await self.price(request)
+        except (KeyError, TypeError, ValueError) as e:
+            self.errors += 1
+            return {'id': request.get('id'), 'error': "invalid request: {e}".format(e=e)}
+
+        self.requests += 1
+        self.latencies.append(time.perf_counter() - start)
+
+        if price is False or np.isnan(price):
+            self.errors += 1
+            return {'id': request.get('id'), 'error': 'the engine could not price the option'}
+
+        return {'id': request.get('id'), 'price': price}
+
+    # batching
+    # --------------------------------------
+    async def price(self, request):
+        """
+        Adds a request to its batch and waits for the price.
+
+        :param request: dictionary with engine, s, k, t, r, d, v, kind and optionally the settings
+
+        :return: the price
+        """
+
+        engine = request['engine']
+
+        if engine not in ('analytic', 'binomial_tree', 'trinomial_tree', 'explicit_fd', 'implicit_fd',
+                          'crank_nicolson', 'monte_carlo'):
+            raise ValueError("unknown engine {engine}".format(engine=engine))
+
+        if request['kind'] not in ('call', 'put'):
+            raise ValueError("kind has to be 'call' or 'put'")
+
+        row = [float(request[name]) for name in ('s', 'k', 't', 'r', 'd', 'v')] + [1.0 * ('call' == request['kind'])]
+        key = (engine,) + tuple(self.get_canonical(request.get(name, default)) for name, default in self.settings)
+
+        # raises a TypeError for settings which are neither scalars nor lists (e.g. objects)
+        hash(key)
+
+        future = asyncio.get_running_loop().create_future()
+        batch = self.pending.get(key)
+
+        if batch is None:
+            batch = list()
+            self.pending[key] = batch
+            asyncio.get_running_loop().call_later(self.window, self.flush, key, batch)
+
+        batch.append((row, self.get_stream_id(request.get('id')), future))
+
+        if len(batch) >= self.max_batch:
+            self.flush(key, batch)
+
+        return await future
+
+    def flush(self, key, batch):
+        """
+        Dispatches a batch to the workers.
+
+        :param key: the engine and the settings of the batch
+        :param batch: list of the rows, the stream ids and the futures of the requests
+        """
+
+        if self.pending.get(key) is not batch:
+            # already dispatched because it was full
+            return
+
+        del self.pending[key]
+        self.batches += 1
+
+        asyncio.ensure_future(self.dispatch(key, batch))
+
+    async def dispatch(self, key, batch):
+        """
+        Prices a batch on the workers and sets the results of the futures.
+
+        :param key: the engine and the settings of the batch
+        :param batch: list of the rows, the stream ids and the futures of the requests
+        """
+
+        data = np.array([row for row, _, _ in batch]).T
+        ids = [stream_id for _, stream_id, _ in batch]
+        loop = asyncio.get_running_loop()
+
+        try:
+            prices = await loop.run_in_executor(self.pool, self.calculate, data, key, ids)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(ValueError(str(e)))
+            return
+
+        for (_, _, future), price in zip(batch, prices):
+            if not future.done():
+                future.set_result(float(price))
+
+    @staticmethod
+    def calculate(data, key, ids=None):
+        """
+        Prices a batch. Runs in a worker process.
+
+        :param data: array of shape (7, n) (see OptionBook)
+        :param key: the engine and the settings of the batch
+        :param ids: the stream ids of the requests (see get_stream_id)
+
+        :return: array with the prices
+        """
+
+        settings = dict(zip((name for name, _ in PricingServer.settings), key[1:]))
+        prices = Simulation.calculate_book(OptionBook(data), key[0], ids=ids, **settings)
+
+        if prices is False:
+            raise ValueError("unknown engine {engine}".format(engine=key[0]))
+
+        return prices
+
+    @staticmethod
+    def get_canonical(value):
+        """
+        Converts a setting of a request into a hashable value. Lists (e.g. the exercise times of a bermudan
+        option) are converted to tuples, like in ResultCache.get_key.
+
+        :param value: the setting
+
+        :return: the hashable setting
+        """
+
+        if isinstance(value, list):
+            return tuple(PricingServer.get_canonical(v) for v in value)
+
+        return value
+
+    @staticmethod
+    def get_stream_id(request_id):
+        """
+        Converts the id of a request into the id of its random stream (see Simulation.calculate_book).
+        Non-negative integers are used as they are, every other id is hashed.
+
+        :param request_id: the id of the request (any JSON value, None if the request has none)
+
+        :return: non-negative integer
+        """
+
+        if isinstance(request_id, int) and not isinstance(request_id, bool) and request_id >= 0:
+            return request_id
+
+        digest = hashlib.sha256(json.dumps(request_id, sort_keys=True).encode()).digest()
+
+        return int.from_bytes(digest[:8], 'little')
+
+    # metrics
+    # --------------------------------------
+    def get_metrics(self):
+        """
+        Returns the metrics of the server.
+
+        :return: dictionary with requests, errors, batches, mean_batch, throughput (requests per second since
+            the start), p50 and p99 (latencies in seconds of the last requests)
+        """
+
+        elapsed = time.perf_counter() - self.started
+        latencies = np.array(self.latencies)
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batches,
+            'mean_batch': self.requests / self.batches if self.batches else 0.0,
+            'throughput': self.requests / elapsed if elapsed > 0 else 0.0,
+            'p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'p99': float(np.percentile(latencies, 99)) if len(latencies) else None,
+        }
+
+    # client
+    # --------------------------------------
+    @staticmethod
+    async def send(requests, path=None, host='127.0.0.1', port=None):
+        """
+        Sends requests over one connection and collects the answers.
+
+        :param requests: list of dictionaries with the requests
+        :param path: path of the Unix socket (None...TCP)
+        :param host: the host of the TCP server
+        :param port: the port of the TCP server
+
+        :return: list of dictionaries with the answers (in the order in which they arrived)
+        """
+
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+
+        writer.write(''.join(json.dumps(request) + '\n' for request in requests).encode())
+        await writer.drain()
+
+        answers = list()
+
+        for i in range(0, len(requests)):
+            answers.append(json.loads(await reader.readline()))
+
+        writer.close()
+        await writer.wait_closed()
+
+        return answers
@@ -0,0 +1,157 @@
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ResultCache:
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """
+        A bounded least recently used cache for pricing results with an optional time to live.
+        The keys are built from the parameters of the option at the time of the call, so mutating an
+        option never returns a stale result.
+
+        :param maxsize: the maximal number of cached results
+        :param ttl: the time to live of a result in seconds (None...results never expire)
+        """
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def get_key(stock, method, arguments):
+        """
+        Builds the canonical key of a calculation. Numbers are converted to floats (e.g. 42 and 42.0 give
+        the same key), lists to tuples and arrays to tuples with their dtype, shape and raw bytes.
+
+        :param stock: the Option object
+        :param method: the name of the method
+        :param arguments: tuple with the arguments of the method
+
+        :return: the key
+        """
+
+        def canonical(value):
+            if isinstance(value, bool) or value is None or isinstance(value, str):
+                return value
+            if isinstance(value, (int, float)):
+                return float(value)
+            if isinstance(value, (list, tuple)):
+                return tuple(canonical(v) for v in value)
+            if isinstance(value, np.ndarray):
+                # the repr of an array is rounded and truncated
+                return value.dtype.str, value.shape, value.tobytes()
+            if isinstance(value, np.generic):
+                return canonical(value.item())
+            return repr(value)
+
+        option = (stock.s, stock.k, stock.t, stock.r, stock.d, stock.v, stock.kind, stock.fdm_factor)
+
+        return canonical(option), method, canonical(tuple(arguments))
+
+    def get(self, key):
+        """
+        Looks up a result and marks it as recently used.
+
+        :param key: the key of the result
+
+        Returns: Tuple
+            - hit - true if a valid result was found
+            - value - the cached result (None if not found)
+        """
+
+        entry = self.entries.get(key)
+
+        if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+            del self.entries[key]
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+
+        return True, entry[0]
+
+    def put(self, key, value):
+        """
+        Stores a result and evicts the least recently used ones if the cache is full. Expired results are
+        removed first.
+
+        :param key: the key of the result
+        :param value: the result
+        """
+
+        now = time.monotonic()
+
+        self.entries[key] = (value, now)
+        self.entries.move_to_end(key)
+
+        if self.ttl is not None and len(self.entries) > self.maxsize:
+            # expired results are removed before live ones are evicted
+            expired = [k for k, (_, stored) in self.entries.items() if now - stored > self.ttl]
+
+            for k in expired:
+                del self.entries[k]
+
+            self.expirations += len(expired)
+
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, stock=None, method=None):
+        """
+        Removes results from the cache. Without parameters the whole cache is cleared.
+
+        :param stock: only remove the results of options with the current parameters of this Option object
+        :param method: only remove the results of this method
+
+        :return: the number of removed results
+        """
+
+        option = None
+
+        if stock is not None:
+            option = self.get_key(stock, method, ())[0]
+
+        keys = [key for key in self.entries
+                if (option is None or key[0] == option) and (method is None or key[1] == method)]
+
+        for key in keys:
+            del self.entries[key]
+
+        return len(keys)
+
+    def get_statistics(self):
+        """
+        Returns the statistics of the cache.
+
+        :return: dictionary with size, maxsize, hits, misses, evictions, expirations and hit_rate
+        """
+
+        calls = self.hits + self.misses
+
+        return {
+            'size': len(self.entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / calls if calls else 0.0,
+        }
+
+    def __len__(self):
+        return len(self.entries)
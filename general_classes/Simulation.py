@@ -1,5 +1,9 @@
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-import matplotlib.pyplot as plt
 
 from other_methods.Analytic import Analytic
 from other_methods.MonteCarlo import MonteCarlo
@@ -13,8 +17,39 @@ from finite_difference_methods.ExplicitFD import ExplicitFD
 
 class Simulation:
 
-    def __init__(self, stock):
+    def __init__(self, stock, cache=None):
+        """
+        Runs the pricing methods on an option.
+
+        :param stock: the Option object
+        :param cache: a ResultCache for the results of the calculate methods (None...no caching)
+        """
+
         self.stock = stock
+        self.cache = cache
+
+    def calculate_cached(self, method, arguments, function):
+        """
+        Returns the cached result of a calculation or calculates and caches it.
+
+        :param method: the name of the method
+        :param arguments: tuple with the arguments of the method
+        :param function: function which calculates the result
+
+        :return: the result
+        """
+
+        if self.cache is None:
+            return function()
+
+        key = self.cache.get_key(self.stock, method, arguments)
+        hit, value = self.cache.get(key)
+
+        if not hit:
+            value = function()
+            self.cache.put(key, value)
+
+        return value
 
     # calculate methods
     # --------------------------------------
@@ -26,43 +61,56 @@ class Simulation:
         """
 
         method = Analytic(self.stock)
-        return method.calculate()
+        return self.calculate_cached('analytic', (), method.calculate)
 
-    def calculate_monte_carlo(self, n):
+    def calculate_monte_carlo(self, n, antithetic=False, control_variate=False, seed=None):
         """
         Calculates the stock price after t time using a Monte-Carlo simulation.
 
         :param n: number of runs
+        :param antithetic: use antithetic variates
+        :param control_variate: use the discounted stock price as control variate
+        :param seed: seed of the random numbers
 
         :return: stock price
         """
 
         method = MonteCarlo(self.stock)
-        return method.calculate(n)
 
-    def calculate_binomial_tree(self, n):
+        # without a seed every run gives a different result, and a Generator advances its state with every run
+        if not isinstance(seed, (int, np.integer)):
+            return method.calculate(n, antithetic, control_variate, seed)
+
+        return self.calculate_cached('monte_carlo', (n, antithetic, control_variate, seed),
+                                     lambda: method.calculate(n, antithetic, control_variate, seed))
+
+    def calculate_binomial_tree(self, n, exercise='european', lattice='crr'):
         """
         Calculates the stock price after t time using a binomial tree simulation.
 
         :param n: number of time steps
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
+        :param lattice: the parameters of the tree (crr, lr or bbs; see BinomialTree.calculate)
 
         :return: stock price
         """
 
         method = BinomialTree(self.stock)
-        return method.calculate(n)
+        return self.calculate_cached('binomial_tree', (n, exercise, lattice),
+                                     lambda: method.calculate(n, exercise, lattice))
 
-    def calculate_trinomial_tree(self, n):
+    def calculate_trinomial_tree(self, n, exercise='european'):
         """
         Calculates the stock price after t time using a trinomial tree simulation.
 
         :param n: number of time steps
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
 
         :return: stock price
         """
 
         method = TrinomialTree(self.stock)
-        return method.calculate(n)
+        return self.calculate_cached('trinomial_tree', (n, exercise), lambda: method.calculate(n, exercise))
 
     def calculate_explicit_fd(self, n_s, n_t, bc):
         """
@@ -76,39 +124,248 @@ class Simulation:
         """
 
         method = ExplicitFD(self.stock)
-        return method.calculate(n_s, n_t, bc)
+        return self.calculate_cached('explicit_fd', (n_s, n_t, bc), lambda: method.calculate(n_s, n_t, bc))
 
-    def calculate_implicit_fd(self, n_s, n_t, bc):
+    def calculate_implicit_fd(self, n_s, n_t, bc, exercise='european'):
         """
         Calculates the stock price after t time using the implicit finite difference method.
 
         :param n_s: number of spot prices
         :param n_t: number of time steps
         :param bc: the type of border conditions. (d...Dirichlet, n...von Neumann)
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
 
         :return: stock price
         """
 
         method = ImplicitFD(self.stock)
-        return method.calculate(n_s, n_t, bc)
+        return self.calculate_cached('implicit_fd', (n_s, n_t, bc, exercise),
+                                     lambda: method.calculate(n_s, n_t, bc, exercise))
 
-    def calculate_crank_nicolson(self, n_s, n_t, bc):
+    def calculate_crank_nicolson(self, n_s, n_t, bc, exercise='european'):
         """
         Calculates the stock price after t time using the Crank-Nicolson method.
 
         :param n_s: number of spot prices
         :param n_t: number of time steps
         :param bc: the type of border conditions. (d...Dirichlet, n...von Neumann)
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
 
         :return: stock price
         """
 
         method = CrankNicolson(self.stock)
-        return method.calculate(n_s, n_t, bc)
+        return self.calculate_cached('crank_nicolson', (n_s, n_t, bc, exercise),
+                                     lambda: method.calculate(n_s, n_t, bc, exercise))
+
+    @staticmethod
+    def calculate_book(book, method, n=500, n_s=200, n_t=500, bc='n', exercise='european', grid='uniform',
+                       rannacher_steps=0, antithetic=False, control_variate=False, seed=None, lattice='crr',
+                       ids=None):
+        """
+        Calculates the prices of all options of an OptionBook with one method. The analytic method prices the
+        whole book in one vectorized pass and the binomial tree rolls back the trees of many options at once
+        (see BinomialTree.calculate_book). The other methods fall back to pricing the options one by one:
+        the grids of the finite difference methods depend on the strike price of every option, so sharing a
+        grid (e.g. calculate_strikes) would change the prices, the trinomial tree has no batch version, and
+        every Monte-Carlo option needs its own random stream (its paths are vectorized).
+        Options outside the domain of the models (see OptionBook.get_valid), or on which a method fails,
+        get nan without affecting the other options of the book.
+
+        :param book: the OptionBook
+        :param method: 'analytic', 'binomial_tree', 'trinomial_tree', 'explicit_fd', 'implicit_fd',
+            'crank_nicolson' or 'monte_carlo'
+        :param n: number of time steps of the trees or runs of the Monte-Carlo simulation
+        :param n_s: number of spot prices of the sinh grid (the uniform grid derives it from n_t)
+        :param n_t: number of time steps of the finite difference methods
+        :param bc: the type of border conditions. (d...Dirichlet, n...von Neumann)
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan)
+        :param grid: the grid of the finite difference methods (uniform or sinh)
+        :param rannacher_steps: the number of Rannacher steps of the Crank-Nicolson method
+        :param antithetic: use antithetic variates in the Monte-Carlo simulation
+        :param control_variate: use the control variate in the Monte-Carlo simulation
+        :param seed: the seed of the Monte-Carlo simulation (a non-negative integer)
+        :param lattice: the parameters of the binomial tree (crr, lr or bbs)
+        :param ids: non-negative integer ids of the options (None...their positions in the book). The random
+            stream of option i is numpy.random.SeedSequence([seed, ids[i]]), so its price does not depend
+            on the other options of the book.
+
+        :return: array with the prices (nan where the method failed) (False if the method is unknown)
+        """
+
+        if method not in ('analytic', 'binomial_tree', 'trinomial_tree', 'explicit_fd', 'implicit_fd',
+                          'crank_nicolson', 'monte_carlo'):
+            return False
+
+        valid = book.get_valid()
+
+        if 'analytic' == method:
+            if 'european' != exercise:
+                return np.full(len(book), np.nan)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                prices = Analytic.calculate_batch(*book.get_parameters())
+
+            return np.where(valid, prices, np.nan)
+
+        if 'binomial_tree' == method:
+            prices = BinomialTree.calculate_book(book, n, exercise, lattice)
+            return np.full(len(book), np.nan) if prices is False else prices
+
+        if ids is None:
+            ids = range(0, len(book))
+
+        prices = np.full(len(book), np.nan)
+
+        for i, option in enumerate(book):
+            if not valid[i]:
+                continue
+
+            try:
+                if 'trinomial_tree' == method:
+                    value = TrinomialTree(option).calculate(n, exercise)
+                elif 'explicit_fd' == method:
+                    value = ExplicitFD(option, grid).calculate(n_s, n_t, bc) if 'european' == exercise else False
+                elif 'implicit_fd' == method:
+                    value = ImplicitFD(option, grid=grid).calculate(n_s, n_t, bc, exercise)
+                elif 'crank_nicolson' == method:
+                    value = CrankNicolson(option, grid=grid, rannacher_steps=rannacher_steps).calculate(
+                        n_s, n_t, bc, exercise)
+                elif 'european' == exercise:
+                    stream = None if seed is None else np.random.SeedSequence([seed, ids[i]])
+                    value = MonteCarlo(option).calculate(n, antithetic, control_variate, stream)
+                else:
+                    value = False
+            except (ArithmeticError, ValueError):
+                # e.g. an overflow of extreme parameters, which only affects this option
+                value = False
+
+            if value is not False:
+                prices[i] = value
+
+        return prices
+
+    # accuracy targeting
+    # --------------------------------------
+    def price_to_tolerance(self, method, tol, n_start=16, n_max=65536, bc='d', **kwargs):
+        """
+        Doubles the number of time steps of a numeric method until the Richardson extrapolation of the last
+        two runs is accurate to the tolerance. For the binomial tree every price is the average of the
+        runs with n and n + 1 time steps, which smooths the odd/even oscillation.
+        The finite difference methods derive the number of spot prices from the number of time steps, so
+        all methods converge with first order in the number of time steps, but only asymptotically: the
+        numbers of spot prices are rounded, the strike price moves relative to the nodes and the trees
+        oscillate, so two successive extrapolations can agree by chance. The extrapolation is therefore only
+        trusted if the ratios of the last two pairs of successive differences of the runs are both close to 2
+        (the error halves with every doubling), and its error is estimated conservatively by its distance to
+        the finest run. Otherwise the price is the finest run and its error is the largest of its last three
+        changes. Errors which do not shrink with the time steps (e.g. the von Neumann border conditions of a
+        call at the truncated spot range) are not seen, so the finite difference methods use Dirichlet border
+        conditions by default.
+
+        :param method: 'binomial_tree', 'trinomial_tree', 'explicit_fd', 'implicit_fd' or 'crank_nicolson'
+        :param tol: the tolerance of the price
+        :param n_start: the number of time steps of the first run
+        :param n_max: the largest number of time steps (not smaller than n_start)
+        :param bc: the type of border conditions of the finite difference methods
+        :param kwargs: further arguments of the method (e.g. exercise)
+
+        :return: dictionary (False if the method is unknown, fails or gets unstable)
+            - price - the extrapolated price (the finest run if the extrapolation is not trusted)
+            - error - the estimated error of the price
+            - converged - true if the error is below the tolerance
+            - ratio - the ratio of the last two differences of the runs (2 in the asymptotic range)
+            - n - the number of time steps of the finest run (n + 1 for the binomial tree)
+            - resolutions - the numbers of time steps of all runs
+            - evaluations - the number of calls of the method
+            - seconds - the time spent
+        """
+
+        if n_start > n_max:
+            return False
+
+        trees = {'binomial_tree': BinomialTree, 'trinomial_tree': TrinomialTree}
+        fds = {'explicit_fd': ExplicitFD, 'implicit_fd': ImplicitFD, 'crank_nicolson': CrankNicolson}
+
+        if method in trees:
+            engine = trees[method](self.stock)
+        elif method in fds:
+            engine = fds[method](self.stock)
+        else:
+            return False
+
+        def price(steps):
+            if method in fds:
+                return engine.calculate(1, steps, bc, **kwargs)
+            return engine.calculate(steps, **kwargs)
+
+        start = time.perf_counter()
+        resolutions = list()
+        values = list()
+        evaluations = 0
+        ratios = list()
+        error = np.inf
+        asymptotic = False
+        converged = False
+        n = n_start
+
+        while n <= n_max:
+            value = price(n)
+            evaluations += 1
+
+            if 'binomial_tree' == method and value is not False:
+                value = (value + price(n + 1)) / 2
+                evaluations += 1
+
+            if value is False or not np.isfinite(value):
+                return False
+
+            resolutions.append(n)
+            values.append(value)
+
+            changes = np.diff(values[-4:])
+
+            if len(changes) >= 2:
+                ratios.append(changes[-2] / changes[-1] if changes[-1] != 0 else np.inf)
+
+            asymptotic = len(ratios) >= 2 and all(abs(x - 2) < 0.5 for x in ratios[-2:])
+
+            if asymptotic:
+                # the distance of the extrapolation to the finest run
+                error = abs(changes[-1])
+            elif len(changes) >= 3:
+                # without the extrapolation the finest run is the price and the largest of its last three
+                # changes is its error
+                error = max(np.abs(changes))
+
+            if error < tol:
+                converged = True
+                break
+
+            n = 2 * n
+
+        ratio = ratios[-1] if ratios else np.nan
+
+        if asymptotic:
+            # first order: the error halves with every doubling
+            value = 2 * values[-1] - values[-2]
+        else:
+            value = values[-1]
+
+        return {
+            'price': value,
+            'error': error,
+            'converged': converged,
+            'ratio': ratio,
+            'n': resolutions[-1] + ('binomial_tree' == method),
+            'resolutions': resolutions,
+            'evaluations': evaluations,
+            'seconds': time.perf_counter() - start,
+        }
 
     # plot functions
     # --------------------------------------
-    def plot_explicit_fd(self, ns_min, ns_max, nt_min, nt_max, bc, difference=True):
+    def plot_explicit_fd(self, ns_min, ns_max, nt_min, nt_max, bc, difference=True, workers=1, chunksize=1):
         """
         Plots the solutions of the explicit finite difference method for different spot prices and different time steps.
 
@@ -118,13 +375,16 @@ class Simulation:
         :param nt_max: maximum time steps
         :param bc: the type of border conditions (d...Dirichlet, n...von Neumann)
         :param difference: false...prices are visible; true...differences to analytic solution are visible
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of grid points which are sent to a worker at once
 
-        :return: plot
+        :return: matrix with the plotted values (spot prices x time steps)
         """
 
-        self.plot_fd(ns_min, ns_max, nt_min, nt_max, bc, difference, ExplicitFD(self.stock).calculate)
+        return self.plot_fd(ns_min, ns_max, nt_min, nt_max, bc, difference, ExplicitFD(self.stock).calculate,
+                            workers, chunksize)
 
-    def plot_implicit_fd(self, ns_min, ns_max, nt_min, nt_max, bc, difference=True):
+    def plot_implicit_fd(self, ns_min, ns_max, nt_min, nt_max, bc, difference=True, workers=1, chunksize=1):
         """
         Plots the solutions of the implicit finite difference method for different spot prices and different time steps.
 
@@ -134,13 +394,16 @@ class Simulation:
         :param nt_max: maximum time steps
         :param bc: the type of border conditions (d...Dirichlet, n...von Neumann)
         :param difference: false...prices are visible; true...differences to analytic solution are visible
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of grid points which are sent to a worker at once
 
-        :return: plot
+        :return: matrix with the plotted values (spot prices x time steps)
         """
 
-        self.plot_fd(ns_min, ns_max, nt_min, nt_max, bc, difference, ImplicitFD(self.stock).calculate)
+        return self.plot_fd(ns_min, ns_max, nt_min, nt_max, bc, difference, ImplicitFD(self.stock).calculate,
+                            workers, chunksize)
 
-    def plot_crank_nicolson(self, ns_min, ns_max, nt_min, nt_max, bc, difference=True):
+    def plot_crank_nicolson(self, ns_min, ns_max, nt_min, nt_max, bc, difference=True, workers=1, chunksize=1):
         """
         Plots the solutions of the Crank-Nicolson method for different spot prices and different time steps.
 
@@ -150,66 +413,80 @@ class Simulation:
         :param nt_max: maximum time steps
         :param bc: the type of border conditions (d...Dirichlet, n...von Neumann)
         :param difference: false...prices are visible; true...differences to analytic solution are visible
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of grid points which are sent to a worker at once
 
-        :return: plot
+        :return: matrix with the plotted values (spot prices x time steps)
         """
 
-        self.plot_fd(ns_min, ns_max, nt_min, nt_max, bc, difference, CrankNicolson(self.stock).calculate)
+        return self.plot_fd(ns_min, ns_max, nt_min, nt_max, bc, difference, CrankNicolson(self.stock).calculate,
+                            workers, chunksize)
 
-    def plot_monte_carlo(self, nt_min, nt_max, step_size, difference=True):
+    def plot_monte_carlo(self, nt_min, nt_max, step_size, difference=True, workers=1, chunksize=1):
         """
         Plots the solutions of the Monte-Carlo method for different numbers of runs.
 
         :param nt_min: minimum time steps
         :param nt_max: maximum time steps
         :param difference: false...prices are visible; true...differences to analytic solution are visible
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of points which are sent to a worker at once
 
-        :return: plot
+        :return: tuple with the plotted x and y values
         """
 
         if nt_min < 1:
             print("Error: minimum is one run")
             return
 
-        self.plot(nt_min, nt_max, difference, MonteCarlo(self.stock).calculate, step_size, "number of random paths used")
+        return self.plot(nt_min, nt_max, difference, MonteCarlo(self.stock).calculate, step_size,
+                         "number of random paths used", workers, chunksize)
 
-    def plot_binomial_tree(self, nt_min, nt_max, difference=True):
+    def plot_binomial_tree(self, nt_min, nt_max, difference=True, workers=1, chunksize=1, lattice='crr'):
         """
         Plots the solutions of the binomial tree method for different time steps.
 
         :param nt_min: minimum time steps
         :param nt_max: maximum time steps
         :param difference: false...prices are visible; true...differences to analytic solution are visible
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of points which are sent to a worker at once
+        :param lattice: the parameters of the tree (crr, lr or bbs; see BinomialTree.calculate)
 
-        :return: plot
+        :return: tuple with the plotted x and y values
         """
 
         if nt_min < 1:
             print("Error: minimum is one timestep")
             return
 
-        self.plot(nt_min, nt_max, difference, BinomialTree(self.stock).calculate)
+        return self.plot(nt_min, nt_max, difference,
+                         functools.partial(BinomialTree(self.stock).calculate, lattice=lattice),
+                         workers=workers, chunksize=chunksize)
 
-    def plot_trinomial_tree(self, nt_min, nt_max, difference=True):
+    def plot_trinomial_tree(self, nt_min, nt_max, difference=True, workers=1, chunksize=1):
         """
         Plots the solutions of the trinomial tree method for different time steps.
 
         :param nt_min: minimum time steps
         :param nt_max: maximum time steps
         :param difference: false...prices are visible; true...differences to analytic solution are visible
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of points which are sent to a worker at once
 
-        :return: plot
+        :return: tuple with the plotted x and y values
         """
 
         if nt_min < 1:
             print("Error: minimum is one timestep")
             return
 
-        self.plot(nt_min, nt_max, difference, TrinomialTree(self.stock).calculate)
+        return self.plot(nt_min, nt_max, difference, TrinomialTree(self.stock).calculate,
+                         workers=workers, chunksize=chunksize)
 
     # plot helper functions
     # --------------------------------------
-    def plot(self, nt_min, nt_max, difference, function, step_size=1, x_label=None):
+    def plot(self, nt_min, nt_max, difference, function, step_size=1, x_label=None, workers=1, chunksize=1):
         """
         Actually handles the plotting for the "other methods".
 
@@ -218,54 +495,92 @@ class Simulation:
         :param difference: false...prices are visible; true...differences to analytic solution are visible
         :param function: the function which is plotted. (the numeric method)
         :param step_size: the step size of x-axis of the plot. 
+        :param x_label: the label of the x-axis
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of points which are sent to a worker at once
 
-        :return: plot
+        :return: tuple with the plotted x and y values
         """
 
-        if difference:
-            analytic = Analytic(self.stock).calculate()
-        else:
-            analytic = 0
+        from general_classes.Plotting import Plotting
 
-        x = []; y = []
+        x, y = self.sweep(nt_min, nt_max, difference, function, step_size, workers, chunksize)
+        Plotting.plot_curve(x, y, difference, x_label)
 
-        for i in range(nt_min, nt_max, step_size):
-            x.append(i)
-            y.append(function(i) - analytic)
+        return x, y
 
-        x = np.array(x); y = np.array(y)
+    def plot_fd(self, ns_min, ns_max, nt_min, nt_max, bc, difference, function, workers=1, chunksize=1):
+        """
+        Actually handles the plotting routine for finite difference methods.
+
+        :param ns_min: minimum spot prices
+        :param ns_max: maximum spot prices
+        :param nt_min: minimum time steps
+        :param nt_max: maximum time steps
+        :param bc: the type of border conditions (d...Dirichlet, n...von Neumann)
+        :param difference: false...prices are visible; true...differences to analytic solution are visible
+        :param function: the function which is plotted. (the numeric method)
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of grid points which are sent to a worker at once
 
-        plt.rcParams['figure.dpi'] = 150
+        :return: matrix with the plotted values (spot prices x time steps)
+        """
 
-        plt.plot(x, y)
+        from general_classes.Plotting import Plotting
 
-        if None == x_label:
-            plt.xlabel("number of time steps")
-        else: 
-            plt.xlabel(x_label)
+        matrix = self.sweep_fd(ns_min, ns_max, nt_min, nt_max, bc, difference, function, workers, chunksize)
+
+        if matrix is None:
+            return
+
+        Plotting.plot_surface(np.arange(ns_min, ns_max + 1), np.arange(nt_min, nt_max + 1), matrix, difference)
+
+        return matrix
+
+    # sweep functions
+    # --------------------------------------
+    def sweep(self, nt_min, nt_max, difference, function, step_size=1, workers=1, chunksize=1):
+        """
+        Evaluates a numeric method for different numbers of time steps (or runs).
+
+        :param nt_min: minimum time steps
+        :param nt_max: maximum time steps (exclusive)
+        :param difference: false...prices are returned; true...differences to analytic solution are returned
+        :param function: the numeric method. (must be picklable if more than one worker is used)
+        :param step_size: the step size between the numbers of time steps.
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of points which are sent to a worker at once
+
+        Returns: Tuple
+            - x - array with the numbers of time steps
+            - y - array with the prices or differences
+        """
 
         if difference:
-            plt.ylabel("difference")
+            analytic = Analytic(self.stock).calculate()
         else:
-            plt.ylabel("price")
+            analytic = 0
+
+        x = np.arange(nt_min, nt_max, step_size)
+        y = np.array(self.evaluate(function, workers, chunksize, x.tolist()), dtype=float) - analytic
 
-        plt.tight_layout()
-        plt.show()
-        plt.close()
+        return x, y
 
-    def plot_fd(self, ns_min, ns_max, nt_min, nt_max, bc, difference, function):
+    def sweep_fd(self, ns_min, ns_max, nt_min, nt_max, bc, difference, function, workers=1, chunksize=1):
         """
-        Actually handles the plotting routine for finite difference methods.
+        Evaluates a finite difference method for every combination of spot prices and time steps.
 
         :param ns_min: minimum spot prices
         :param ns_max: maximum spot prices
         :param nt_min: minimum time steps
         :param nt_max: maximum time steps
         :param bc: the type of border conditions (d...Dirichlet, n...von Neumann)
-        :param difference: false...prices are visible; true...differences to analytic solution are visible
-        :param function: the function which is plotted. (the numeric method)
+        :param difference: false...prices are returned; true...differences to analytic solution are returned
+        :param function: the numeric method. (must be picklable if more than one worker is used)
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of grid points which are sent to a worker at once
 
-        :return: plot
+        :return: matrix with the prices or differences (spot prices x time steps)
         """
 
         if nt_min < 1:
@@ -276,46 +591,37 @@ class Simulation:
             print("Error: minimum is one spot price")
             return
 
-        matrix = np.zeros((ns_max-ns_min+1, nt_max-nt_min+1))
-
         if difference:
             analytic = Analytic(self.stock).calculate()
         else:
             analytic = 0
 
-        for s in range(ns_min, ns_max+1):
-            for t in range(nt_min, nt_max+1):
-                matrix[s-1][t-1] = function(s, t, bc) - analytic
-
-        x = np.arange(nt_min, nt_max+1)
-        y = np.arange(ns_min, ns_max+1)
-
-        x, y = np.meshgrid(x, y)
-        z = matrix
+        ns, nt = np.meshgrid(np.arange(ns_min, ns_max + 1), np.arange(nt_min, nt_max + 1), indexing='ij')
+        values = self.evaluate(function, workers, chunksize, ns.ravel().tolist(), nt.ravel().tolist(),
+                               [bc] * ns.size)
 
-        plt.rcParams['figure.dpi'] = 150
+        return np.array(values, dtype=float).reshape(ns.shape) - analytic
 
-        fig = plt.figure()
-        ax = fig.add_subplot(projection='3d')
-
-        # Plot a basic wireframe.
-        ax.plot_wireframe(x, y, z, rstride=1, cstride=1)
+    @staticmethod
+    def evaluate(function, workers, chunksize, *arguments):
+        """
+        Evaluates a function for many arguments. With more than one worker the calls are distributed
+        to a process pool, so scripts which use it have to guard their entry point with
+        if __name__ == '__main__'.
 
-        plt.xlabel("number of time steps")
-        plt.ylabel("spot prices")
+        :param function: the function. (must be picklable if more than one worker is used)
+        :param workers: number of worker processes (1...serial, None...all cores)
+        :param chunksize: number of calls which are sent to a worker at once
+        :param arguments: one list per parameter of the function
 
-        if difference:
-            ax.set_zlabel("difference", labelpad=15)
-        else:
-            ax.set_zlabel("price", labelpad=15)
+        :return: list with the results in the order of the arguments
+        """
 
-        ax.tick_params(axis='z', pad=7)
+        if workers is None:
+            workers = os.cpu_count() or 1
 
-        # Set white background for the 3D axes panes
-        ax.xaxis.pane.set_facecolor('white')
-        ax.yaxis.pane.set_facecolor('white')
-        ax.zaxis.pane.set_facecolor('white')
+        if workers <= 1:
+            return list(map(function, *arguments))
 
-        plt.tight_layout()
-        plt.show()
-        plt.close()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(function, *arguments, chunksize=chunksize))
@@ -1,18 +1,365 @@
+"""
+Command line interface.
+
+    python main.py demo
+        runs the demo with the default option and shows the plots
+    python main.py price contracts.csv prices.csv --engine crank_nicolson --n-t 200 --exercise american
+        prices a file of contracts chunk by chunk
+    python main.py serve --socket /tmp/pricing.sock
+        runs the pricing server (see PricingServer for the protocol)
+
+The contracts are either a CSV file with a header row and the columns s, k, t, r, d, v and kind (call/put or 1/0)
+or a .npy file with the layout of OptionBook.save (memory mapped). The prices are written after every chunk,
+as CSV (the contract columns plus price) or as .npy (one price per contract), so the memory does not grow
+with the size of the book.
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import math
+import operator
+import sys
+import time
+
+import numpy as np
+
+from finite_difference_methods.FiniteDifference import FiniteDifference
 from general_classes.Option import Option
+from general_classes.OptionBook import OptionBook
+from general_classes.PricingServer import PricingServer
 from general_classes.Simulation import Simulation
 
+engines = ('analytic', 'binomial_tree', 'trinomial_tree', 'explicit_fd', 'implicit_fd', 'crank_nicolson',
+           'monte_carlo')
+
+
+def demo():
+    """
+    Runs the demo with the default option and shows the plots.
+    """
+
+    my_sim = Simulation(Option())
+
+    Option().plot_random_stock_price_path(100)
+
+    print(my_sim.calculate_analytic())
+
+    my_sim.plot_monte_carlo(1, 2000, 100)
+    my_sim.plot_binomial_tree(1, 10)
+    my_sim.plot_trinomial_tree(1, 10)
+    my_sim.plot_explicit_fd(1, 40, 1, 20, 'n')
+    my_sim.plot_implicit_fd(1, 40, 1, 20, 'n')
+    my_sim.plot_crank_nicolson(1, 40, 1, 20, 'n')
+
+
+# input and output
+# --------------------------------------
+def read_csv_rows(path):
+    """
+    Reads the contracts of a CSV file one by one. Empty rows are skipped.
+
+    :param path: path of the file
+
+    :return: generator of the line numbers and the fields s, k, t, r, d, v and kind (strings) of the contracts
+    """
+
+    with open(path, newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+
+        if header is None:
+            raise ValueError("{path} is empty".format(path=path))
+
+        header = [name.strip().lower() for name in header]
+        missing = [name for name in ('s', 'k', 't', 'r', 'd', 'v', 'kind') if name not in header]
+
+        if missing:
+            raise ValueError("missing columns: {missing}".format(missing=', '.join(missing)))
+
+        columns = [header.index(name) for name in ('s', 'k', 't', 'r', 'd', 'v', 'kind')]
+        get_fields = operator.itemgetter(*columns)
+        width = max(columns) + 1
+
+        for row in reader:
+            if not ''.join(row).strip():
+                continue
+
+            if len(row) < width:
+                raise ValueError("{path}, line {line}: invalid contract {row}".format(
+                    path=path, line=reader.line_num, row=','.join(row)))
+
+            yield reader.line_num, get_fields(row)
+
+
+def read_csv_chunks(path, chunk_size):
+    """
+    Reads a CSV file of contracts in chunks. Contracts outside the domain of the models (see
+    OptionBook.get_valid) are invalid.
+
+    :param path: path of the file
+    :param chunk_size: the number of contracts per chunk
+
+    :return: generator of OptionBooks
+    """
+
+    rows = read_csv_rows(path)
+
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+
+        if not chunk:
+            return
+
+        try:
+            values = np.array([fields[:6] for _, fields in chunk], dtype=float)
+            kind = np.char.lower(np.char.strip(np.array([fields[6] for _, fields in chunk])))
+
+            if not np.all((kind == 'call') | (kind == 'put')):
+                kind = np.where(kind == 'call', '1', np.where(kind == 'put', '0', kind)).astype(float) != 0
+        except ValueError:
+            # the chunk is checked row by row to report the first invalid contract
+            for line, fields in chunk:
+                try:
+                    [float(field) for field in fields[:6]]
+                    if fields[6].strip().lower() not in ('call', 'put'):
+                        float(fields[6])
+                except ValueError:
+                    raise ValueError("{path}, line {line}: invalid contract {row}".format(
+                        path=path, line=line, row=','.join(fields))) from None
+            raise
+
+        book = OptionBook.from_arrays(*values.T, kind)
+        invalid = np.flatnonzero(~book.get_valid())
+
+        if len(invalid):
+            line, fields = chunk[invalid[0]]
+            raise ValueError("{path}, line {line}: contract outside the domain of the models {row} "
+                             "(s, k, t and v have to be positive)".format(
+                                 path=path, line=line, row=','.join(fields)))
+
+        yield book
+
+
+def read_npy_chunks(path, chunk_size):
+    """
+    Reads a .npy file of contracts (see OptionBook.save) in chunks. The file is memory mapped,
+    so the chunks are views of the file. Contracts outside the domain of the models (see
+    OptionBook.get_valid) are invalid.
+
+    :param path: path of the file
+    :param chunk_size: the number of contracts per chunk
+
+    :return: generator of OptionBooks
+    """
+
+    book = OptionBook.load(path)
+
+    for start in range(0, len(book), chunk_size):
+        chunk = book[start:start + chunk_size]
+        invalid = np.flatnonzero(~chunk.get_valid())
+
+        if len(invalid):
+            raise ValueError("{path}, contract {index}: contract outside the domain of the models "
+                             "(s, k, t and v have to be positive)".format(path=path, index=start + invalid[0]))
+
+        yield chunk
+
+
+def count_contracts(path):
+    """
+    Counts the contracts of a file without loading it. The rows of a CSV file are counted with the same reader
+    as they are priced, so empty rows do not count.
+
+    :param path: path of a CSV or .npy file
+
+    :return: the number of contracts
+    """
+
+    if path.endswith('.npy'):
+        return len(OptionBook.load(path))
+
+    return sum(1 for _ in read_csv_rows(path))
+
+
+# pricing
+# --------------------------------------
+def price_chunk(book, args, offset):
+    """
+    Prices the contracts of one chunk with the chosen engine.
+
+    :param book: the OptionBook of the chunk
+    :param args: the parsed command line arguments
+    :param offset: the index of the first contract of the chunk in the file (ids of the Monte-Carlo streams)
+
+    :return: array with the prices (nan where an engine failed)
+    """
+
+    return Simulation.calculate_book(book, args.engine, args.n, args.n_s, args.n_t, args.bc, args.exercise,
+                                     args.grid, args.rannacher_steps, args.antithetic, args.control_variate,
+                                     args.seed, args.lattice, range(offset, offset + len(book)))
+
+
+def price(args):
+    """
+    Prices a file of contracts chunk by chunk and writes the prices after every chunk.
+
+    :param args: the parsed command line arguments
+
+    :return: the exit status
+    """
+
+    if args.engine in ('analytic', 'explicit_fd', 'monte_carlo') and 'european' != args.exercise:
+        print("Error: the {engine} engine only prices european options".format(engine=args.engine),
+              file=sys.stderr)
+        return 2
+
+    if 'sinh' == args.grid and args.n_s < FiniteDifference.min_ns:
+        print("Error: the sinh grid needs at least {n} spot prices".format(n=FiniteDifference.min_ns),
+              file=sys.stderr)
+        return 2
+
+    reader = read_npy_chunks if args.input.endswith('.npy') else read_csv_chunks
+
+    try:
+        total = count_contracts(args.input)
+    except ValueError as e:
+        print("Error: {e}".format(e=e), file=sys.stderr)
+        return 2
+
+    if args.output.endswith('.npy'):
+        output = np.lib.format.open_memmap(args.output, mode='w+', dtype=float, shape=(total,))
+        writer = None
+    else:
+        output = open(args.output, 'w', newline='')
+        writer = csv.writer(output)
+        writer.writerow(('s', 'k', 't', 'r', 'd', 'v', 'kind', 'price'))
+
+    start = time.perf_counter()
+    done = 0
+
+    try:
+        for book in reader(args.input, args.chunk_size):
+            prices = price_chunk(book, args, done)
+
+            if writer is None:
+                output[done:done + len(book)] = prices
+            else:
+                s, k, t, r, d, v, call = book.get_parameters()
+                kind = np.where(call != 0, 'call', 'put')
+                writer.writerows(zip(s.tolist(), k.tolist(), t.tolist(), r.tolist(), d.tolist(), v.tolist(),
+                                     kind, prices.tolist()))
+                output.flush()
+
+            done += len(book)
+
+            if not args.quiet:
+                elapsed = time.perf_counter() - start
+                print("{done}/{total} contracts\t{elapsed:.1f} s\t{rate:.0f} contracts/s".format(
+                    done=done, total=total, elapsed=elapsed, rate=done / elapsed if elapsed else math.inf),
+                    file=sys.stderr)
+    except ValueError as e:
+        # invalid values are only found while the chunks are read
+        print("Error: {e}".format(e=e), file=sys.stderr)
+        return 2
+    finally:
+        if writer is None:
+            output.flush()
+        else:
+            output.close()
+
+    return 0
+
+
+def serve(args):
+    """
+    Runs the pricing server until it is interrupted.
+
+    :param args: the parsed command line arguments
+
+    :return: the exit status
+    """
+
+    server = PricingServer(args.window, args.max_batch, args.workers)
+
+    if args.socket is None:
+        print("listening on {host}:{port}".format(host=args.host, port=args.port), file=sys.stderr)
+    else:
+        print("listening on {path}".format(path=args.socket), file=sys.stderr)
+
+    try:
+        asyncio.run(server.serve_forever(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+def get_parser():
+    """
+    Builds the parser of the command line arguments.
+
+    :return: argparse.ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(description="numeric option pricing")
+    commands = parser.add_subparsers(dest='command')
+
+    commands.add_parser('demo', help="run the demo with the default option (default)")
+
+    parser_price = commands.add_parser('price', help="price a file of contracts")
+    parser_price.add_argument('input', help="CSV (s,k,t,r,d,v,kind) or .npy (OptionBook.save) file")
+    parser_price.add_argument('output', help="CSV or .npy file for the prices")
+    parser_price.add_argument('--engine', choices=engines, default='analytic')
+    parser_price.add_argument('--exercise', choices=('european', 'american'), default='european')
+    parser_price.add_argument('--chunk-size', type=int, default=100000, help="contracts per chunk")
+    parser_price.add_argument('--n', type=int, default=500, help="time steps of the trees, runs of Monte-Carlo")
+    parser_price.add_argument('--lattice', choices=('crr', 'lr', 'bbs'), default='crr',
+                              help="parameters of the binomial tree")
+    parser_price.add_argument('--n-s', type=int, default=200,
+                              help="spot prices of the sinh grid (at least {n})".format(n=FiniteDifference.min_ns))
+    parser_price.add_argument('--n-t', type=int, default=500, help="time steps of the FD methods")
+    parser_price.add_argument('--bc', default='n', help="border conditions of the FD methods (d, n)")
+    parser_price.add_argument('--grid', choices=('uniform', 'sinh'), default='uniform', help="grid of the FD methods")
+    parser_price.add_argument('--rannacher-steps', type=int, default=0, help="Rannacher steps of Crank-Nicolson")
+    parser_price.add_argument('--seed', type=int, help="seed of Monte-Carlo (contract i uses the stream [seed, i])")
+    parser_price.add_argument('--antithetic', action='store_true', help="antithetic variates for Monte-Carlo")
+    parser_price.add_argument('--control-variate', action='store_true', help="control variate for Monte-Carlo")
+    parser_price.add_argument('--quiet', action='store_true', help="no progress output")
+
+    parser_serve = commands.add_parser('serve', help="run the pricing server")
+    parser_serve.add_argument('--socket', help="path of a Unix socket (default: TCP)")
+    parser_serve.add_argument('--host', default='127.0.0.1')
+    parser_serve.add_argument('--port', type=int, default=8765)
+    parser_serve.add_argument('--window', type=float, default=0.002, help="batching window in seconds")
+    parser_serve.add_argument('--max-batch', type=int, default=4096, help="dispatch a batch at this size")
+    parser_serve.add_argument('--workers', type=int, help="worker processes (default: number of CPUs)")
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs the command line interface.
+
+    :param argv: the arguments (None...sys.argv)
+
+    :return: the exit status
+    """
+
+    args = get_parser().parse_args(argv)
 
-my_sim = Simulation(Option())
+    if 'price' == args.command:
+        return price(args)
 
-Option().plot_random_stock_price_path(100)
+    if 'serve' == args.command:
+        return serve(args)
 
-print(my_sim.calculate_analytic())
+    demo()
 
-my_sim.plot_monte_carlo(1, 2000, 100)
-my_sim.plot_binomial_tree(1, 10)
-my_sim.plot_trinomial_tree(1, 10)
-my_sim.plot_explicit_fd(1, 40, 1, 20, 'n')
-my_sim.plot_implicit_fd(1, 40, 1, 20, 'n')
-my_sim.plot_crank_nicolson(1, 40, 1, 20, 'n')
+    return 0
 
 
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,16 @@
 import math
-from scipy.stats import norm
+
+import numpy as np
+from scipy.special import ndtr
+
+from general_classes.Instrumentation import Instrumentation
 
 
 class Analytic:
 
+    # the fields of calculate_greeks_batch
+    greeks = ('price', 'delta', 'gamma', 'vega', 'theta', 'rho', 'epsilon', 'vanna', 'volga', 'charm', 'veta')
+
     def __init__(self, stock):
         """
         Solves the Black–Scholes equation analytically.
@@ -31,8 +38,153 @@ class Analytic:
         d2 = (math.log(s / k) + ((r - d) - vol * vol / 2) * t) / (vol * t ** 0.5)
 
         if 'call' == self.stock.kind:
-            return s * math.exp(-d * t) * norm.cdf(d1) - k * math.exp(-r * t) * norm.cdf(d2)
+            return s * math.exp(-d * t) * ndtr(d1) - k * math.exp(-r * t) * ndtr(d2)
         elif 'put' == self.stock.kind:
-            return k * math.exp(-r * t) * norm.cdf(-d2) - s * math.exp(-d * t) * norm.cdf(-d1)
+            return k * math.exp(-r * t) * ndtr(-d2) - s * math.exp(-d * t) * ndtr(-d1)
         else:
             return False
+
+    @staticmethod
+    def get_call_flags(kind):
+        """
+        Converts the kinds of a batch of options into call and put flags.
+
+        :param kind: 'call'/'put' strings or booleans (True...call, False...put)
+
+        Returns: Tuple
+            - call - true where the option is a call
+            - put - true where the option is a put
+        """
+
+        kind = np.asarray(kind)
+
+        if kind.dtype.kind in 'US':
+            return kind == 'call', kind == 'put'
+
+        call = kind.astype(bool)
+        return call, ~call
+
+    @staticmethod
+    @Instrumentation.guard
+    def calculate_batch(s, k, t, r, d, v, kind):
+        """
+        Calculates the prices of a whole batch of options analytically in one vectorized pass.
+        All parameters are broadcast against each other, so scalars can be mixed with arrays.
+
+        :param s: spot prices
+        :param k: strike prices
+        :param t: times
+        :param r: risk-free interest rates
+        :param d: dividends
+        :param v: volatilities
+        :param kind: 'call'/'put' strings or booleans (True...call, False...put)
+
+        :return: array with the prices after t time. (nan where the kind is unknown)
+        """
+
+        timer = Instrumentation.start('Analytic', 'batch')
+
+        s, k, t, r, d, vol = (np.asarray(x, dtype=float) for x in (s, k, t, r, d, v))
+        d1, d2, sign = Analytic.get_d1_d2(s, k, t, r, d, vol, kind)
+
+        ret = sign * (s * np.exp(-d * t) * ndtr(sign * d1) - k * np.exp(-r * t) * ndtr(sign * d2))
+
+        Instrumentation.stop(timer)
+        Instrumentation.count('Analytic', 'options', ret.size)
+
+        return ret
+
+    @staticmethod
+    @Instrumentation.guard
+    def calculate_greeks_batch(s, k, t, r, d, v, kind):
+        """
+        Calculates the prices and all first- and second-order Greeks of a whole batch of options analytically
+        in one vectorized pass. All parameters are broadcast against each other.
+
+        :param s: spot prices
+        :param k: strike prices
+        :param t: times
+        :param r: risk-free interest rates
+        :param d: dividends
+        :param v: volatilities
+        :param kind: 'call'/'put' strings or booleans (True...call, False...put)
+
+        :return: structured array with the fields of Analytic.greeks (nan where the kind is unknown)
+            - price - the price after t time
+            - delta, gamma - first and second derivative by the spot price
+            - vega, volga - first and second derivative by the volatility
+            - theta - derivative by the passing time (-d/dt)
+            - rho - derivative by the interest rate
+            - epsilon - derivative by the dividend
+            - vanna - derivative of delta by the volatility
+            - charm - derivative of delta by the passing time
+            - veta - derivative of vega by the passing time
+        """
+
+        timer = Instrumentation.start('Analytic', 'greeks_batch')
+
+        s, k, t, r, d, vol = (np.asarray(x, dtype=float) for x in (s, k, t, r, d, v))
+        d1, d2, sign = Analytic.get_d1_d2(s, k, t, r, d, vol, kind)
+
+        sqrt_t = t ** 0.5
+        vol_sqrt_t = vol * sqrt_t
+        q_disc = np.exp(-d * t)
+        s_disc = s * q_disc
+        k_disc = k * np.exp(-r * t)
+
+        cdf_d1 = ndtr(sign * d1)
+        cdf_d2 = ndtr(sign * d2)
+        pdf_d1 = np.exp(-d1 * d1 / 2) / math.sqrt(2 * math.pi)
+
+        ret = np.empty(d1.shape, dtype=[(name, float) for name in Analytic.greeks])
+
+        ret['price'] = sign * (s * q_disc * cdf_d1 - k_disc * cdf_d2)
+        ret['delta'] = sign * q_disc * cdf_d1
+        ret['gamma'] = q_disc * pdf_d1 / (s * vol_sqrt_t)
+        ret['vega'] = s_disc * pdf_d1 * sqrt_t
+        ret['theta'] = (-s_disc * pdf_d1 * vol / (2 * sqrt_t)
+                        - sign * r * k_disc * cdf_d2 + sign * d * s_disc * cdf_d1)
+        ret['rho'] = sign * k_disc * t * cdf_d2
+        ret['epsilon'] = -sign * s_disc * t * cdf_d1
+        ret['vanna'] = -q_disc * pdf_d1 * d2 / vol
+        ret['volga'] = ret['vega'] * d1 * d2 / vol
+        ret['charm'] = (sign * d * q_disc * cdf_d1
+                        - q_disc * pdf_d1 * (2 * (r - d) * t - d2 * vol_sqrt_t) / (2 * t * vol_sqrt_t))
+        ret['veta'] = ret['vega'] * (d + (r - d) * d1 / vol_sqrt_t - (1 + d1 * d2) / (2 * t))
+
+        Instrumentation.stop(timer)
+        Instrumentation.count('Analytic', 'options', ret.size)
+
+        return ret
+
+    @staticmethod
+    def get_d1_d2(s, k, t, r, d, vol, kind):
+        """
+        Calculates the intermediates which are shared by the prices and the Greeks.
+
+        :param s: spot prices
+        :param k: strike prices
+        :param t: times
+        :param r: risk-free interest rates
+        :param d: dividends
+        :param vol: volatilities
+        :param kind: 'call'/'put' strings or booleans (True...call, False...put)
+
+        Returns: Tuple
+            - d1 - the d1 of the Black–Scholes formula
+            - d2 - the d2 of the Black–Scholes formula
+            - sign - 1 for calls, -1 for puts and nan for unknown kinds
+        """
+
+        call, put = Analytic.get_call_flags(kind)
+
+        log_sk = np.log(s / k)
+        vol_sqrt_t = vol * t ** 0.5
+
+        d1 = (log_sk + ((r - d) + vol * vol / 2) * t) / vol_sqrt_t
+        d2 = (log_sk + ((r - d) - vol * vol / 2) * t) / vol_sqrt_t
+
+        # a put is the negated call formula evaluated at -d1 and -d2
+        sign = np.where(call, 1.0, np.where(put, -1.0, np.nan))
+
+        return d1, d2, sign
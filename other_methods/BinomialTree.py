@@ -1,8 +1,18 @@
 import math
 
+import numpy as np
+
+from general_classes.Exercise import Exercise
+from general_classes.Instrumentation import Instrumentation
+from other_methods.Analytic import Analytic
+
 
 class BinomialTree:
 
+    # number of stock prices of all trees which calculate_book keeps at once; bounds the memory used
+    # independently of the size of the book.
+    chunk_elements = 1000000
+
     def __init__(self, stock):
         """
         Solves the Black–Scholes equation using a binomial tree simulation.
@@ -12,11 +22,19 @@ class BinomialTree:
 
         self.stock = stock
 
-    def calculate(self, n):
+    @Instrumentation.guard
+    def calculate(self, n, exercise='european', lattice='crr'):
         """
         Calculates the price using a binomial tree simulation.
+        Only one vector with the values of the current time slice is kept in memory.
 
         :param n: The number of simulation steps.
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan).
+        :param lattice: The parameters of the tree:
+            - crr - Cox-Ross-Rubinstein (the error oscillates with the parity of n)
+            - lr - Leisen-Reimer, centered at the strike price with the Peizer-Pratt inversion
+              (n is rounded up to an odd number)
+            - bbs - Cox-Ross-Rubinstein, where the values of the last step are the analytic prices
 
         :return: The price after t time.
         """
@@ -25,26 +43,264 @@ class BinomialTree:
         k = self.stock.k
         t = self.stock.t
         r = self.stock.r
+        q = self.stock.d
         vol = self.stock.v
 
+        if self.stock.kind not in ('call', 'put'):
+            return False
+
+        timer = Instrumentation.start('BinomialTree', 'parameters')
+
+        parameters = self.get_parameters(n, lattice)
+
+        if parameters is False:
+            return False
+
+        n, u, d, p = parameters
         dt = t / n
-        u = math.exp(vol * math.sqrt(dt))
-        d = 1 / u
-        p = (math.exp(r * dt) - d) / (u - d)
-        c = {}
 
-        if 'call' == self.stock.kind:
-            for m in range(0, n + 1):
-                c[(n, m)] = max(s * (u ** (2 * m - n)) - k, 0)
+        # discounted probabilities of the up and down move
+        p_u = math.exp(-r * dt) * p
+        p_d = math.exp(-r * dt) * (1 - p)
+
+        if 'lr' == lattice:
+            def get_prices(m):
+                j = np.arange(0, m + 1, dtype=float)
+                return s * u ** j * d ** (m - j)
+        else:
+            # every stock price of the tree is s * u**i for some i in [-n, n]
+            prices = s * u ** np.arange(-n, n + 1, dtype=float)
 
-        elif 'put' == self.stock.kind:
-            for m in range(0, n + 1):
-                c[(n, m)] = max(k - s * (u ** (2 * m - n)), 0)
+            def get_prices(m):
+                return prices[n - m:n + m + 1:2]
 
+        steps = Exercise.get_exercise_steps(exercise, n, t)
+
+        if steps is False:
+            return False
+
+        timer = Instrumentation.switch(timer, 'BinomialTree', 'payoff')
+
+        # the slice at which the backward induction starts
+        start = n - 1 if 'bbs' == lattice else n
+
+        if 'bbs' == lattice:
+            c = Analytic.calculate_batch(get_prices(start), k, dt, r, q, vol, self.stock.kind)
+        elif 'call' == self.stock.kind:
+            c = np.maximum(get_prices(start) - k, 0)
         else:
+            c = np.maximum(k - get_prices(start), 0)
+
+        if start < n and steps[start]:
+            self.exercise(c, get_prices(start), np.empty_like(c))
+
+        tmp = np.empty(n)
+
+        Instrumentation.record('BinomialTree', 'n', n)
+        timer = Instrumentation.switch(timer, 'BinomialTree', 'induction')
+
+        for m in range(start, 0, -1):
+            np.multiply(c[1:m + 1], p_u, out=tmp[:m])
+            np.multiply(c[:m], p_d, out=c[:m])
+            c[:m] += tmp[:m]
+
+            if steps[m - 1]:
+                # early exercise at the nodes of the new slice
+                self.exercise(c[:m], get_prices(m - 1), tmp[:m])
+
+        Instrumentation.stop(timer)
+
+        return float(c[0])
+
+    @staticmethod
+    def calculate_book(book, n, exercise='european', lattice='crr'):
+        """
+        Calculates the prices of all options of an OptionBook using binomial trees. The trees of a chunk of
+        options are rolled back together (one column per option), so every time step is one vectorized
+        operation over the chunk instead of one per option. The options are independent of each other, so
+        every price is the same as from calculate, whatever else is in the book.
+
+        :param book: the OptionBook
+        :param n: The number of simulation steps.
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan).
+        :param lattice: The parameters of the trees (crr, lr or bbs; see calculate).
+
+        :return: array with the prices (nan where the parameters are not valid) (False if the lattice is unknown)
+        """
+
+        if lattice not in ('crr', 'lr', 'bbs'):
             return False
 
-        for k in range(n - 1, -1, -1):
-            for m in range(0, k + 1):
-                c[(k, m)] = math.exp(-r * dt) * (p * c[(k + 1, m + 1)] + (1 - p) * c[(k + 1, m)])
-        return c[(0, 0)]
+        prices = np.full(len(book), np.nan)
+        rows = max(1, BinomialTree.chunk_elements // (2 * n + 2))
+
+        for begin in range(0, len(book), rows):
+            BinomialTree.calculate_chunk(book[begin:begin + rows], n, exercise, lattice, prices[begin:begin + rows])
+
+        return prices
+
+    @staticmethod
+    @Instrumentation.guard
+    def calculate_chunk(book, n, exercise, lattice, out):
+        """
+        Rolls back the binomial trees of a chunk of options together (see calculate_book).
+
+        :param book: the OptionBook of the chunk
+        :param n: The number of simulation steps.
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan).
+        :param lattice: 'crr', 'lr' or 'bbs'
+        :param out: array for the prices of the chunk (left unchanged where the parameters or the exercise
+            times are not valid, see OptionBook.get_valid)
+        """
+
+        timer = Instrumentation.start('BinomialTree', 'parameters')
+
+        # the parameters of every tree, calculated like in calculate
+        columns = list()
+        valid = book.get_valid()
+
+        for i, option in enumerate(book):
+            if not valid[i]:
+                continue
+
+            n_tree, u, d, p = BinomialTree(option).get_parameters(n, lattice)
+            dt = option.t / n_tree
+            steps = Exercise.get_exercise_steps(exercise, n_tree, option.t)
+
+            if steps is not False:
+                columns.append((i, u, d, math.exp(-option.r * dt) * p, math.exp(-option.r * dt) * (1 - p), dt, steps))
+
+        if 0 == len(columns):
+            return
+
+        index, u, d, p_u, p_d, dt, steps = (np.array(x) for x in zip(*columns))
+        s, k, t, r, q, vol, call = (x[index] for x in book.get_parameters())
+        steps = steps.T
+        n = steps.shape[0] - 1
+
+        # the exercise values are sign * (price - k)
+        sign = np.where(call, 1.0, -1.0)
+
+        if 'lr' == lattice:
+            def get_prices(m):
+                j = np.arange(0, m + 1, dtype=float)[:, np.newaxis]
+                return s * u ** j * d ** (m - j)
+        else:
+            # every stock price of a tree is s * u**i for some i in [-n, n]
+            prices = np.empty((2 * n + 1, len(index)))
+
+            for column in range(len(index)):
+                prices[:, column] = s[column] * u[column] ** np.arange(-n, n + 1, dtype=float)
+
+            def get_prices(m):
+                return prices[n - m:n + m + 1:2]
+
+        timer = Instrumentation.switch(timer, 'BinomialTree', 'payoff')
+
+        # the slice at which the backward induction starts
+        start = n - 1 if 'bbs' == lattice else n
+
+        if 'bbs' == lattice:
+            c = Analytic.calculate_batch(get_prices(start), k, dt, r, q, vol, call.astype(bool))
+        else:
+            c = np.maximum(sign * (get_prices(start) - k), 0)
+
+        tmp = np.empty_like(c)
+
+        if start < n and steps[start].any():
+            np.multiply(sign, get_prices(start) - k, out=tmp)
+            np.maximum(c, tmp, out=c, where=steps[start])
+
+        Instrumentation.record('BinomialTree', 'n', n)
+        Instrumentation.count('BinomialTree', 'options', len(index))
+        timer = Instrumentation.switch(timer, 'BinomialTree', 'induction')
+
+        for m in range(start, 0, -1):
+            np.multiply(c[1:m + 1], p_u, out=tmp[:m])
+            np.multiply(c[:m], p_d, out=c[:m])
+            c[:m] += tmp[:m]
+
+            if steps[m - 1].any():
+                # early exercise at the nodes of the new slice of the trees which can be exercised
+                np.subtract(get_prices(m - 1), k, out=tmp[:m])
+                tmp[:m] *= sign
+                np.maximum(c[:m], tmp[:m], out=c[:m], where=steps[m - 1])
+
+        Instrumentation.stop(timer)
+
+        out[index] = c[0]
+
+    def exercise(self, c, prices, tmp):
+        """
+        Replaces the values of a time slice with the exercise values where these are larger.
+
+        :param c: the values of the slice (changed in place)
+        :param prices: the stock prices of the slice
+        :param tmp: array of the size of the slice for the exercise values
+        """
+
+        if 'call' == self.stock.kind:
+            np.subtract(prices, self.stock.k, out=tmp)
+        else:
+            np.subtract(self.stock.k, prices, out=tmp)
+
+        np.maximum(c, tmp, out=c)
+
+    def get_parameters(self, n, lattice='crr'):
+        """
+        Calculates the parameters of the tree.
+
+        :param n: The number of simulation steps.
+        :param lattice: 'crr', 'lr' or 'bbs' (see calculate)
+
+        Returns: Tuple (False if the lattice is unknown)
+            - n - the number of steps (odd for lr)
+            - u - the factor of an up move
+            - d - the factor of a down move
+            - p - the probability of an up move
+        """
+
+        t = self.stock.t
+        r = self.stock.r
+        q = self.stock.d
+        vol = self.stock.v
+
+        if lattice in ('crr', 'bbs'):
+            dt = t / n
+            u = math.exp(vol * math.sqrt(dt))
+            d = 1 / u
+            p = (math.exp((r - q) * dt) - d) / (u - d)
+
+            return n, u, d, p
+
+        if 'lr' == lattice:
+            n += 1 - n % 2
+            dt = t / n
+
+            d1 = (math.log(self.stock.s / self.stock.k) + (r - q + vol * vol / 2) * t) / (vol * math.sqrt(t))
+            d2 = d1 - vol * math.sqrt(t)
+
+            p = self.peizer_pratt(d2, n)
+            growth = math.exp((r - q) * dt)
+            u = growth * self.peizer_pratt(d1, n) / p
+            d = (growth - p * u) / (1 - p)
+
+            return n, u, d, p
+
+        return False
+
+    @staticmethod
+    def peizer_pratt(z, n):
+        """
+        The Peizer-Pratt inversion (method 2): the probability of a binomial distribution with n steps
+        whose tail approximates the normal distribution function at z.
+
+        :param z: the value of the normal distribution
+        :param n: the number of steps (odd)
+
+        :return: the probability
+        """
+
+        x = z / (n + 1 / 3 + 0.1 / (n + 1))
+
+        return 0.5 + math.copysign(math.sqrt(0.25 - 0.25 * math.exp(-x * x * (n + 1 / 6))), z)
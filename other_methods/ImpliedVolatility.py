@@ -0,0 +1,157 @@
+import math
+
+import numpy as np
+from scipy.special import ndtr
+
+from other_methods.Analytic import Analytic
+
+
+class ImpliedVolatility:
+
+    def __init__(self, stock):
+        """
+        Inverts the Black–Scholes formula of Analytic for the volatility.
+
+        :param stock: The stock for witch the volatility should be calculated. (class Stock)
+        """
+
+        self.stock = stock
+
+    def calculate(self, price, tol=1e-10, max_iter=50):
+        """
+        Calculates the volatility at which Analytic reproduces the price.
+
+        :param price: The price of the option.
+        :param tol: The accuracy of the volatility.
+        :param max_iter: The maximum number of iterations.
+
+        :return: The implied volatility. (False if there is none or it did not converge)
+        """
+
+        vol, iterations, converged = self.calculate_batch(price, self.stock.s, self.stock.k, self.stock.t,
+                                                          self.stock.r, self.stock.d, self.stock.kind, tol, max_iter)
+
+        if not converged:
+            return False
+
+        return float(vol)
+
+    @staticmethod
+    def calculate_batch(price, s, k, t, r, d, kind, tol=1e-10, max_iter=50):
+        """
+        Calculates the implied volatilities of a whole batch of quotes at once.
+        Every quote is turned into the out-of-the-money option of its strike by the put-call parity. Starting
+        at the rational approximation of Corrado and Miller, Halley iterations are run on all quotes which have
+        not converged yet. The iterations work on the logarithm of the price, so that far out-of-the-money
+        quotes converge as fast as the others. A step which leaves the bracket of the root is replaced by a
+        bisection. Quotes whose out-of-the-money price is at the level of the rounding errors, or where a change
+        of the volatility by tol does not change the price by more than its rounding error, fail.
+
+        :param price: the prices of the options
+        :param s: spot prices
+        :param k: strike prices
+        :param t: times
+        :param r: risk-free interest rates
+        :param d: dividends
+        :param kind: 'call'/'put' strings or booleans (True...call, False...put)
+        :param tol: the accuracy of the volatility
+        :param max_iter: the maximum number of iterations
+
+        Returns: Tuple
+            - vol - the implied volatilities (nan where the quote failed)
+            - iterations - the number of iterations of every quote
+            - converged - true where the quote converged
+        """
+
+        call, put = Analytic.get_call_flags(kind)
+        price, s, k, t, r, d, call, put = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, s, k, t, r, d)),
+                                                              call, put)
+
+        s_disc = s * np.exp(-d * t)
+        k_disc = k * np.exp(-r * t)
+        parity = s_disc - k_disc  # call - put
+
+        # the out-of-the-money option: call if the forward is below the strike
+        sign = np.where(parity <= 0, 1.0, -1.0)
+        call_price = np.where(call.astype(bool), price, price + parity)
+        put_price = np.where(call.astype(bool), price - parity, price)
+
+        # a quote of the out-of-the-money option is used as it is, since a conversion by the parity would add
+        # and subtract a large number and round the small price away
+        target = np.where(sign > 0, call_price, put_price)
+
+        upper = np.where(sign > 0, s_disc, k_disc)
+
+        # the absolute rounding error of the target, which is large if the quote was converted by the parity.
+        # A target at or below it carries no information about the volatility.
+        eps = np.finfo(float).eps
+        converted = call.astype(bool) != (sign > 0)
+        resolution = 4 * eps * (np.abs(price) + np.where(converted, np.abs(parity), 0))
+
+        valid = (call.astype(bool) | put.astype(bool)) & (t > 0) & (target > resolution) & (target < upper)
+
+        # rational initial guess of Corrado and Miller
+        x = call_price - parity / 2
+        guess = (math.sqrt(2 * math.pi) / np.sqrt(np.where(t > 0, t, 1)) / (s_disc + k_disc)
+                 * (x + np.sqrt(np.maximum(x * x - parity * parity / math.pi, 0))))
+
+        vol = np.where(valid & np.isfinite(guess), np.clip(guess, 0.01, 2), np.nan)
+        lo = np.zeros(vol.shape)
+        hi = np.full(vol.shape, np.inf)
+        iterations = np.zeros(vol.shape, dtype=int)
+        converged = np.zeros(vol.shape, dtype=bool)
+
+        active = np.flatnonzero(valid)
+
+        for it in range(0, max_iter):
+            if 0 == active.size:
+                break
+
+            v = vol.flat[active]
+            sqrt_t = np.sqrt(t.flat[active])
+            sd, kd, sg = s_disc.flat[active], k_disc.flat[active], sign.flat[active]
+
+            d1 = (np.log(sd / kd) + v * v / 2 * t.flat[active]) / (v * sqrt_t)
+            d2 = d1 - v * sqrt_t
+
+            terms = sd * ndtr(sg * d1), kd * ndtr(sg * d2)
+            model = sg * (terms[0] - terms[1])
+            vega = sd * np.exp(-d1 * d1 / 2) / math.sqrt(2 * math.pi) * sqrt_t
+
+            # the price increases with the volatility
+            f = model - target.flat[active]
+            lo.flat[active] = np.where(f < 0, v, lo.flat[active])
+            hi.flat[active] = np.where(f > 0, v, hi.flat[active])
+
+            # Halley step on g = log(model) - log(target), which stays well scaled for tiny prices:
+            # g' = vega / model and g'' = g' * (d1 * d2 / vol - g')
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                g = np.log(model) - np.log(target.flat[active])
+                g1 = vega / model
+                g2 = g1 * (d1 * d2 / v - g1)
+                newton = g / g1
+                denominator = 1 - 0.5 * newton * g2 / g1
+                new = v - np.where(denominator > 0, newton / denominator, newton)
+
+            # a step below the tolerance is accepted even if rounding put the root just outside the bracket
+            done = (np.abs(new - v) < tol) | (0 == f)
+
+            # if a change of the volatility by tol changes the price by less than the rounding errors of the target
+            # and the model, the step is only noise and the volatility is not determined to tol
+            error = resolution.flat[active] + 4 * eps * (terms[0] + terms[1])
+            failed = (vega * tol < error) & ((np.abs(new - v) < tol) | (0 == f) | (np.abs(f) < error))
+            done = done & ~failed
+
+            a, b = lo.flat[active], hi.flat[active]
+            outside = ~done & (~np.isfinite(new) | (new <= a) | (new >= b))
+            new = np.where(outside, np.where(np.isinf(b), 2 * v, (a + b) / 2), new)
+
+            vol.flat[active] = new
+            iterations.flat[active] += 1
+
+            converged.flat[active[done]] = True
+            active = active[~done & ~failed]
+
+        vol = np.where(converged, vol, np.nan)
+
+        return vol, iterations, converged
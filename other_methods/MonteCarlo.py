@@ -1,10 +1,18 @@
 import math
-from scipy.stats import norm
-import random
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from general_classes.Instrumentation import Instrumentation
+from general_classes.PathGenerator import PathGenerator
 
 
 class MonteCarlo:
 
+    # number of random paths drawn at once; bounds the memory used independently of n.
+    chunk_size = 1000000
+
     def __init__(self, stock):
         """
         Solves the Black–Scholes equation using a Monte-Carlo simulation.
@@ -14,38 +22,313 @@ class MonteCarlo:
 
         self.stock = stock
 
-    def calculate(self, n):
+    def calculate(self, n, antithetic=False, control_variate=False, seed=None):
         """
         Calculates the price using a Monte-Carlo Simulation.
 
         :param n: The number of simulation runs.
+        :param antithetic: If true, every normal draw is also used with its negated value.
+        :param control_variate: If true, the discounted stock price is used as a control variate.
+        :param seed: The seed (or numpy.random.Generator) for the random numbers.
 
         :return: The price after t time.
         """
 
+        ret = self.calculate_with_error(n, antithetic, control_variate, seed)
+
+        if ret is False:
+            return False
+
+        return ret[0]
+
+    def calculate_with_error(self, n, antithetic=False, control_variate=False, seed=None):
+        """
+        Calculates the price and its standard error using a Monte-Carlo Simulation.
+
+        :param n: The number of simulation runs.
+        :param antithetic: If true, every normal draw is also used with its negated value.
+            Only n / 2 normals are drawn and every pair counts as one sample.
+        :param control_variate: If true, the discounted stock price, whose expectation is known in the
+            Black–Scholes model, is used as a control variate.
+        :param seed: The seed (or numpy.random.Generator) for the random numbers.
+
+        Returns: Tuple
+            - price - the price after t time
+            - error - the standard error of the price
+        """
+
+        if self.stock.kind not in ('call', 'put'):
+            return False
+
+        sums = self.simulate(n, np.random.default_rng(seed), antithetic)
+
+        return self.get_price_and_error(sums, control_variate)
+
+    def calculate_parallel(self, n, workers=None, antithetic=False, control_variate=False, seed=None,
+                           streams=None):
+        """
+        Calculates the price and its standard error using a Monte-Carlo Simulation whose runs are split
+        into independent random streams (numpy.random.SeedSequence.spawn) and distributed to a process pool.
+        The sums of the streams are merged in the order of the streams, so the result only depends on the
+        seed and the number of streams, not on the number of processes which computed them.
+
+        :param n: The number of simulation runs.
+        :param workers: The number of worker processes (None...all cores, 1...serial).
+        :param antithetic: If true, every normal draw is also used with its negated value.
+        :param control_variate: If true, the discounted stock price is used as a control variate.
+        :param seed: The seed (int or numpy.random.SeedSequence) for the random numbers.
+        :param streams: The number of random streams (None...the number of workers).
+
+        Returns: Tuple
+            - price - the price after t time
+            - error - the standard error of the price
+        """
+
+        if self.stock.kind not in ('call', 'put'):
+            return False
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if streams is None:
+            streams = workers
+
+        if streams < 1:
+            return False
+
+        if isinstance(seed, np.random.SeedSequence):
+            # spawn advances the counter of a sequence, so the sequence of the caller is copied
+            seed = np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key, pool_size=seed.pool_size)
+        else:
+            seed = np.random.SeedSequence(seed)
+
+        shares = [n // streams + (i < n % streams) for i in range(0, streams)]
+        rngs = [np.random.default_rng(child) for child in seed.spawn(streams)]
+
+        if workers <= 1 or streams == 1:
+            results = list(map(self.simulate, shares, rngs, [antithetic] * streams))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, streams)) as pool:
+                results = list(pool.map(self.simulate, shares, rngs, [antithetic] * streams))
+
+        sums = np.zeros(6)
+
+        for result in results:
+            sums += result
+
+        return self.get_price_and_error(sums, control_variate)
+
+    @Instrumentation.guard
+    def simulate(self, n, rng, antithetic=False):
+        """
+        Simulates the stock price at time t in chunks and accumulates the sums which are needed for the
+        price, the standard error and the control variate.
+
+        :param n: The number of simulation runs.
+        :param rng: The numpy.random.Generator which draws the normals.
+        :param antithetic: If true, every normal draw is also used with its negated value.
+
+        :return: array with the number of samples, sum(y), sum(y*y), sum(x), sum(x*x) and sum(x*y),
+            where y is the discounted payoff and x the discounted stock price.
+        """
+
+        timer = Instrumentation.start('MonteCarlo', 'simulate')
+
         s = self.stock.s
         k = self.stock.k
         t = self.stock.t
         r = self.stock.r
+        q = self.stock.d
         vol = self.stock.v
 
-        sum_price = 0
+        drift = (r - q - vol * vol / 2) * t
+        diffusion = vol * math.sqrt(t)
+        discount = math.exp(-r * t)
+        sign = 1 if 'call' == self.stock.kind else -1
 
-        if 'call' == self.stock.kind:
-            for j in range(2, n):
-                stock_price = s * math.exp((r - vol * vol / 2) * t + vol * norm.ppf(random.uniform(0, 1)) * math.sqrt(t))
-                option_price = math.exp(-r * t) * max(stock_price - k, 0)
+        if antithetic:
+            n = (n + 1) // 2
 
-                sum_price = sum_price + option_price
+        sums = np.zeros(6)
 
-        elif 'put' == self.stock.kind:
-            for j in range(2, n):
-                stock_price = s * math.exp((r - vol * vol / 2) * t + vol * norm.ppf(random.uniform(0, 1)) * math.sqrt(t))
-                option_price = math.exp(-r * t) * max(k - stock_price, 0)
+        for start in range(0, n, self.chunk_size):
+            z = rng.standard_normal(min(self.chunk_size, n - start))
+
+            x = discount * s * np.exp(drift + diffusion * z)
+            y = np.maximum(sign * (x - discount * k), 0)
+
+            if antithetic:
+                x_anti = discount * s * np.exp(drift - diffusion * z)
+                x = (x + x_anti) / 2
+                y = (y + np.maximum(sign * (x_anti - discount * k), 0)) / 2
+
+            sums += (len(z), y.sum(), y @ y, x.sum(), x @ x, x @ y)
+
+        Instrumentation.stop(timer)
+        Instrumentation.count('MonteCarlo', 'paths', n)
+
+        return sums
+
+    def calculate_path_dependent(self, payoff, n, n_steps, control_variate=False, seed=None):
+        """
+        Calculates the price and its standard error of a path-dependent option. The paths are generated
+        and priced chunk by chunk, so n is not limited by the memory.
+
+        :param payoff: 'european', 'asian', 'lookback' or a function (see calculate_from_paths)
+        :param n: The number of simulation runs.
+        :param n_steps: The number of time steps of every path.
+        :param control_variate: If true, the discounted stock price is used as a control variate.
+        :param seed: The seed (or numpy.random.Generator) for the random numbers.
 
-                sum_price = sum_price + option_price
+        Returns: Tuple
+            - price - the price after t time
+            - error - the standard error of the price
+        """
+
+        chunks = PathGenerator(self.stock).generate_chunks(n, n_steps, seed=seed)
+
+        return self.calculate_from_paths(payoff, chunks, control_variate)
+
+    def calculate_qmc(self, n, n_steps=1, payoff='european', replicates=16, seed=None):
+        """
+        Calculates the price and its standard error using a randomized quasi-Monte-Carlo simulation.
+        The paths are built from independently scrambled Sobol sequences with a Brownian bridge
+        (see PathGenerator.generate_sobol_chunks). The price is the mean of the replicates and the
+        standard error is estimated from their spread.
+
+        :param n: The number of simulation runs. It is rounded up to replicates times a power of two.
+        :param n_steps: The number of time steps of every path (1 is enough for european options).
+        :param payoff: 'european', 'asian', 'lookback' or a function (see calculate_from_paths)
+        :param replicates: The number of independent scramblings (at least 2).
+        :param seed: The seed (or numpy.random.Generator) of the scramblings.
+
+        Returns: Tuple
+            - price - the price after t time
+            - error - the standard error of the price
+        """
+
+        if replicates < 2:
+            return False
+
+        rng = np.random.default_rng(seed)
+        generator = PathGenerator(self.stock)
+
+        n_replicate = 1 << max(0, math.ceil(math.log2(max(n, 1) / replicates)))
+        prices = np.zeros(replicates)
+
+        for i in range(replicates):
+            ret = self.calculate_from_paths(payoff, generator.generate_sobol_chunks(n_replicate, n_steps, seed=rng))
+
+            if ret is False:
+                return False
+
+            prices[i] = ret[0]
+
+        return float(prices.mean()), float(prices.std(ddof=1) / math.sqrt(replicates))
+
+    @Instrumentation.guard
+    def calculate_from_paths(self, payoff, paths, control_variate=False):
+        """
+        Calculates the price and its standard error of a path-dependent option from stored paths.
+
+        :param payoff: 'european', 'asian' (arithmetic average of the time steps after the start),
+            'lookback' (fixed strike) or a function which takes an array of paths (one path per row)
+            and returns the payoff of every path.
+        :param paths: array of shape (n, n_steps + 1) (e.g. a memory map from PathGenerator.write)
+            or an iterable of such arrays (e.g. PathGenerator.generate_chunks)
+        :param control_variate: If true, the discounted stock price is used as a control variate.
+
+        Returns: Tuple
+            - price - the price after t time
+            - error - the standard error of the price
+        """
+
+        if not callable(payoff):
+            payoff = self.get_payoff(payoff)
+
+        if payoff is False:
+            return False
+
+        if isinstance(paths, np.ndarray):
+            store = paths
+            rows = PathGenerator(self.stock).get_chunk_size(store.shape[1] - 1)
+            paths = (store[start:start + rows] for start in range(0, len(store), rows))
+
+        timer = Instrumentation.start('MonteCarlo', 'paths')
+
+        discount = math.exp(-self.stock.r * self.stock.t)
+        sums = np.zeros(6)
+
+        for chunk in paths:
+            x = discount * chunk[:, -1]
+            y = discount * payoff(chunk)
 
+            sums += (len(chunk), y.sum(), y @ y, x.sum(), x @ x, x @ y)
+
+        Instrumentation.stop(timer)
+        Instrumentation.count('MonteCarlo', 'paths', int(sums[0]))
+
+        return self.get_price_and_error(sums, control_variate)
+
+    def get_payoff(self, name):
+        """
+        Returns the payoff function of a path-dependent option with the strike price and kind of the stock.
+
+        :param name: 'european', 'asian' or 'lookback'
+
+        :return: function which takes an array of paths and returns the payoffs (False if unknown)
+        """
+
+        k = self.stock.k
+
+        if 'call' == self.stock.kind:
+            sign = 1
+        elif 'put' == self.stock.kind:
+            sign = -1
         else:
             return False
 
-        return sum_price / n
+        if 'european' == name:
+            return lambda paths: np.maximum(sign * (paths[:, -1] - k), 0)
+        elif 'asian' == name:
+            return lambda paths: np.maximum(sign * (paths[:, 1:].mean(axis=1) - k), 0)
+        elif 'lookback' == name:
+            extreme = np.max if 1 == sign else np.min
+            return lambda paths: np.maximum(sign * (extreme(paths, axis=1) - k), 0)
+        else:
+            return False
+
+    def get_price_and_error(self, sums, control_variate=False):
+        """
+        Calculates the price and its standard error from the accumulated sums.
+
+        :param sums: The sums as returned by simulate.
+        :param control_variate: If true, the discounted stock price is used as a control variate.
+
+        Returns: Tuple
+            - price - the price after t time
+            - error - the standard error of the price
+        """
+
+        n, sum_y, sum_yy, sum_x, sum_xx, sum_xy = sums
+
+        mean_y = sum_y / n
+
+        if n < 2:
+            return float(mean_y), math.nan
+
+        var_y = (sum_yy - n * mean_y * mean_y) / (n - 1)
+
+        if control_variate:
+            mean_x = sum_x / n
+            var_x = (sum_xx - n * mean_x * mean_x) / (n - 1)
+            cov_xy = (sum_xy - n * mean_x * mean_y) / (n - 1)
+
+            if var_x > 0:
+                beta = cov_xy / var_x
+                expected_x = self.stock.s * math.exp(-self.stock.d * self.stock.t)
+
+                mean_y = mean_y - beta * (mean_x - expected_x)
+                var_y = var_y - beta * cov_xy
+
+        return float(mean_y), math.sqrt(max(var_y, 0) / n)
@@ -1,5 +1,10 @@
 import math
 
+import numpy as np
+
+from general_classes.Exercise import Exercise
+from general_classes.Instrumentation import Instrumentation
+
 
 class TrinomialTree:
 
@@ -12,15 +17,39 @@ class TrinomialTree:
 
         self.stock = stock
 
-    def calculate(self, n):
+    def calculate(self, n, exercise='european'):
         """
         Calculates the price using a trinomial tree simulation.
 
         :param n: The number of simulation steps.
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan).
 
         :return: The price after t time.
         """
 
+        ret = self.calculate_with_greeks(n, exercise)
+
+        if ret is False:
+            return False
+
+        return ret[0]
+
+    @Instrumentation.guard
+    def calculate_with_greeks(self, n, exercise='european'):
+        """
+        Calculates the price using a trinomial tree simulation. Delta and gamma are read off the three
+        nodes of the first time slice, so they come at no extra cost.
+        Only one vector with the values of the current time slice is kept in memory.
+
+        :param n: The number of simulation steps.
+        :param exercise: 'european', 'american' or a sorted list of exercise times (bermudan).
+
+        Returns: Tuple
+            - price - the price after t time
+            - delta - the first derivative of the price by the spot price
+            - gamma - the second derivative of the price by the spot price
+        """
+
         s = self.stock.s
         k = self.stock.k
         t = self.stock.t
@@ -28,29 +57,69 @@ class TrinomialTree:
         q = self.stock.d
         sigma = self.stock.v
 
+        timer = Instrumentation.start('TrinomialTree', 'parameters')
+
         dt = t / n
         sigma_sqr = sigma * sigma
+        discount = math.exp(-r * dt)
 
         u = math.exp(sigma * math.sqrt(3 * dt))
         # d = 1 / u
         p_u = 1 / 6 + math.sqrt(dt / (12 * sigma_sqr)) * (r - q - 0.5 * sigma_sqr)
         p_m = 2 / 3
         p_d = 1 / 6 - math.sqrt(dt / (12 * sigma_sqr)) * (r - q - 0.5 * sigma_sqr)
-        c = {}
 
-        if 'call' == self.stock.kind:
-            for m in range(0, n * 2 + 1):
-                c[(n, m)] = max(s * (u ** (m - n)) - k, 0)
+        # discounted probabilities
+        p_u = discount * p_u
+        p_m = discount * p_m
+        p_d = discount * p_d
 
-        elif 'put' == self.stock.kind:
-            for m in range(0, n * 2 + 1):
-                c[(n, m)] = max(k - s * (u ** (m - n)), 0)
+        prices = s * u ** np.arange(-n, n + 1, dtype=float)
+
+        timer = Instrumentation.switch(timer, 'TrinomialTree', 'payoff')
 
+        if 'call' == self.stock.kind:
+            c = np.maximum(prices - k, 0)
+        elif 'put' == self.stock.kind:
+            c = np.maximum(k - prices, 0)
         else:
             return False
 
-        for k in range(n - 1, -1, -1):
-            for m in range(0, k + k + 1):
-                c[(k, m)] = math.exp(-r * dt) * (
-                            p_u * c[(k + 1, m + 2)] + p_m * c[(k + 1, m + 1)] + p_d * c[(k + 1, m)])
-        return c[(0, 0)]
+        steps = Exercise.get_exercise_steps(exercise, n, t)
+
+        if steps is False:
+            return False
+
+        tmp_m = np.empty(2 * n - 1)
+        tmp_u = np.empty(2 * n - 1)
+        delta = gamma = math.nan
+
+        Instrumentation.record('TrinomialTree', 'n', n)
+        timer = Instrumentation.switch(timer, 'TrinomialTree', 'induction')
+
+        for m in range(n - 1, -1, -1):
+            if 0 == m:
+                # the first slice holds the nodes s * d, s and s * u
+                s_d = s / u
+                s_u = s * u
+                delta = (c[2] - c[0]) / (s_u - s_d)
+                gamma = ((c[2] - c[1]) / (s_u - s) - (c[1] - c[0]) / (s - s_d)) / (0.5 * (s_u - s_d))
+
+            w = 2 * m + 1
+            np.multiply(c[1:w + 1], p_m, out=tmp_m[:w])
+            np.multiply(c[2:w + 2], p_u, out=tmp_u[:w])
+            c[:w] *= p_d
+            c[:w] += tmp_m[:w]
+            c[:w] += tmp_u[:w]
+
+            if steps[m]:
+                # early exercise at the nodes s * u**(j - m) of the new slice
+                if 'call' == self.stock.kind:
+                    np.subtract(prices[n - m:n + m + 1], k, out=tmp_m[:w])
+                else:
+                    np.subtract(k, prices[n - m:n + m + 1], out=tmp_m[:w])
+                np.maximum(c[:w], tmp_m[:w], out=c[:w])
+
+        Instrumentation.stop(timer)
+
+        return float(c[0]), float(delta), float(gamma)
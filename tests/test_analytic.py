@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from general_classes.OptionBook import OptionBook
+from general_classes.Simulation import Simulation
+from other_methods.Analytic import Analytic
+
+
+def get_book(m=64, seed=0):
+    """
+    A book of random calls and puts.
+
+    :param m: the number of options
+    :param seed: the seed of the parameters
+
+    :return: OptionBook
+    """
+
+    rng = np.random.default_rng(seed)
+
+    return OptionBook.from_arrays(rng.uniform(30, 60, m), rng.uniform(30, 60, m), rng.uniform(0.1, 2, m),
+                                  rng.uniform(0, 0.1, m), rng.uniform(0, 0.05, m), rng.uniform(0.1, 0.5, m),
+                                  rng.random(m) < 0.5)
+
+
+def test_batch_matches_scalar():
+    book = get_book()
+    scalar = np.array([Analytic(option).calculate() for option in book])
+
+    np.testing.assert_allclose(Analytic.calculate_batch(*book.get_parameters()), scalar, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(Simulation.calculate_book(book, 'analytic'), scalar, rtol=1e-12, atol=1e-12)
+
+
+def test_batch_broadcasts_scalars():
+    strikes = np.array([36.0, 40.0, 44.0])
+    prices = Analytic.calculate_batch(42, strikes, 1, 0.1, 0, 0.2, 'put')
+
+    assert prices.shape == (3,)
+    assert np.all(np.diff(prices) > 0)
+
+
+def test_batch_put_call_parity():
+    book = get_book()
+    s, k, t, r, d, v, _ = book.get_parameters()
+
+    calls = Analytic.calculate_batch(s, k, t, r, d, v, True)
+    puts = Analytic.calculate_batch(s, k, t, r, d, v, False)
+
+    np.testing.assert_allclose(calls - puts, s * np.exp(-d * t) - k * np.exp(-r * t), rtol=1e-10, atol=1e-10)
+
+
+def test_batch_unknown_kind_is_nan():
+    assert np.isnan(Analytic.calculate_batch(42, 40, 1, 0.1, 0, 0.2, ['foo'])[0])
+
+
+# greeks
+# --------------------------------------
+def get_bumped(name, parameters, h, field='price'):
+    """
+    The central difference of a field of calculate_greeks_batch by one parameter.
+
+    :param name: the parameter (s, t, r, d or v)
+    :param parameters: dictionary with s, k, t, r, d, v and kind
+    :param h: the size of the bump
+    :param field: the field which is differentiated
+
+    :return: the central difference
+    """
+
+    up = dict(parameters, **{name: parameters[name] + h})
+    down = dict(parameters, **{name: parameters[name] - h})
+
+    return (Analytic.calculate_greeks_batch(**up)[field] - Analytic.calculate_greeks_batch(**down)[field]) / (2 * h)
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_greeks_match_bumps(kind):
+    book = get_book(16, seed=4)
+    s, k, t, r, d, v, _ = book.get_parameters()
+    parameters = dict(s=s, k=k, t=t, r=r, d=d, v=v, kind=kind)
+    greeks = Analytic.calculate_greeks_batch(**parameters)
+
+    # (greek, parameter, field, sign) where the passing time is the negative time to maturity
+    bumps = [('delta', 's', 'price', 1), ('gamma', 's', 'delta', 1), ('vega', 'v', 'price', 1),
+             ('theta', 't', 'price', -1), ('rho', 'r', 'price', 1), ('epsilon', 'd', 'price', 1),
+             ('vanna', 'v', 'delta', 1), ('volga', 'v', 'vega', 1), ('charm', 't', 'delta', -1),
+             ('veta', 't', 'vega', -1)]
+
+    for greek, name, field, sign in bumps:
+        np.testing.assert_allclose(greeks[greek], sign * get_bumped(name, parameters, 1e-5, field),
+                                   rtol=1e-5, atol=1e-6, err_msg=greek)
+
+    np.testing.assert_allclose(greeks['price'], Analytic.calculate_batch(s, k, t, r, d, v, kind), rtol=1e-12)
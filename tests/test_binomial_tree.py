@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from other_methods.BinomialTree import BinomialTree
+
+
+def get_option(kind):
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, 0.02, 0.2, kind)
+
+    return option
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_matches_full_tree(kind):
+    option = get_option(kind)
+    n = 50
+    n_tree, u, d, p = BinomialTree(option).get_parameters(n)
+    discount = np.exp(-option.r * option.t / n)
+
+    # the whole tree, one slice after the other
+    prices = option.s * u ** np.arange(n, -1, -1) * d ** np.arange(0, n + 1)
+    c = np.maximum(prices - option.k, 0) if 'call' == kind else np.maximum(option.k - prices, 0)
+
+    for _ in range(n, 0, -1):
+        c = discount * (p * c[:-1] + (1 - p) * c[1:])
+
+    assert BinomialTree(option).calculate(n) == pytest.approx(c[0], rel=1e-12)
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_converges_to_analytic(kind):
+    option = get_option(kind)
+
+    assert BinomialTree(option).calculate(2000) == pytest.approx(Analytic(option).calculate(), abs=2e-3)
+
+
+def test_unknown_kind():
+    option = get_option('call')
+    option.kind = 'foo'
+
+    assert BinomialTree(option).calculate(10) is False
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_crr_is_the_default_lattice(kind):
+    method = BinomialTree(get_option(kind))
+
+    assert method.calculate(101) == method.calculate(101, 'european', 'crr')
+    assert method.calculate(101, 'american') == method.calculate(101, 'american', 'crr')
+    assert method.calculate(101, lattice='foo') is False
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_leisen_reimer_converges_with_second_order(kind):
+    option = get_option(kind)
+    method = BinomialTree(option)
+    errors = [abs(method.calculate(n, lattice='lr') - Analytic(option).calculate()) for n in (51, 101, 201)]
+
+    # n is rounded up to an odd number
+    assert method.calculate(100, lattice='lr') == method.calculate(101, lattice='lr')
+    assert errors[0] < 1e-4
+    assert 3.5 < errors[0] / errors[1] < 4.5 and 3.5 < errors[1] / errors[2] < 4.5
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_bbs_does_not_oscillate(kind):
+    option = get_option(kind)
+    exact = Analytic(option).calculate()
+    method = BinomialTree(option)
+
+    crr = [method.calculate(n) - exact for n in (200, 201)]
+    bbs = [method.calculate(n, lattice='bbs') - exact for n in (200, 201)]
+
+    # the error of the smoothed tree hardly depends on the parity of n
+    assert abs(bbs[0] - bbs[1]) < abs(crr[0] - crr[1]) / 10
+    assert abs(method.calculate(400, lattice='bbs') - exact) == pytest.approx(abs(bbs[0]) / 2, rel=0.1)
+
+
+def test_lattices_agree_on_american_options():
+    method = BinomialTree(get_option('put'))
+    reference = method.calculate(2000, 'american')
+
+    assert method.calculate(501, 'american', 'lr') == pytest.approx(reference, abs=2e-3)
+    assert method.calculate(500, 'american', 'bbs') == pytest.approx(reference, abs=2e-3)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from finite_difference_methods.CrankNicolson import CrankNicolson
+from finite_difference_methods.ImplicitFD import ImplicitFD
+
+
+def get_option(kind):
+    option = Option()
+    option.set_option(40, 40, 0.25, 0.05, 0, 0.2, kind)
+
+    return option
+
+
+def get_gamma_error(option, **kwargs):
+    # few time steps on a fine grid: the kink of the payoff makes plain Crank-Nicolson oscillate
+    x, f = CrankNicolson(option, grid='sinh', **kwargs).calculate_grid(200, 20, 'n')
+    gamma = np.gradient(np.gradient(f, x), x)
+    near = (x > 36) & (x < 44)
+    exact = Analytic.calculate_greeks_batch(x[near], option.k, option.t, option.r, option.d, option.v,
+                                            option.kind)['gamma']
+
+    return np.max(np.abs(gamma[near] - exact))
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_rannacher_damps_gamma(kind):
+    option = get_option(kind)
+
+    assert get_gamma_error(option) > 0.1
+    assert get_gamma_error(option, rannacher_steps=2) < 1e-3
+    assert get_gamma_error(option, rannacher_steps=2, smoothing=True) < 1e-3
+
+
+def test_rannacher_steps_are_clamped():
+    option = get_option('put')
+
+    # with as many Rannacher steps as time steps every step is two implicit half steps
+    assert (CrankNicolson(option, rannacher_steps=50).calculate(1, 10, 'n')
+            == CrankNicolson(option, rannacher_steps=10).calculate(1, 10, 'n'))
+    assert CrankNicolson(option, grid='sinh', rannacher_steps=10).calculate(60, 10, 'n') == pytest.approx(
+        ImplicitFD(option, grid='sinh').calculate(60, 20, 'n'), rel=1e-12)
+    assert CrankNicolson(option, rannacher_steps=-1).calculate(1, 10, 'n') is False
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from finite_difference_methods.CrankNicolson import CrankNicolson
+from finite_difference_methods.ImplicitFD import ImplicitFD
+from finite_difference_methods.TridiagonalSystem import TridiagonalSystem
+from general_classes.Exercise import Exercise
+from general_classes.Option import Option
+from other_methods.BinomialTree import BinomialTree
+from other_methods.TrinomialTree import TrinomialTree
+
+
+def get_option(kind):
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, 0.05, 0.2, kind)
+
+    return option
+
+
+def test_exercise_steps():
+    assert not Exercise.get_exercise_steps('european', 4, 1).any()
+    assert list(Exercise.get_exercise_steps('american', 4, 1)) == [True, True, True, True, False]
+    assert list(Exercise.get_exercise_steps([0.25, 1], 4, 1)) == [False, True, False, False, False]
+    assert Exercise.get_exercise_steps([0.5, 0.25], 4, 1) is False
+    assert Exercise.get_exercise_steps([2], 4, 1) is False
+    assert Exercise.get_exercise_steps('foo', 4, 1) is False
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_american_is_worth_more_than_bermudan_and_european(kind):
+    method = BinomialTree(get_option(kind))
+
+    european = method.calculate(500)
+    bermudan = method.calculate(500, [0.25, 0.5, 0.75])
+    american = method.calculate(500, 'american')
+
+    assert european <= bermudan <= american
+    assert european < american
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+@pytest.mark.parametrize('engine', [ImplicitFD, CrankNicolson])
+@pytest.mark.parametrize('exercise', ['american', [0.25, 0.5, 0.75]])
+def test_finite_differences_match_the_trees(kind, engine, exercise):
+    option = get_option(kind)
+    tree = BinomialTree(option).calculate(2000, exercise)
+
+    assert TrinomialTree(option).calculate(1000, exercise) == pytest.approx(tree, abs=3e-3)
+    assert engine(option, grid='sinh').calculate(200, 400, 'n', exercise) == pytest.approx(tree, abs=3e-3)
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+@pytest.mark.parametrize('engine', [ImplicitFD, CrankNicolson])
+def test_solver_backends_agree(kind, engine):
+    option = get_option(kind)
+
+    lapack = engine(option, solver='lapack').calculate(1, 200, 'n', 'american')
+    tridag = engine(option, solver='tridag').calculate(1, 200, 'n', 'american')
+
+    assert lapack == pytest.approx(tridag, rel=1e-10)
+
+
+def test_projected_substitution_matches_loop():
+    rng = np.random.default_rng(0)
+    n = 200
+    y = rng.normal(size=n)
+    gam = rng.uniform(-0.5, 0.5, n)
+    band = np.ones((2, n))
+    band[1, :n - 1] = gam[1:]
+
+    # a payoff which is taken in several separate runs
+    payoff = np.where(np.sin(np.arange(n) / 10) > 0, 2.0, -2.0) + rng.normal(size=n)
+
+    expected = np.empty(n)
+    previous = 0.0
+
+    for j in range(0, n):
+        previous = max(y[j] - gam[j] * previous, payoff[j])
+        expected[j] = previous
+
+    x = TridiagonalSystem.substitute_projected(y, gam, band, payoff)
+
+    assert 2 < np.count_nonzero(np.diff(x == payoff))
+    np.testing.assert_allclose(x, expected, rtol=1e-13, atol=1e-13)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from finite_difference_methods.ExplicitFD import ExplicitFD
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+
+
+def get_option(kind):
+    # the explicit method is only stable on the coarse grid of a small spot price
+    option = Option()
+    option.set_option(1.2, 1, 1, 0.1, 0, 0.2, kind)
+
+    return option
+
+
+def test_stencil_matches_loop():
+    rng = np.random.default_rng(2)
+    f = rng.random(12)
+    a, b, c = rng.random(10), rng.random(10), rng.random(10)
+
+    fm = ExplicitFD.apply_stencil(f, np.zeros(12), a, b, c, np.empty(10))
+    loop = [a[j - 1] * f[j - 1] + b[j - 1] * f[j] + c[j - 1] * f[j + 1] for j in range(1, 11)]
+
+    np.testing.assert_allclose(fm[1:-1], loop, rtol=1e-14)
+
+
+def test_stencil_keeps_the_border():
+    f = np.ones(5)
+    fm = np.full(5, 7.0)
+
+    ExplicitFD.apply_stencil(f, fm, np.ones(3), np.ones(3), np.ones(3), np.empty(3))
+
+    assert fm[0] == fm[4] == 7.0
+    np.testing.assert_array_equal(fm[1:4], 3.0)
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_price_matches_analytic(kind):
+    option = get_option(kind)
+
+    assert ExplicitFD(option).calculate(1, 500, 'n') == pytest.approx(Analytic(option).calculate(), abs=2e-4)
@@ -0,0 +1,37 @@
+import pytest
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from finite_difference_methods.CrankNicolson import CrankNicolson
+from finite_difference_methods.ExplicitFD import ExplicitFD
+from finite_difference_methods.FiniteDifference import FiniteDifference
+from finite_difference_methods.ImplicitFD import ImplicitFD
+
+
+def get_option(kind, d=0.05):
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, d, 0.2, kind)
+
+    return option
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+@pytest.mark.parametrize('d', [0, 0.05])
+def test_sinh_grid_matches_analytic(kind, d):
+    option = get_option(kind, d)
+    exact = Analytic(option).calculate()
+
+    assert ImplicitFD(option, grid='sinh').calculate(160, 1000, 'n') == pytest.approx(exact, abs=2e-3)
+    assert CrankNicolson(option, grid='sinh').calculate(160, 1000, 'n') == pytest.approx(exact, abs=1e-3)
+
+    # the explicit method needs a time step below the finest spacing of the grid
+    assert ExplicitFD(option, 'sinh').calculate(80, 20000, 'n') == pytest.approx(exact, abs=2e-3)
+
+
+@pytest.mark.parametrize('engine', [ExplicitFD, ImplicitFD, CrankNicolson])
+def test_sinh_grid_has_a_minimum_of_spot_prices(engine):
+    option = get_option('call')
+    method = engine(option, grid='sinh')
+
+    assert len(method.calculate_grid(1, 20000, 'n')[0]) == FiniteDifference.min_ns + 1
+    assert method.calculate(1, 20000, 'n') == method.calculate(FiniteDifference.min_ns, 20000, 'n')
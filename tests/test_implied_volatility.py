@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from other_methods.ImpliedVolatility import ImpliedVolatility
+
+
+def test_round_trip():
+    rng = np.random.default_rng(0)
+    m = 2000
+    s, k = rng.uniform(20, 80, m), rng.uniform(20, 80, m)
+    t, r, d = rng.uniform(0.05, 3, m), rng.uniform(0, 0.1, m), rng.uniform(0, 0.05, m)
+    v, call = rng.uniform(0.05, 0.8, m), rng.random(m) < 0.5
+
+    price = Analytic.calculate_batch(s, k, t, r, d, v, call)
+    vol, iterations, converged = ImpliedVolatility.calculate_batch(price, s, k, t, r, d, call)
+
+    # every quote which is reported as converged has to be accurate, the others are nan
+    np.testing.assert_allclose(vol[converged], v[converged], rtol=0, atol=1e-10)
+    assert np.all(np.isnan(vol[~converged]))
+    assert 0.95 < np.mean(converged)
+
+
+def test_rounding_level_quote_fails():
+    # the out-of-the-money call of this put is worth about 1e-14, which is below the rounding error of the parity
+    price = Analytic.calculate_batch(30.44, 58.27, 0.33, 0.05, 0, 0.2, 'put')
+    vol, iterations, converged = ImpliedVolatility.calculate_batch(price, 30.44, 58.27, 0.33, 0.05, 0, 'put')
+
+    assert not converged
+    assert np.isnan(vol)
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_scalar(kind):
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, 0.02, 0.3, kind)
+    price = Analytic(option).calculate()
+
+    assert ImpliedVolatility(option).calculate(price) == pytest.approx(0.3, abs=1e-10)
+    assert ImpliedVolatility(option).calculate(option.s + option.k) is False
@@ -0,0 +1,93 @@
+import json
+import logging
+import tracemalloc
+
+import pytest
+
+from general_classes.Instrumentation import Instrumentation
+from general_classes.Option import Option
+from finite_difference_methods.CrankNicolson import CrankNicolson
+
+
+@pytest.fixture
+def instrumentation():
+    Instrumentation.reset()
+    Instrumentation.enable()
+
+    yield Instrumentation
+
+    Instrumentation.disable()
+    Instrumentation.reset()
+
+
+def get_option():
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, 0, 0.2, 'put')
+
+    return option
+
+
+def test_disabled_records_nothing():
+    Instrumentation.reset()
+    CrankNicolson(get_option()).calculate(1, 50, 'n')
+
+    assert Instrumentation.get_report() == {'phases': [], 'counters': [], 'values': []}
+
+
+def test_phases_counters_and_values(instrumentation):
+    CrankNicolson(get_option()).calculate(1, 50, 'n')
+    report = instrumentation.get_report()
+
+    phases = {entry['phase'] for entry in report['phases'] if 'CrankNicolson' == entry['engine']}
+    counters = {(entry['engine'], entry['name']): entry['count'] for entry in report['counters']}
+
+    assert {'payoff', 'coefficients', 'time_stepping'} <= phases
+    assert counters[('TridiagonalSystem', 'solves')] == 50
+    assert [] == instrumentation.running
+
+
+def test_timers_are_closed_on_early_return(instrumentation):
+    # a negative number of Rannacher steps returns False after the setup phases started
+    assert CrankNicolson(get_option(), rannacher_steps=-1).calculate(1, 50, 'n') is False
+    assert [] == instrumentation.running
+
+
+def test_timers_are_closed_on_exceptions(instrumentation):
+    @Instrumentation.guard
+    def fail():
+        Instrumentation.start('test', 'phase')
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        fail()
+
+    assert [] == instrumentation.running
+    assert 1 == len(instrumentation.phases)
+
+
+def test_tracemalloc_is_only_stopped_by_its_owner():
+    Instrumentation.enable(memory=True)
+    Instrumentation.disable()
+
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+
+    try:
+        Instrumentation.enable(memory=True)
+        Instrumentation.disable()
+
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+        Instrumentation.reset()
+
+
+def test_log_writes_json_lines(instrumentation, caplog):
+    Instrumentation.count('test', 'calls', 3)
+
+    with caplog.at_level(logging.INFO, logger='numeric_option_pricing'):
+        instrumentation.log()
+
+    assert [json.loads(record.message) for record in caplog.records] == [
+        {'kind': 'counters', 'engine': 'test', 'name': 'calls', 'count': 3}]
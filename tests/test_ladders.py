@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from finite_difference_methods.CrankNicolson import CrankNicolson
+from finite_difference_methods.ExplicitFD import ExplicitFD
+from finite_difference_methods.ImplicitFD import ImplicitFD
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+
+
+def get_option(kind):
+    # the explicit method is only stable on the coarse grid of a small spot price
+    option = Option()
+    option.set_option(1.2, 1, 1, 0.1, 0, 0.2, kind)
+
+    return option
+
+
+@pytest.mark.parametrize('engine', [ExplicitFD, ImplicitFD, CrankNicolson])
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_strike_ladder_matches_single_strikes(engine, kind):
+    method = engine(get_option(kind))
+    strikes = [0.9, 1, 1.1]
+
+    ladder = method.calculate_strikes(strikes, 1, 500, 'n')
+    single = [method.calculate_strikes([k], 1, 500, 'n')[0] for k in strikes]
+
+    assert np.all(np.isfinite(ladder))
+    np.testing.assert_allclose(ladder, single, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize('engine', [ImplicitFD, CrankNicolson])
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_strike_ladder_matches_analytic(engine, kind):
+    option = get_option(kind)
+    strikes = np.array([0.9, 1, 1.1])
+
+    ladder = engine(option).calculate_strikes(strikes, 1, 500, 'n')
+    analytic = Analytic.calculate_batch(option.s, strikes, option.t, option.r, option.d, option.v, kind)
+
+    np.testing.assert_allclose(ladder, analytic, atol=5e-4)
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_spot_ladder_matches_analytic(kind):
+    option = get_option(kind)
+    spots = np.array([1.1, 1.2, 1.3])
+
+    price, delta, gamma = CrankNicolson(option).calculate_spots(spots, 1, 500, 'n')
+    greeks = Analytic.calculate_greeks_batch(spots, option.k, option.t, option.r, option.d, option.v, kind)
+
+    np.testing.assert_allclose(price, greeks['price'], atol=2e-4)
+    np.testing.assert_allclose(delta, greeks['delta'], atol=2e-3)
+    # the gamma of the interpolating parabola is constant between two nodes
+    np.testing.assert_allclose(gamma, greeks['gamma'], atol=0.1)
@@ -0,0 +1,76 @@
+import csv
+
+import numpy as np
+import pytest
+
+import main
+from general_classes.OptionBook import OptionBook
+from other_methods.Analytic import Analytic
+
+
+def write_contracts(path, rows):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(('s', 'k', 't', 'r', 'd', 'v', 'kind'))
+        writer.writerows(rows)
+
+    return str(path)
+
+
+def read_prices(path):
+    with open(path, newline='') as file:
+        return [float(row['price']) for row in csv.DictReader(file)]
+
+
+def test_price_csv(tmp_path):
+    contracts = write_contracts(tmp_path / 'contracts.csv', [(42, 40, 1, 0.1, 0, 0.2, 'call'),
+                                                             (42, 40, 1, 0.1, 0, 0.2, 0)])
+    output = str(tmp_path / 'prices.csv')
+
+    assert 0 == main.main(['price', contracts, output, '--quiet'])
+    assert read_prices(output) == pytest.approx(Analytic.calculate_batch(42, 40, 1, 0.1, 0, 0.2, [True, False]))
+
+
+def test_sinh_grid_default(tmp_path):
+    contracts = write_contracts(tmp_path / 'contracts.csv', [(42, 40, 1, 0.1, 0, 0.2, 'call'),
+                                                             (42, 40, 1, 0.1, 0, 0.2, 'put')])
+    output = str(tmp_path / 'prices.csv')
+
+    assert 0 == main.main(['price', contracts, output, '--engine', 'crank_nicolson', '--grid', 'sinh', '--quiet'])
+    assert read_prices(output) == pytest.approx(Analytic.calculate_batch(42, 40, 1, 0.1, 0, 0.2, [True, False]),
+                                                abs=1e-3)
+
+    assert 2 == main.main(['price', contracts, output, '--engine', 'crank_nicolson', '--grid', 'sinh', '--n-s', '1'])
+
+
+@pytest.mark.parametrize('row', [(42, 40, 1, 0.1, 0, 0, 'call'), (42, 40, 0, 0.1, 0, 0.2, 'put'),
+                                 (0, 40, 1, 0.1, 0, 0.2, 'put'), (42, 40, 1, 0.1, 0, 'nan', 'put')])
+def test_contract_outside_the_domain(tmp_path, capsys, row):
+    contracts = write_contracts(tmp_path / 'contracts.csv', [(42, 40, 1, 0.1, 0, 0.2, 'call'), row])
+
+    assert 2 == main.main(['price', contracts, str(tmp_path / 'prices.npy'), '--engine', 'binomial_tree'])
+    assert "contracts.csv, line 3: contract outside the domain" in capsys.readouterr().err
+
+
+def test_npy_contract_outside_the_domain(tmp_path, capsys):
+    contracts = str(tmp_path / 'contracts.npy')
+    OptionBook.from_arrays(42, 40, [1, 1, 0], 0.1, 0, 0.2, 'call').save(contracts)
+
+    assert 2 == main.main(['price', contracts, str(tmp_path / 'prices.npy'), '--engine', 'implicit_fd'])
+    assert "contracts.npy, contract 2: contract outside the domain" in capsys.readouterr().err
+
+
+def test_invalid_contract(tmp_path, capsys):
+    contracts = write_contracts(tmp_path / 'contracts.csv', [(42, 40, 1, 0.1, 0, 0.2, 'foo')])
+
+    assert 2 == main.main(['price', contracts, str(tmp_path / 'prices.csv')])
+    assert "line 2: invalid contract" in capsys.readouterr().err
+
+
+def test_npy_output(tmp_path):
+    contracts = write_contracts(tmp_path / 'contracts.csv', [(42, 40, 1, 0.1, 0, 0.2, 'put')] * 5)
+    output = str(tmp_path / 'prices.npy')
+
+    assert 0 == main.main(['price', contracts, output, '--engine', 'binomial_tree', '--chunk-size', '2', '--quiet'])
+    assert np.load(output) == pytest.approx(np.full(5, Analytic.calculate_batch(42, 40, 1, 0.1, 0, 0.2, 'put')),
+                                            abs=1e-2)
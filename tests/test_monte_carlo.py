@@ -0,0 +1,102 @@
+import math
+
+import numpy as np
+import pytest
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from other_methods.MonteCarlo import MonteCarlo
+
+
+def get_option(kind):
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, 0.02, 0.2, kind)
+
+    return option
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+@pytest.mark.parametrize('antithetic', [False, True])
+@pytest.mark.parametrize('control_variate', [False, True])
+def test_price_matches_analytic(kind, antithetic, control_variate):
+    option = get_option(kind)
+    price, error = MonteCarlo(option).calculate_with_error(200000, antithetic, control_variate, seed=1)
+
+    assert abs(price - Analytic(option).calculate()) < 4 * error
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_variance_reduction(kind):
+    method = MonteCarlo(get_option(kind))
+
+    plain = method.calculate_with_error(100000, seed=2)[1]
+
+    assert method.calculate_with_error(100000, antithetic=True, seed=2)[1] < plain
+    assert method.calculate_with_error(100000, control_variate=True, seed=2)[1] < plain
+
+
+def test_seed_is_reproducible_and_independent_of_the_chunks(monkeypatch):
+    method = MonteCarlo(get_option('put'))
+    price = method.calculate(10000, seed=3)
+
+    assert method.calculate(10000, seed=3) == price
+
+    monkeypatch.setattr(MonteCarlo, 'chunk_size', 999)
+
+    assert method.calculate(10000, seed=3) == pytest.approx(price, rel=1e-12)
+
+
+def test_unknown_kind():
+    option = get_option('call')
+    option.kind = 'foo'
+
+    assert MonteCarlo(option).calculate(100, seed=0) is False
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_qmc_matches_analytic(kind):
+    option = get_option(kind)
+    price, error = MonteCarlo(option).calculate_qmc(2 ** 14, seed=4)
+
+    assert abs(price - Analytic(option).calculate()) < 4 * error
+
+    # the scrambled Sobol points converge much faster than the pseudo-random ones
+    assert error < MonteCarlo(option).calculate_with_error(2 ** 14, seed=4)[1] / 10
+
+
+def test_qmc_path_dependent():
+    option = get_option('call')
+    qmc = MonteCarlo(option).calculate_qmc(2 ** 14, 16, 'asian', seed=5)
+    mc = MonteCarlo(option).calculate_path_dependent('asian', 200000, 16, seed=5)
+
+    assert abs(qmc[0] - mc[0]) < 4 * math.hypot(qmc[1], mc[1])
+
+
+def test_qmc_needs_replicates():
+    assert MonteCarlo(get_option('call')).calculate_qmc(1024, replicates=1) is False
+
+
+def test_parallel_does_not_depend_on_the_workers():
+    method = MonteCarlo(get_option('put'))
+    serial = method.calculate_parallel(40000, workers=1, seed=8, streams=4)
+
+    assert method.calculate_parallel(40000, workers=2, seed=8, streams=4) == serial
+    assert method.calculate_parallel(40000, workers=1, seed=8, streams=3) != serial
+
+
+def test_parallel_matches_analytic():
+    option = get_option('call')
+    price, error = MonteCarlo(option).calculate_parallel(200000, workers=1, control_variate=True, seed=9, streams=8)
+
+    assert abs(price - Analytic(option).calculate()) < 4 * error
+
+
+def test_parallel_does_not_advance_the_seed_sequence():
+    method = MonteCarlo(get_option('put'))
+    seed = np.random.SeedSequence(10)
+
+    first = method.calculate_parallel(10000, workers=1, seed=seed, streams=2)
+
+    assert 0 == seed.n_children_spawned
+    assert method.calculate_parallel(10000, workers=1, seed=seed, streams=2) == first
+    assert method.calculate_parallel(10000, workers=1, streams=0) is False
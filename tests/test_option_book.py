@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from general_classes.Option import Option
+from general_classes.OptionBook import OptionBook
+from other_methods.Analytic import Analytic
+from other_methods.BinomialTree import BinomialTree
+
+
+def get_book():
+    return OptionBook.from_arrays([40, 42, 44, 46], 40, 1, 0.1, 0, 0.2, ['call', 'put', 'call', 'put'])
+
+
+def test_from_arrays():
+    book = get_book()
+
+    assert book.data.shape == (7, 4)
+    assert list(book.s) == [40, 42, 44, 46]
+    assert list(book.k) == [40] * 4
+    assert list(book.kind) == [1, 0, 1, 0]
+
+    with pytest.raises(ValueError):
+        OptionBook.from_arrays(40, 40, 1, 0.1, 0, 0.2, 'foo')
+
+
+def test_from_options():
+    options = list()
+    for kind in ('call', 'put'):
+        option = Option()
+        option.set_option(42, 40, 1, 0.1, 0, 0.2, kind)
+        options.append(option)
+
+    book = OptionBook.from_options(options)
+
+    assert [view.kind for view in book] == ['call', 'put']
+    assert 0 == len(OptionBook.from_options([]))
+
+
+def test_slices_are_views():
+    book = get_book()
+
+    book[1:3].s[:] = 50
+
+    assert list(book.s) == [40, 50, 50, 46]
+    assert np.shares_memory(book.get_parameters()[0], book.data)
+
+
+def test_filter_kind():
+    book = get_book()
+    calls = book.filter_kind('call')
+
+    assert list(calls.s) == [40, 44]
+    assert not np.shares_memory(calls.data, book.data)
+    assert book.filter_kind('foo') is False
+
+    # sorted by kind both kinds are one block, so the filter returns views
+    ordered = book.sort_by_kind()
+
+    assert list(ordered.kind) == [1, 1, 0, 0]
+    assert np.shares_memory(ordered.filter_kind('call').data, ordered.data)
+    assert np.shares_memory(ordered.filter_kind('put').data, ordered.data)
+    assert 0 == len(book.filter_kind('call').filter_kind('put'))
+
+
+def test_view_writes_to_book():
+    book = get_book()
+    view = book[-1]
+
+    view.s = 30
+    view.kind = 'call'
+
+    assert book.s[3] == 30 and book.kind[3] == 1
+
+    view.set_option(1, 2, 3, 4, 5, 6, 'put')
+
+    assert list(book.data[:, 3]) == [1, 2, 3, 4, 5, 6, 0]
+
+    with pytest.raises(IndexError):
+        book[4]
+
+
+def test_view_in_engines():
+    book = get_book()
+
+    # a view has the interface of Option
+    prices = [BinomialTree(view).calculate(100) for view in book]
+
+    assert prices == pytest.approx(Analytic.calculate_batch(*book.get_parameters()), abs=2e-2)
+
+
+def test_save_and_load(tmp_path):
+    book = get_book()
+    path = str(tmp_path / 'book.npy')
+
+    book.save(path)
+    loaded = OptionBook.load(path)
+
+    assert isinstance(loaded.data, np.memmap)
+    assert np.array_equal(loaded.data, book.data)
+
+
+def test_get_valid():
+    book = OptionBook.from_arrays([42, 0, 42, 42, 42, 42], 40, [1, 1, 0, 1, 1, 1], 0.1, 0,
+                                  [0.2, 0.2, 0.2, 0, np.nan, 0.2], 'call')
+
+    assert list(book.get_valid()) == [True, False, False, False, False, True]
@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+import pytest
+
+from general_classes.Option import Option
+from general_classes.PathGenerator import PathGenerator
+from other_methods.Analytic import Analytic
+from other_methods.MonteCarlo import MonteCarlo
+
+
+def get_option(kind='call'):
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, 0.02, 0.2, kind)
+
+    return option
+
+
+def test_log_returns_are_exact():
+    option = get_option()
+    paths = PathGenerator(option).generate(100000, 4, seed=0)
+    returns = np.diff(np.log(paths), axis=1)
+    dt = option.t / 4
+
+    assert np.all(paths[:, 0] == option.s)
+    assert np.all(paths > 0)
+    assert returns.mean() == pytest.approx((option.r - option.d - option.v ** 2 / 2) * dt, abs=1e-3)
+    assert returns.std() == pytest.approx(option.v * math.sqrt(dt), rel=5e-3)
+
+
+def test_chunks_and_memory_map_equal_one_block(tmp_path):
+    generator = PathGenerator(get_option())
+
+    chunks = np.concatenate(list(generator.generate_chunks(1000, 8, chunk_size=300, seed=1)))
+    stored = generator.write(str(tmp_path / 'paths.npy'), 1000, 8, chunk_size=300, seed=1)
+
+    assert chunks.shape == (1000, 9)
+    assert np.array_equal(chunks, stored)
+
+    # the same Generator draws the chunks one after the other
+    rng = np.random.default_rng(1)
+    blocks = [generator.generate(300, 8, rng) for _ in range(3)]
+
+    assert np.array_equal(chunks[:900], np.concatenate(blocks))
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_european_payoff_matches_analytic(kind):
+    option = get_option(kind)
+    price, error = MonteCarlo(option).calculate_path_dependent('european', 100000, 4, seed=2)
+
+    assert abs(price - Analytic(option).calculate()) < 4 * error
+
+
+def test_path_dependent_payoffs():
+    method = MonteCarlo(get_option())
+    european = method.calculate_path_dependent('european', 20000, 12, seed=3)[0]
+
+    # same paths: averaging lowers the value of the call, the maximum raises it
+    assert method.calculate_path_dependent('asian', 20000, 12, seed=3)[0] < european
+    assert method.calculate_path_dependent('lookback', 20000, 12, seed=3)[0] > european
+    assert method.calculate_path_dependent('foo', 10, 2, seed=3) is False
+
+
+def test_stored_paths_match_generated(tmp_path):
+    option = get_option()
+    stored = PathGenerator(option).write(str(tmp_path / 'paths.npy'), 5000, 6, seed=4)
+
+    assert (MonteCarlo(option).calculate_from_paths('asian', stored)
+            == pytest.approx(MonteCarlo(option).calculate_path_dependent('asian', 5000, 6, seed=4), rel=1e-12))
+
+
+def test_brownian_bridge_has_brownian_covariance():
+    z = np.random.default_rng(6).standard_normal((200000, 8))
+    w = PathGenerator.brownian_bridge(z)
+    times = np.arange(1, 9)
+
+    # cov(W(s), W(t)) = min(s, t)
+    assert np.cov(w, rowvar=False) == pytest.approx(np.minimum.outer(times, times), abs=0.05)
+    assert np.array_equal(w[:, -1], math.sqrt(8) * z[:, 0])
+
+
+def test_sobol_paths_are_balanced():
+    option = get_option()
+    chunks = list(PathGenerator(option).generate_sobol_chunks(1024, 4, chunk_size=256, seed=7))
+    paths = np.concatenate(chunks)
+
+    assert [len(chunk) for chunk in chunks] == [256] * 4
+    assert np.all(paths[:, 0] == option.s)
+    assert np.mean(paths[:, -1]) == pytest.approx(option.s * math.exp((option.r - option.d) * option.t), rel=1e-3)
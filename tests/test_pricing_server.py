@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from general_classes.Option import Option
+from general_classes.PricingServer import PricingServer
+from other_methods.BinomialTree import BinomialTree
+
+
+def get_request(request_id, **changes):
+    request = dict(id=request_id, engine='binomial_tree', s=42, k=40, t=1, r=0.1, d=0, v=0.2, kind='put', n=100)
+    request.update(changes)
+
+    return json.dumps(request)
+
+
+def respond(server, lines):
+    async def run():
+        # the requests arrive within one window, so they are priced as one batch
+        return await asyncio.gather(*(server.respond(line) for line in lines))
+
+    return asyncio.run(run())
+
+
+def test_batch_isolates_invalid_requests():
+    server = PricingServer(window=0.01, workers=1)
+    lines = [get_request(1), get_request(2, v=0), get_request(3, t=0), get_request(4, s=44, kind='call')]
+
+    responses = respond(server, lines)
+
+    option = Option()
+    option.set_option(44, 40, 1, 0.1, 0, 0.2, 'call')
+
+    assert 1 == server.batches
+    assert responses[0]['price'] == pytest.approx(respond(PricingServer(workers=1), [get_request(1)])[0]['price'])
+    assert responses[3]['price'] == BinomialTree(option).calculate(100)
+    assert 'error' in responses[1] and 'error' in responses[2]
+    assert 2 == server.errors
+
+
+def test_invalid_requests():
+    server = PricingServer(window=0.001, workers=1)
+
+    responses = respond(server, ['{', '[]', get_request(1, engine='foo'), get_request(2, kind='foo'),
+                                 get_request(3, n={})])
+
+    assert all('error' in response for response in responses)
+    assert [None, None, 1, 2, 3] == [response.get('id') for response in responses]
+
+
+def test_monte_carlo_does_not_depend_on_the_batch():
+    lines = [get_request(i, engine='monte_carlo', n=1000, seed=5, s=40 + i) for i in range(4)]
+
+    alone = respond(PricingServer(window=0.001, workers=1), lines[2:3])[0]['price']
+
+    assert respond(PricingServer(window=0.01, workers=1), lines)[2]['price'] == alone
+
+
+def test_stream_ids():
+    assert 7 == PricingServer.get_stream_id(7)
+    assert PricingServer.get_stream_id('a') == PricingServer.get_stream_id('a')
+    assert PricingServer.get_stream_id(True) != 1
+    assert PricingServer.get_stream_id(-1) >= 0
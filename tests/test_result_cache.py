@@ -0,0 +1,116 @@
+import numpy as np
+
+from general_classes import ResultCache as result_cache
+from general_classes.Option import Option
+from general_classes.ResultCache import ResultCache
+from general_classes.Simulation import Simulation
+
+
+def get_option(s=42):
+    option = Option()
+    option.set_option(s, 40, 1, 0.1, 0, 0.2, 'call')
+
+    return option
+
+
+def test_set_option_is_not_stale():
+    cache = ResultCache()
+    option = get_option()
+    simulation = Simulation(option, cache)
+
+    first = simulation.calculate_binomial_tree(100)
+    option.set_option(44, 40, 1, 0.1, 0, 0.2, 'call')
+    second = simulation.calculate_binomial_tree(100)
+
+    assert second != first
+    assert second == Simulation(get_option(44)).calculate_binomial_tree(100)
+    assert 0 == cache.hits and 2 == cache.misses
+
+
+def test_hit_returns_the_result():
+    cache = ResultCache()
+    simulation = Simulation(get_option(), cache)
+
+    first = simulation.calculate_binomial_tree(100)
+
+    assert simulation.calculate_binomial_tree(100) == first
+    assert 1 == cache.hits
+
+    # a copy of the option with equal parameters shares the result, 42 and 42.0 are equal
+    Simulation(get_option(42.0), cache).calculate_binomial_tree(100)
+
+    assert 2 == cache.hits
+
+
+def test_array_keys_are_exact():
+    option = get_option()
+    a = np.linspace(0, 1, 2000)
+    b = a.copy()
+    b[1000] += 1e-12
+
+    # the repr of both arrays is equal
+    assert repr(a) == repr(b)
+    assert ResultCache.get_key(option, 'm', (a,)) != ResultCache.get_key(option, 'm', (b,))
+    assert ResultCache.get_key(option, 'm', (a,)) == ResultCache.get_key(option, 'm', (a.copy(),))
+
+
+def test_lru_eviction():
+    cache = ResultCache(maxsize=2)
+
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('a') == (True, 1)
+    assert cache.get('b') == (False, None)
+    assert 1 == cache.evictions
+
+
+def test_ttl(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(result_cache.time, 'monotonic', lambda: now[0])
+    cache = ResultCache(maxsize=2, ttl=10)
+
+    cache.put('a', 1)
+    now[0] = 5
+    cache.put('b', 2)
+    now[0] = 12
+
+    # the expired result is purged before the live one is evicted
+    cache.put('c', 3)
+
+    assert cache.get('b') == (True, 2)
+    assert 1 == cache.expirations and 0 == cache.evictions
+
+    now[0] = 30
+
+    assert cache.get('c') == (False, None)
+
+
+def test_invalidate():
+    cache = ResultCache()
+    option = get_option()
+    simulation = Simulation(option, cache)
+
+    simulation.calculate_binomial_tree(10)
+    simulation.calculate_trinomial_tree(10)
+    Simulation(get_option(44), cache).calculate_binomial_tree(10)
+
+    assert 1 == cache.invalidate(option, 'binomial_tree')
+    assert 1 == cache.invalidate(option)
+    assert 1 == cache.invalidate()
+    assert 0 == len(cache)
+
+
+def test_generator_seed_is_not_cached():
+    cache = ResultCache()
+    simulation = Simulation(get_option(), cache)
+    rng = np.random.default_rng(0)
+
+    # a Generator advances with every run
+    first = simulation.calculate_monte_carlo(1000, seed=rng)
+    second = simulation.calculate_monte_carlo(1000, seed=rng)
+
+    assert first != second
+    assert 0 == len(cache)
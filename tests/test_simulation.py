@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from general_classes.Option import Option
+from general_classes.OptionBook import OptionBook
+from general_classes.Simulation import Simulation
+from other_methods.Analytic import Analytic
+from other_methods.BinomialTree import BinomialTree
+
+
+def get_option(s, kind):
+    option = Option()
+    option.set_option(s, 40, 1, 0.06, 0, 0.2, kind)
+
+    return option
+
+
+@pytest.mark.parametrize('method', ['binomial_tree', 'trinomial_tree', 'implicit_fd', 'crank_nicolson'])
+@pytest.mark.parametrize('s', [36, 40, 44])
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_price_to_tolerance_error(method, s, kind):
+    option = get_option(s, kind)
+    tol = 1e-3
+
+    ret = Simulation(option).price_to_tolerance(method, tol, n_max=4096)
+
+    # away from the strike price the runs are not asymptotic, but the finest run is then accurate
+    assert ret['converged']
+    assert ret['error'] < tol
+    assert abs(ret['price'] - Analytic(option).calculate()) < tol
+
+
+def test_price_to_tolerance_extrapolation():
+    option = get_option(40, 'put')
+
+    ret = Simulation(option).price_to_tolerance('implicit_fd', 1e-3)
+
+    assert ret['ratio'] == pytest.approx(2, abs=0.1)
+    assert abs(ret['price'] - Analytic(option).calculate()) < 1e-5
+
+
+def test_price_to_tolerance_not_converged():
+    option = get_option(36, 'put')
+
+    ret = Simulation(option).price_to_tolerance('crank_nicolson', 1e-6, n_max=256)
+
+    assert not ret['converged']
+    assert ret['resolutions'] == [16, 32, 64, 128, 256]
+
+
+def test_price_to_tolerance_binomial_smoothing():
+    ret = Simulation(get_option(40, 'call')).price_to_tolerance('binomial_tree', 1e-2)
+
+    assert ret['n'] == ret['resolutions'][-1] + 1
+    assert ret['evaluations'] == 2 * len(ret['resolutions'])
+
+
+def test_price_to_tolerance_unknown_method():
+    assert Simulation(get_option(40, 'call')).price_to_tolerance('foo', 1e-3) is False
+
+
+def get_book():
+    return OptionBook.from_arrays([36, 40, 42, 44, 48], 40, [0.5, 1, 1, 2, 1], 0.06, 0.02, 0.2,
+                                  ['put', 'call', 'put', 'call', 'put'])
+
+
+@pytest.mark.parametrize('exercise', ['european', 'american'])
+@pytest.mark.parametrize('lattice', ['crr', 'lr', 'bbs'])
+def test_book_binomial_tree_matches_scalar(exercise, lattice):
+    book = get_book()
+    prices = Simulation.calculate_book(book, 'binomial_tree', 101, exercise=exercise, lattice=lattice)
+
+    assert list(prices) == [BinomialTree(option).calculate(101, exercise, lattice) for option in book]
+
+
+def test_book_binomial_tree_is_independent_of_the_chunks(monkeypatch):
+    book = get_book()
+    prices = Simulation.calculate_book(book, 'binomial_tree', 100)
+
+    monkeypatch.setattr(BinomialTree, 'chunk_elements', 2 * 100 + 2)
+
+    assert list(Simulation.calculate_book(book, 'binomial_tree', 100)) == list(prices)
+
+
+def test_book_monte_carlo_streams_follow_the_ids():
+    book = get_book()
+    prices = Simulation.calculate_book(book, 'monte_carlo', 1000, seed=7, ids=[10, 11, 12, 13, 14])
+
+    # the price of an option only depends on the seed and its id
+    assert Simulation.calculate_book(book[3:], 'monte_carlo', 1000, seed=7, ids=[13, 14])[0] == prices[3]
+    assert Simulation.calculate_book(book[3:], 'monte_carlo', 1000, seed=7)[0] != prices[3]
+
+
+@pytest.mark.parametrize('method', ['analytic', 'binomial_tree', 'trinomial_tree', 'explicit_fd', 'implicit_fd',
+                                    'crank_nicolson', 'monte_carlo'])
+def test_book_isolates_options_outside_the_domain(method):
+    book = get_book()
+    valid = Simulation.calculate_book(book, method, 50, n_t=50, seed=0)
+
+    # no volatility, no time, no spot price
+    book.v[1] = 0
+    book.t[2] = 0
+    book.s[3] = 0
+
+    prices = Simulation.calculate_book(book, method, 50, n_t=50, seed=0)
+
+    assert np.all(np.isnan(prices[1:4]))
+    assert prices[[0, 4]] == pytest.approx(valid[[0, 4]], rel=1e-12)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from finite_difference_methods.CrankNicolson import CrankNicolson
+from finite_difference_methods.ImplicitFD import ImplicitFD
+from finite_difference_methods.TridiagonalSystem import TridiagonalSystem
+from general_classes.Option import Option
+
+
+def get_system(n=50, seed=1):
+    """
+    A random diagonally dominant tri-diagonal matrix.
+
+    :param n: the size of the matrix
+    :param seed: the seed of the diagonals
+
+    Returns: Tuple
+        - a - first diagonal
+        - b - second diagonal
+        - c - third diagonal
+        - dense - the matrix
+    """
+
+    rng = np.random.default_rng(seed)
+    a, c = rng.uniform(-1, 0, n), rng.uniform(-1, 0, n)
+    b = 3 + rng.random(n)
+
+    return a, b, c, np.diag(b) + np.diag(a[1:], -1) + np.diag(c[:-1], 1)
+
+
+def test_backends_match_dense_solve():
+    a, b, c, dense = get_system()
+    rhs = np.random.default_rng(2).random((50, 3))
+
+    x_lapack = TridiagonalSystem(a, b, c, 50, 'lapack').solve(rhs, np.empty_like(rhs))
+    x_tridag = np.column_stack([TridiagonalSystem(a, b, c, 50, 'tridag').solve(rhs[:, i], np.empty(50))
+                                for i in range(3)])
+    x_dense = np.linalg.solve(dense, rhs)
+
+    np.testing.assert_allclose(x_lapack, x_dense, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(x_tridag, x_dense, rtol=1e-12, atol=1e-12)
+
+
+def test_solve_does_not_modify_the_input():
+    a, b, c, _ = get_system()
+    rhs = np.random.default_rng(3).random(50)
+    copy = rhs.copy()
+
+    TridiagonalSystem(a, b, c, 50).solve(rhs, np.empty(50))
+
+    np.testing.assert_array_equal(rhs, copy)
+
+
+def test_unknown_backend_and_singular_matrix():
+    a, b, c, _ = get_system()
+
+    with pytest.raises(ValueError):
+        TridiagonalSystem(a, b, c, 50, 'foo')
+
+    with pytest.raises(ValueError):
+        TridiagonalSystem(a, np.zeros(50), np.zeros(50), 50)
+
+
+@pytest.mark.parametrize('engine', [ImplicitFD, CrankNicolson])
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_engines_agree_across_backends(engine, kind):
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, 0, 0.2, kind)
+
+    lapack = engine(option, solver='lapack').calculate(1, 100, 'n')
+    tridag = engine(option, solver='tridag').calculate(1, 100, 'n')
+
+    assert lapack == pytest.approx(tridag, rel=1e-10)
@@ -0,0 +1,39 @@
+import pytest
+
+from general_classes.Option import Option
+from other_methods.Analytic import Analytic
+from other_methods.BinomialTree import BinomialTree
+from other_methods.TrinomialTree import TrinomialTree
+
+
+def get_option(kind, d=0.05):
+    option = Option()
+    option.set_option(42, 40, 1, 0.1, d, 0.2, kind)
+
+    return option
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+@pytest.mark.parametrize('d', [0, 0.05])
+def test_converges_to_analytic(kind, d):
+    option = get_option(kind, d)
+
+    assert TrinomialTree(option).calculate(1000) == pytest.approx(Analytic(option).calculate(), abs=2e-3)
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_greeks_match_analytic(kind):
+    option = get_option(kind)
+    price, delta, gamma = TrinomialTree(option).calculate_with_greeks(1000)
+    greeks = Analytic.calculate_greeks_batch(option.s, option.k, option.t, option.r, option.d, option.v, kind)
+
+    assert delta == pytest.approx(float(greeks['delta']), abs=1e-3)
+    assert gamma == pytest.approx(float(greeks['gamma']), abs=1e-3)
+
+
+@pytest.mark.parametrize('kind', ['call', 'put'])
+def test_american_matches_binomial_tree(kind):
+    option = get_option(kind)
+
+    assert TrinomialTree(option).calculate(1000, 'american') == pytest.approx(
+        BinomialTree(option).calculate(2000, 'american'), abs=3e-3)